@@ -6,6 +6,7 @@ Generated by 'django-admin startproject' using Django 4.2.10.
 from pathlib import Path
 import os
 import sys
+from urllib.parse import urlparse
 import dj_database_url
 import cloudinary
 if os.path.isfile('env.py'):
@@ -57,6 +58,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'recipe_book.replicas.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -75,6 +77,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'recipe_book.context_processors.assets',
             ],
         },
     },
@@ -87,8 +90,51 @@ DATABASES = {
     'default': dj_database_url.parse(os.environ.get("DATABASE_URL"))
 }
 
+# Optional read replicas, as a comma separated list of database URLs
+DATABASE_REPLICAS = []
+for index, url in enumerate(
+        filter(None, os.environ.get("DATABASE_REPLICA_URLS", "").split(","))):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(url.strip())
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['recipe_book.replicas.ReplicaRouter']
+
+# Seconds a user's reads use the primary database after the user writes
+REPLICA_STICKY_SECONDS = 10
+
 if 'test' in sys.argv:
+    DATABASES = {'default': DATABASES['default']}
     DATABASES['default']['ENGINE'] = 'django.db.backends.sqlite3'
+    # a second SQLite database standing in for a replica in the tests
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+    }
+    DATABASE_REPLICAS = []
+
+# Cache backend from CACHE_URL: locmem:// (default), file:///path/to/dir or
+# redis://host:port/db. Keys are namespaced with the project name.
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_URL = urlparse(os.environ.get("CACHE_URL", "locmem://"))
+if 'test' in sys.argv:
+    CACHE_URL = urlparse("locmem://")
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_URL.scheme],
+        'LOCATION': (
+            CACHE_URL.path if CACHE_URL.scheme == 'file'
+            else CACHE_URL.geturl() if CACHE_URL.scheme.startswith('redis')
+            else 'basilandthyme'),
+        'KEY_PREFIX': 'basilandthyme',
+        'TIMEOUT': 60 * 5,
+    }
+}
 
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:8000/",
@@ -123,9 +169,36 @@ cloudinary.config(
 )
 
 
+# Image backend building the recipe image variants: 'cloudinary' or 'local'
+# (images in MEDIA_ROOT, needs Pillow), see recipe_book/images.py
+IMAGE_BACKEND = os.environ.get("IMAGE_BACKEND", "cloudinary")
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# The image previews are built in a background thread after a recipe is
+# saved, or at once in the tests
+IMAGE_PREVIEWS_IN_BACKGROUND = 'test' not in sys.argv
+
+
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static'), ]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# Bundles written by the build_assets command, see recipe_book/assets.py
+ASSETS_BUILD_DIR = os.path.join(BASE_DIR, 'static', 'build')
+
+# collectstatic fingerprints the static files and writes gzip and brotli
+# (if Brotli is installed) variants, which WhiteNoise serves as immutable
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'whitenoise.storage.CompressedManifestStaticFilesStorage'),
+    },
+}
+if 'test' in sys.argv:
+    STORAGES['staticfiles']['BACKEND'] = (
+        'django.contrib.staticfiles.storage.StaticFilesStorage')
 
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,6 +1,8 @@
 """ URL configuration for basilandthyme project. """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+from django.views.static import serve
 
 urlpatterns = [
     path("", include("recipe_book.urls"), name="recipe-book-urls"),
@@ -9,5 +11,13 @@ urlpatterns = [
     path('summernote/', include('django_summernote.urls')),
 ]
 
+if settings.IMAGE_BACKEND == "local":
+    # images of the local image backend, for running without Cloudinary
+    urlpatterns += [
+        re_path(
+            r'^media/(?P<path>.*)$', serve,
+            {'document_root': settings.MEDIA_ROOT}),
+    ]
+
 handler404 = "recipe_book.views.page_not_found_view"
 handler500 = "recipe_book.views.server_error_view"
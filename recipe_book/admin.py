@@ -1,5 +1,7 @@
+from django import forms
 from django.contrib import admin
 from django_summernote.admin import SummernoteModelAdmin
+from .images import LocalImageBackend, get_image_backend
 from .models import Recipe, Comment, Favourite, Rating
 
 
@@ -18,9 +20,16 @@ class RecipeAdmin(SummernoteModelAdmin):
         summernote for text editing.
         fieldsets (list): A list of fieldset configurations for organizing
         fields and adding instructions in the interface.
+
+    Methods:
+        formfield_for_dbfield(db_field, request, **kwargs): Uses a plain file
+        field for the feature image with the local image backend, so images
+        are not uploaded to Cloudinary.
     """
-    list_display = ('title', 'slug', 'status', 'created_on')
-    search_fields = ['title', 'content']
+    list_display = (
+        'title', 'slug', 'status', 'created_on', 'approved_comments_count',
+        'word_count')
+    search_fields = ['title', 'content_text']
     list_filter = ('status', 'created_on', 'category',)
     prepopulated_fields = {'slug': ('title',)}
     summernote_fields = ('content', 'ingredients',)
@@ -51,6 +60,14 @@ class RecipeAdmin(SummernoteModelAdmin):
         )
     ]
 
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if (db_field.name == "feature_image"
+                and isinstance(get_image_backend(), LocalImageBackend)):
+            # stored by the image backend when the recipe is saved
+            return forms.FileField(
+                required=False, help_text=db_field.help_text)
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -60,9 +77,35 @@ class CommentAdmin(admin.ModelAdmin):
     Attributes:
         list_display (tuple): Specifies the fields to display in the list view.
         list_filter (tuple): Specifies the fields to filter by.
+        actions (list): Bulk actions approving or disapproving the selected
+        comments.
+
+    Methods:
+        approve_comments(request, queryset): Approves the selected comments.
+        disapprove_comments(request, queryset): Disapproves the selected
+        comments.
     """
     list_display = ('recipe', 'author', 'approved', 'created_on')
     list_filter = ('approved',)
+    actions = ['approve_comments', 'disapprove_comments']
+
+    @admin.action(description="Approve selected comments")
+    def approve_comments(self, request, queryset):
+        """
+        Approves the selected comments, updating the number of approved
+        comments of their recipes.
+        """
+        count = Comment.set_approved(queryset, True)
+        self.message_user(request, f"{count} comment(s) approved.")
+
+    @admin.action(description="Disapprove selected comments")
+    def disapprove_comments(self, request, queryset):
+        """
+        Disapproves the selected comments, updating the number of approved
+        comments of their recipes.
+        """
+        count = Comment.set_approved(queryset, False)
+        self.message_user(request, f"{count} comment(s) disapproved.")
 
 
 # Register your models here.
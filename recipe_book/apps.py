@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RecipeBookConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipe_book'
+
+    def ready(self):
+        """ Connects the signal receivers of the app. """
+        from . import signals  # noqa: F401
@@ -0,0 +1,190 @@
+"""
+Static asset bundles.
+
+The JavaScript of each page is bundled into one file, and the stylesheet
+minified, by the build_assets command, which writes the bundles to
+ASSETS_BUILD_DIR (collected as build/). collectstatic then fingerprints and
+precompresses (gzip and brotli) all static files, so WhiteNoise serves them
+with far-future immutable cache headers. Until the bundles are built, e.g.
+in development, pages load the source files of their bundle instead.
+
+The build also writes a version of the assets and templates to the
+manifest, which the keys of cached template fragments include (see the
+assets context processor), so fragments rendered by a previous deploy are
+not served with the new assets.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from functools import lru_cache
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+# The source files of each bundle, in the order they ran as separate
+# scripts: the page scripts before the shared script.js
+JS_BUNDLES = {
+    "base": ["js/script.js"],
+    "recipes": [
+        "js/favourites.js", "js/ratings.js", "js/queries.js", "js/script.js"],
+    "favourites": ["js/favourites.js", "js/ratings.js", "js/script.js"],
+    "recipe": [
+        "js/comments.js", "js/favourites.js", "js/ratings.js",
+        "js/script.js"],
+}
+CSS_BUNDLES = {
+    "style": ["css/style.css"],
+}
+BUNDLES = {"js": JS_BUNDLES, "css": CSS_BUNDLES}
+
+# Written to ASSETS_BUILD_DIR, listing the built bundles and their version
+MANIFEST_NAME = "bundles.json"
+
+
+def get_build_dir():
+    """
+    Gets the directory the bundles are written to.
+
+    Returns:
+        str: The directory, ASSETS_BUILD_DIR in settings.
+    """
+    return str(settings.ASSETS_BUILD_DIR)
+
+
+def get_bundle_path(kind, name):
+    """
+    Returns the static path of a built bundle, e.g. "build/js/recipe.js".
+
+    Args:
+        kind (str): The kind of bundle, "js" or "css".
+        name (str): The name of the bundle.
+
+    Returns:
+        str: The static path.
+    """
+    return f"build/{kind}/{name}.{kind}"
+
+
+def minify(kind, source):
+    """
+    Minifies JavaScript with rjsmin or CSS with rcssmin. Both are pure
+    Python, so the build runs offline.
+
+    Args:
+        kind (str): The kind of source, "js" or "css".
+        source (str): The source.
+
+    Returns:
+        str: The minified source.
+    """
+    if kind == "js":
+        import rjsmin
+        return rjsmin.jsmin(source)
+    import rcssmin
+    return rcssmin.cssmin(source)
+
+
+def hash_templates(digest):
+    """
+    Adds the paths and contents of the project and app templates to a hash.
+
+    Args:
+        digest (hashlib.sha256): The hash to update.
+    """
+    directories = [Path(settings.BASE_DIR) / "templates",
+                   Path(__file__).resolve().parent / "templates"]
+    for directory in directories:
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                digest.update(str(path.relative_to(directory)).encode())
+                digest.update(path.read_bytes())
+
+
+def build_bundles(minified=True):
+    """
+    Builds all bundles, concatenating their source files in order and
+    minifying them, and writes the manifest listing them, with a version
+    hashed from the bundles and the templates.
+
+    Args:
+        minified (bool): Whether to minify the bundles.
+
+    Returns:
+        list: The static path, source size and bundle size of each bundle.
+    """
+    build_dir = get_build_dir()
+    built = []
+    manifest = {}
+    digest = hashlib.sha256()
+    for kind, bundles in BUNDLES.items():
+        os.makedirs(os.path.join(build_dir, kind), exist_ok=True)
+        for name, paths in bundles.items():
+            sources = []
+            for path in paths:
+                with open(finders.find(path), encoding="utf-8") as source:
+                    sources.append(source.read())
+            # a semicolon keeps a script without a trailing one separate
+            bundle = (";\n" if kind == "js" else "\n").join(sources)
+            size = len(bundle.encode())
+            if minified:
+                bundle = minify(kind, bundle)
+            bundle_path = get_bundle_path(kind, name)
+            digest.update(bundle.encode())
+            with open(os.path.join(build_dir, kind, f"{name}.{kind}"), "w",
+                      encoding="utf-8") as output:
+                output.write(bundle)
+            manifest.setdefault(kind, []).append(name)
+            built.append((bundle_path, size, len(bundle.encode())))
+    hash_templates(digest)
+    manifest["version"] = digest.hexdigest()[:12]
+    with open(os.path.join(build_dir, MANIFEST_NAME), "w") as output:
+        json.dump(manifest, output)
+    read_manifest.cache_clear()
+    return built
+
+
+@lru_cache
+def read_manifest(build_dir):
+    """
+    Reads the manifest of the built bundles, once per process.
+
+    Args:
+        build_dir (str): The directory the bundles are written to.
+
+    Returns:
+        dict: The names of the built bundles by kind and the version, empty
+        if the bundles were not built.
+    """
+    try:
+        with open(os.path.join(build_dir, MANIFEST_NAME)) as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_bundle_urls(kind, name):
+    """
+    Gets the URLs to load a bundle from: the built bundle, or its source
+    files if it was not built.
+
+    Args:
+        kind (str): The kind of bundle, "js" or "css".
+        name (str): The name of the bundle.
+
+    Returns:
+        list: The URLs.
+    """
+    if name in read_manifest(get_build_dir()).get(kind, []):
+        return [static(get_bundle_path(kind, name))]
+    return [static(path) for path in BUNDLES[kind][name]]
+
+
+def get_assets_version():
+    """
+    Gets the version of the built assets and templates.
+
+    Returns:
+        str: The version, empty if the bundles were not built.
+    """
+    return read_manifest(get_build_dir()).get("version", "")
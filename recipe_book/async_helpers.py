@@ -0,0 +1,27 @@
+"""
+Helpers for async views.
+
+Django 4.2 loads the session and user of a request synchronously, and its
+async ORM does not support transactions, so async views run these parts in
+a worker thread with sync_to_async, while the view itself runs on the event
+loop.
+"""
+from asgiref.sync import sync_to_async
+
+
+async def aget_user(request):
+    """
+    Gets the user of a request from an async view, loading the session and
+    user in a worker thread.
+
+    Args:
+        request (HttpRequest): The request.
+
+    Returns:
+        User or AnonymousUser: The user of the request.
+    """
+    def get_user():
+        # evaluates the lazy request.user
+        request.user.is_authenticated
+        return request.user
+    return await sync_to_async(get_user)()
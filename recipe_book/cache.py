@@ -0,0 +1,266 @@
+"""
+Cache helpers for the recipe book.
+
+The cache backend is configured with CACHE_URL in settings (local memory,
+file-based or Redis). Cached values that depend on the recipe catalogue
+include a version number in their cache key. Bumping the version when
+recipes change invalidates all of them at once, without having to know or
+delete the individual keys. Values which are expensive to compute are
+computed by one caller at a time (single-flight), while concurrent callers
+missing the same key wait for its value instead of computing it as well.
+Values are computed from the primary database, never a read replica, so a
+value cached after an invalidation is not read from a lagging replica.
+"""
+import hashlib
+import time
+from django.core.cache import cache
+from .replicas import use_primary
+
+# Marks a value missing from the cache, so None can be cached
+MISSING = object()
+# Number of seconds between checks for a value computed by another caller
+WAIT_INTERVAL = 0.05
+
+# Version of the set of recipes, bumped when a recipe is saved or deleted
+RECIPES_VERSION = "recipes"
+# Version of the rating and comment figures of all recipes, bumped when a
+# rating or comment changes
+RECIPE_STATS_VERSION = "recipe_stats"
+
+
+def user_version(user_id):
+    """
+    Returns the name of the version of a user's own state (favourites and
+    ratings), bumped when it changes.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        str: The name of the version.
+    """
+    return f"user:{user_id}"
+
+
+def recipe_comments_version(recipe_id):
+    """
+    Returns the name of the version of the comments of a recipe, bumped when
+    a comment of the recipe is saved or deleted.
+
+    Args:
+        recipe_id (int): The ID of the recipe.
+
+    Returns:
+        str: The name of the version.
+    """
+    return f"comments:{recipe_id}"
+
+
+def get_version(name):
+    """
+    Gets the current version number of a group of cached values.
+
+    Args:
+        name (str): The name of the version, e.g. RECIPES_VERSION.
+
+    Returns:
+        int: The version number.
+    """
+    key = f"version:{name}"
+    version = cache.get(key)
+    if version is None:
+        # start from the current time, so a version lost from the cache is
+        # never reused while values cached under it may still exist
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def bump_version(name):
+    """
+    Increases the version number of a group of cached values, invalidating
+    all values cached under the previous version.
+
+    Args:
+        name (str): The name of the version, e.g. RECIPES_VERSION.
+    """
+    try:
+        cache.incr(f"version:{name}")
+    except ValueError:
+        # the version is not cached, the next get_version starts a new one
+        pass
+
+
+def make_key(prefix, *parts, version=None):
+    """
+    Builds a cache key from a prefix and any number of values, e.g. the
+    parameters of a query. The values are hashed, so they may contain
+    characters not allowed in cache keys.
+
+    Args:
+        prefix (str): The prefix of the key, e.g. "recipe_count".
+        *parts: The values identifying the cached value.
+        version (str or None): The name of a version to include in the key.
+
+    Returns:
+        str: The cache key.
+    """
+    digest = hashlib.md5(
+        repr(parts).encode(), usedforsecurity=False).hexdigest()
+    if version is not None:
+        return f"{prefix}:{get_version(version)}:{digest}"
+    return f"{prefix}:{digest}"
+
+
+def acquire_lock(key, lock_timeout):
+    """
+    Takes the lock for computing a cached value. The lock is taken with an
+    atomic add, so only one caller across threads and workers gets it, if
+    the cache is shared by them.
+
+    Args:
+        key (str): The cache key of the value.
+        lock_timeout (int): Number of seconds after which the lock expires,
+        in case the caller holding it fails.
+
+    Returns:
+        bool: True if the lock was taken.
+    """
+    return cache.add(f"{key}:lock", True, lock_timeout)
+
+
+def release_lock(key):
+    """
+    Releases the lock for computing a cached value.
+
+    Args:
+        key (str): The cache key of the value.
+    """
+    cache.delete(f"{key}:lock")
+
+
+def wait_for(key, wait_timeout):
+    """
+    Waits for another caller holding the lock to cache a value.
+
+    Args:
+        key (str): The cache key of the value.
+        wait_timeout (float): Number of seconds to wait at most.
+
+    Returns:
+        The cached value, or MISSING if it was not cached in time.
+    """
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        value = cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+    return MISSING
+
+
+def get_or_compute(key, compute, timeout, lock_timeout=30, wait_timeout=5):
+    """
+    Gets a cached value, computing and caching it if missing. Only one
+    caller computes a missing value, while concurrent callers wait for it
+    (single-flight). A caller which waited wait_timeout seconds computes the
+    value itself.
+
+    Args:
+        key (str): The cache key of the value.
+        compute (callable): Function without arguments computing the value.
+        timeout (int): Number of seconds to cache the value for.
+        lock_timeout (int): Number of seconds after which the lock expires,
+        in case the caller holding it fails.
+        wait_timeout (float): Number of seconds to wait for another caller.
+
+    Returns:
+        The cached or computed value.
+    """
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        return value
+    if not acquire_lock(key, lock_timeout):
+        value = wait_for(key, wait_timeout)
+        if value is not MISSING:
+            return value
+        return compute()
+    try:
+        with use_primary():
+            value = compute()
+        cache.set(key, value, timeout)
+        return value
+    finally:
+        release_lock(key)
+
+
+def get_or_refresh(key, compute, timeout, stale_timeout=60 * 60 * 24,
+                   lock_timeout=30, wait_timeout=5):
+    """
+    Gets a cached value, computing and caching it if missing or stale
+    (stale-while-revalidate). A value is fresh for timeout seconds, after
+    which one caller (holding a lock) computes a new value, while other
+    callers keep getting the stale value instead of computing it as well.
+    Values are kept for stale_timeout seconds. Callers missing the value
+    altogether wait for the caller computing it.
+
+    Args:
+        key (str): The cache key of the value.
+        compute (callable): Function without arguments computing the value.
+        timeout (int): Number of seconds the value is fresh.
+        stale_timeout (int): Number of seconds the value is kept in cache.
+        lock_timeout (int): Number of seconds after which the lock expires,
+        in case the caller holding it fails.
+        wait_timeout (float): Number of seconds to wait for another caller
+        computing a missing value.
+
+    Returns:
+        The cached or computed value.
+    """
+    fresh_key = f"{key}:fresh"
+    cached = cache.get_many([key, fresh_key])
+    if key in cached and fresh_key in cached:
+        return cached[key]
+    if not acquire_lock(key, lock_timeout):
+        # another caller is computing the value
+        if key in cached:
+            return cached[key]
+        value = wait_for(key, wait_timeout)
+        if value is not MISSING:
+            return value
+        return compute()
+    try:
+        return refresh(key, compute, timeout, stale_timeout)
+    finally:
+        release_lock(key)
+
+
+def mark_stale(key):
+    """
+    Marks a value cached with get_or_refresh as stale, so it is computed
+    again on the next get, while the stale value is served meanwhile.
+
+    Args:
+        key (str): The cache key of the value.
+    """
+    cache.delete(f"{key}:fresh")
+
+
+def refresh(key, compute, timeout, stale_timeout=60 * 60 * 24):
+    """
+    Computes a value cached with get_or_refresh and caches it as fresh.
+
+    Args:
+        key (str): The cache key of the value.
+        compute (callable): Function without arguments computing the value.
+        timeout (int): Number of seconds the value is fresh.
+        stale_timeout (int): Number of seconds the value is kept in cache.
+
+    Returns:
+        The computed value.
+    """
+    with use_primary():
+        value = compute()
+    cache.set(key, value, stale_timeout)
+    cache.set(f"{key}:fresh", True, timeout)
+    return value
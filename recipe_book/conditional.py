@@ -0,0 +1,87 @@
+"""
+Conditional GET for pages: views compute a cheap version token (ETag) of a
+page before rendering it, from stored figures and cache versions, and answer
+304 Not Modified when the browser already has that version.
+"""
+import hashlib
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, quote_etag)
+from .assets import get_assets_version
+
+
+def make_etag(*parts):
+    """
+    Builds an ETag from any number of values identifying a version of a page.
+
+    Args:
+        *parts: The values identifying the version.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    digest = hashlib.md5(
+        repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for views answering GET requests with 304 Not Modified when the
+    ETag of the page matches the If-None-Match header of the request, without
+    rendering the page. Pages carry the ETag, and must be revalidated by the
+    browser before reuse.
+
+    Methods:
+        get_etag_parts(): Returns the values identifying the version of the
+        page, or None to skip conditional GET.
+        get_etag(): Returns the ETag of the page.
+        get(request, *args, **kwargs): Returns 304 Not Modified or the page.
+    """
+    def get_etag_parts(self):
+        """
+        Returns the values identifying the version of the page for the user,
+        e.g. versions of the data shown. Must be cheap compared to rendering
+        the page.
+
+        Returns:
+            list or None: The values, or None to skip conditional GET.
+        """
+        raise NotImplementedError
+
+    def get_etag(self):
+        """
+        Returns the ETag of the page. It includes the user and the CSRF
+        secret, as the page contains user specific content and a CSRF token,
+        and the version of the assets and templates, as the page is rendered
+        again after a deploy.
+
+        Returns:
+            str or None: The quoted ETag, or None to skip conditional GET.
+        """
+        parts = self.get_etag_parts()
+        if parts is None:
+            return None
+        return make_etag(
+            self.request.user.id, self.request.META.get("CSRF_COOKIE"),
+            get_assets_version(), *parts)
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns 304 Not Modified if the request's If-None-Match header
+        matches the ETag of the page, else renders the page with the ETag.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        etag = self.get_etag()
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response["ETag"] = etag
+        patch_cache_control(
+            response, no_cache=True, private=request.user.is_authenticated)
+        return response
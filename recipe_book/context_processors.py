@@ -0,0 +1,16 @@
+from recipe_book.assets import get_assets_version
+
+
+def assets(request):
+    """
+    Adds the version of the built assets and templates (see
+    recipe_book/assets.py) to the template context, for the keys of cached
+    template fragments.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        dict: The context, with assets_version.
+    """
+    return {"assets_version": get_assets_version()}
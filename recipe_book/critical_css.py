@@ -0,0 +1,615 @@
+"""
+Critical CSS of the pages.
+
+The CSS needed to render the part of a page above the fold is inlined in the
+page, and the full stylesheets are loaded without blocking rendering (see
+the style_bundle template tag). The build_critical_css command renders each
+page of CRITICAL_PAGES, finds the elements before the fold (the first
+element after the visible part of the page on a typical screen), and keeps
+the rules of the stylesheets with a selector matching any of them. The
+critical CSS of each page is written to ASSETS_BUILD_DIR; until it is built,
+pages load the stylesheets as before.
+
+Selectors are matched without a browser: pseudo-classes, pseudo-elements and
+sibling combinators are ignored, so a rule is kept if it might apply. The
+command also reports the selectors of the project's own stylesheet that
+match no element of the pages, nor a class set by the scripts.
+"""
+import os
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from pathlib import Path
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+# Page name: (URL name, fold selector, number of the fold element). The
+# recipe page is rendered for the latest published sample recipe.
+CRITICAL_PAGES = {
+    "base": ("account_login", "footer", 1),
+    "index": ("home_page", "#latest-section", 1),
+    "recipes": ("recipe_list_page", ".card", 5),
+    "recipe": ("recipe_detail", "main section", 1),
+}
+# The stylesheets, in the order the pages load them. Bootstrap is loaded
+# from a CDN; its rules are included if it is installed with npm.
+STYLESHEETS = ["node_modules/bootstrap/dist/css/bootstrap.css"]
+PROJECT_STYLESHEET = "css/style.css"
+
+# At-rules holding rules, kept with the critical rules inside them
+GROUPING_RULES = ("@media", "@supports", "@layer", "@container")
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "source", "track", "wbr",
+})
+
+SIMPLE_SELECTOR = re.compile(
+    r"(?P<id>#(?:\\.|[\w-])+)|(?P<class>\.(?:\\.|[\w-])+)"
+    r"|(?P<attribute>\[[^\]]*\])"
+    r"|(?P<pseudo>::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?)"
+    r"|(?P<tag>\*|[\w-]+)")
+ATTRIBUTE_SELECTOR = re.compile(
+    r"\[\s*([\w-]+)\s*(?:([~|^$*]?=)\s*(\"[^\"]*\"|'[^']*'|[^\s\]]+)"
+    r"\s*[iIsS]?)?\s*\]")
+# Classes set by the scripts, e.g. classList.add("show") or class="..."
+SCRIPT_CLASSES = re.compile(
+    r"classList\.(?:add|remove|toggle)\(\s*[\"']([\w\- ]+)[\"']"
+    r"|class=\"([^\"$]+)\"")
+
+
+class Element:
+    """
+    An element of a parsed page.
+
+    Attributes:
+        tag (str): The tag name.
+        attrs (dict): The attributes.
+        classes (set): The classes.
+        parent (Element): The parent element, None for the root.
+    """
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = {name: value or "" for name, value in attrs}
+        self.classes = set(self.attrs.get("class", "").split())
+        self.parent = parent
+
+
+class PageParser(HTMLParser):
+    """
+    Parses a page into its elements, in document order.
+
+    Attributes:
+        elements (list): The elements of the page.
+    """
+    def __init__(self):
+        super().__init__()
+        self.elements = []
+        self.open = []
+
+    def handle_starttag(self, tag, attrs):
+        element = Element(tag, attrs, self.open[-1] if self.open else None)
+        self.elements.append(element)
+        if tag not in VOID_ELEMENTS:
+            self.open.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.elements.append(
+            Element(tag, attrs, self.open[-1] if self.open else None))
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.open) - 1, -1, -1):
+            if self.open[index].tag == tag:
+                del self.open[index:]
+                break
+
+
+def parse_page(html):
+    """
+    Parses a page into its elements.
+
+    Args:
+        html (str): The page.
+
+    Returns:
+        list: The elements, in document order.
+    """
+    parser = PageParser()
+    parser.feed(html)
+    parser.close()
+    return parser.elements
+
+
+def split_top_level(text, separator):
+    """
+    Splits text at a separator outside brackets, parentheses and strings.
+
+    Args:
+        text (str): The text, e.g. a selector list.
+        separator (str): The separator character.
+
+    Returns:
+        list: The parts, stripped.
+    """
+    parts, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index].strip())
+            start = index + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+def parse_selector(selector):
+    """
+    Parses a complex selector into its compound selectors, from right to
+    left, each with the combinator relating it to the compound on its left.
+    Sibling combinators end the selector, as siblings are not matched.
+
+    Args:
+        selector (str): The selector, e.g. ".card > .card-body p".
+
+    Returns:
+        list: (compound selector, combinator) tuples, the rightmost first.
+        The combinator is " ", ">" or None for the leftmost compound.
+    """
+    compounds = []
+    compound, combinator, depth = "", None, 0
+    for char in selector + " ":
+        if depth == 0 and (char.isspace() or char in ">+~"):
+            if compound:
+                compounds.append((compound, combinator))
+                compound, combinator = "", " "
+            if char in ">+~":
+                combinator = char
+            continue
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        compound += char
+    parsed = []
+    for compound, combinator in reversed(compounds):
+        if combinator in ("+", "~"):
+            parsed.append((compound, None))
+            break
+        parsed.append((compound, combinator))
+    return parsed
+
+
+@lru_cache(maxsize=None)
+def parse_compound(compound):
+    """
+    Parses a compound selector, ignoring its pseudo-classes and
+    pseudo-elements. Cached, as the same compounds are matched against many
+    elements.
+
+    Args:
+        compound (str): The compound selector, e.g. "a.nav-link:hover".
+
+    Returns:
+        tuple: The tag (None for any), id, classes and attribute selectors.
+    """
+    tag, id_, classes, attributes = None, None, set(), []
+    for match in SIMPLE_SELECTOR.finditer(compound):
+        kind, value = match.lastgroup, match.group()
+        if kind == "id":
+            id_ = unescape(value[1:])
+        elif kind == "class":
+            classes.add(unescape(value[1:]))
+        elif kind == "tag" and value != "*":
+            tag = value.lower()
+        elif kind == "attribute":
+            attributes.append(value)
+    return tag, id_, frozenset(classes), tuple(attributes)
+
+
+def matches_compound(element, compound):
+    """
+    Checks if an element matches a compound selector, ignoring its
+    pseudo-classes and pseudo-elements.
+
+    Args:
+        element (Element): The element.
+        compound (str): The compound selector, e.g. "a.nav-link:hover".
+
+    Returns:
+        bool: True if the element may match.
+    """
+    tag, id_, classes, attributes = parse_compound(compound)
+    return (
+        (tag is None or tag == element.tag)
+        and (id_ is None or element.attrs.get("id") == id_)
+        and classes <= element.classes
+        and all(matches_attribute(element, value) for value in attributes))
+
+
+def unescape(name):
+    """ Removes the backslash escapes of a class name or id. """
+    return re.sub(r"\\(.)", r"\1", name)
+
+
+def matches_attribute(element, selector):
+    """
+    Checks if an element matches an attribute selector, e.g. [type=search].
+
+    Args:
+        element (Element): The element.
+        selector (str): The attribute selector.
+
+    Returns:
+        bool: True if the element matches.
+    """
+    match = ATTRIBUTE_SELECTOR.fullmatch(selector)
+    if not match:
+        return True
+    name, operator, expected = match.groups()
+    if name not in element.attrs:
+        return False
+    if not operator:
+        return True
+    expected = expected.strip("\"'")
+    value = element.attrs[name]
+    return {
+        "=": value == expected,
+        "~=": expected in value.split(),
+        "|=": value == expected or value.startswith(expected + "-"),
+        "^=": value.startswith(expected),
+        "$=": value.endswith(expected),
+        "*=": expected in value,
+    }[operator]
+
+
+def matches(element, parsed):
+    """
+    Checks if an element matches a parsed complex selector.
+
+    Args:
+        element (Element): The element.
+        parsed (list): The selector, parsed with parse_selector().
+
+    Returns:
+        bool: True if the element may match.
+    """
+    compound, combinator = parsed[0]
+    if not matches_compound(element, compound):
+        return False
+    if len(parsed) == 1:
+        return True
+    ancestor = element.parent
+    while ancestor is not None:
+        if matches(ancestor, parsed[1:]):
+            return True
+        if combinator == ">":
+            return False
+        ancestor = ancestor.parent
+    return False
+
+
+class Rule:
+    """
+    A rule of a stylesheet.
+
+    Attributes:
+        prelude (str): The selector list, or the at-rule, e.g. "@media ...".
+        body (str): The declarations, or the nested rules of grouping rules.
+        rules (list): The nested rules of grouping rules.
+    """
+    def __init__(self, prelude, body, rules=None):
+        self.prelude = prelude
+        self.body = body
+        self.rules = rules
+
+
+def parse_stylesheet(css):
+    """
+    Parses a stylesheet into its rules, nesting the rules of grouping
+    at-rules (e.g. @media) in them. Statements such as @import are kept as
+    rules without a body.
+
+    Args:
+        css (str): The stylesheet.
+
+    Returns:
+        list: The rules.
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    rules = []
+    index = 0
+    while index < len(css):
+        end = find_outside_strings(css, "{;}", index)
+        if end == -1:
+            break
+        prelude = " ".join(css[index:end].split())
+        if css[end] != "{":
+            if prelude:
+                rules.append(Rule(prelude, None))
+            index = end + 1
+            continue
+        close = find_block_end(css, end)
+        body = css[end + 1:close]
+        if prelude.startswith(GROUPING_RULES):
+            rules.append(Rule(prelude, body, parse_stylesheet(body)))
+        else:
+            rules.append(Rule(prelude, minify_declarations(body)))
+        index = close + 1
+    return rules
+
+
+def minify_declarations(body):
+    """ Removes the whitespace and last semicolon of declarations. """
+    body = re.sub(r"\s*([:;,])\s*", r"\1", " ".join(body.split()))
+    return body.strip().rstrip(";")
+
+
+def find_outside_strings(css, characters, start):
+    """ Finds the first of the characters in css outside strings. """
+    quote = None
+    for index in range(start, len(css)):
+        char = css[index]
+        if quote:
+            if char == "\\":
+                continue
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in characters:
+            return index
+    return -1
+
+
+def find_block_end(css, start):
+    """ Finds the brace closing the block opened at start. """
+    depth = 0
+    index = start
+    while True:
+        index = find_outside_strings(css, "{}", index)
+        if index == -1:
+            return len(css)
+        depth += 1 if css[index] == "{" else -1
+        if depth == 0:
+            return index
+        index += 1
+
+
+class ElementIndex:
+    """
+    The elements of a page indexed by id, class and tag, to match selectors
+    against the elements that may match their rightmost compound only.
+
+    Methods:
+        matches_any(selector): Checks if any element may match a selector.
+    """
+    def __init__(self, elements):
+        self.elements = elements
+        self.by_key = {}
+        for element in elements:
+            keys = [f"#{element.attrs['id']}"] if "id" in element.attrs \
+                else []
+            keys += [f".{name}" for name in element.classes]
+            keys.append(element.tag)
+            for key in keys:
+                self.by_key.setdefault(key, []).append(element)
+
+    def candidates(self, compound):
+        tag, id_, classes, _ = parse_compound(compound)
+        keys = [f".{name}" for name in classes]
+        if id_ is not None:
+            keys.append(f"#{id_}")
+        if not keys and tag is not None:
+            keys.append(tag)
+        if not keys:
+            return self.elements
+        return min(
+            (self.by_key.get(key, []) for key in keys), key=len)
+
+    def matches_any(self, selector):
+        parsed = parse_selector(selector)
+        if not parsed:
+            return False
+        # a class or id of any compound missing from the page rules it out
+        for compound, _ in parsed:
+            tag, id_, classes, _ = parse_compound(compound)
+            if (id_ is not None and f"#{id_}" not in self.by_key) or any(
+                    f".{name}" not in self.by_key for name in classes):
+                return False
+        return any(
+            matches(element, parsed)
+            for element in self.candidates(parsed[0][0]))
+
+
+def extract_critical(rules, index):
+    """
+    Keeps the rules with a selector that may match an element of the index,
+    with only their matching selectors.
+
+    Args:
+        rules (list): The rules of a stylesheet.
+        index (ElementIndex): The elements above the fold.
+
+    Returns:
+        str: The critical CSS, minified.
+    """
+    css = []
+    for rule in rules:
+        if rule.rules is not None:
+            nested = extract_critical(rule.rules, index)
+            if nested:
+                css.append(f"{rule.prelude}{{{nested}}}")
+        elif rule.body is None or rule.prelude.startswith("@"):
+            # @import and @font-face are left to the full stylesheet, so
+            # the first paint does not wait for them
+            continue
+        else:
+            selectors = [
+                selector for selector in split_top_level(rule.prelude, ",")
+                if index.matches_any(selector)]
+            if selectors and rule.body:
+                css.append(f"{','.join(selectors)}{{{rule.body}}}")
+    return "".join(css)
+
+
+def find_unused_selectors(rules, indexes, script_classes):
+    """
+    Finds the selectors matching no element of any page, and using a class
+    the scripts do not set.
+
+    Args:
+        rules (list): The rules of a stylesheet.
+        indexes (list): The ElementIndex of each page.
+        script_classes (set): The classes set by the scripts.
+
+    Returns:
+        list: The unused selectors, in stylesheet order.
+    """
+    unused = []
+    for rule in rules:
+        if rule.rules is not None:
+            unused += find_unused_selectors(
+                rule.rules, indexes, script_classes)
+            continue
+        if rule.body is None or rule.prelude.startswith("@"):
+            continue
+        for selector in split_top_level(rule.prelude, ","):
+            classes = {
+                unescape(name) for name in re.findall(
+                    r"\.((?:\\.|[\w-])+)", selector)}
+            if classes & script_classes:
+                continue
+            if not any(index.matches_any(selector) for index in indexes):
+                unused.append(selector)
+    return unused
+
+
+def find_script_classes():
+    """
+    Finds the classes the scripts of the project add to elements.
+
+    Returns:
+        set: The class names.
+    """
+    classes = set()
+    for path in (Path(settings.BASE_DIR) / "static" / "js").glob("*.js"):
+        for added, markup in SCRIPT_CLASSES.findall(
+                path.read_text(encoding="utf-8")):
+            classes.update((added or markup).split())
+    return classes
+
+
+def read_stylesheets():
+    """
+    Reads the stylesheets the pages load, skipping Bootstrap if it is not
+    installed.
+
+    Returns:
+        list: (name, rules) tuples, in load order.
+    """
+    stylesheets = []
+    for path in STYLESHEETS:
+        full_path = Path(settings.BASE_DIR) / path
+        if full_path.exists():
+            stylesheets.append((
+                path, parse_stylesheet(full_path.read_text(encoding="utf-8"))))
+    with open(finders.find(PROJECT_STYLESHEET), encoding="utf-8") as source:
+        stylesheets.append(
+            (PROJECT_STYLESHEET, parse_stylesheet(source.read())))
+    return stylesheets
+
+
+def split_at_fold(elements, fold_selector, count):
+    """
+    Returns the elements before the fold element.
+
+    Args:
+        elements (list): The elements of the page, in document order.
+        fold_selector (str): Selector of the fold element.
+        count (int): The number of the fold element among the matches.
+
+    Returns:
+        list: The elements before the fold, all elements if there are fewer
+        matches of the fold selector.
+    """
+    parsed = parse_selector(fold_selector)
+    found = 0
+    for position, element in enumerate(elements):
+        if matches(element, parsed):
+            found += 1
+            if found == count:
+                return elements[:position]
+    return elements
+
+
+def get_critical_path(page):
+    """
+    Gets the path of the critical CSS of a page in ASSETS_BUILD_DIR.
+
+    Args:
+        page (str): The page name, a key of CRITICAL_PAGES.
+
+    Returns:
+        str: The path.
+    """
+    return os.path.join(str(settings.ASSETS_BUILD_DIR), "critical",
+                        f"{page}.css")
+
+
+def write_critical_css(page, css):
+    """
+    Writes the critical CSS of a page.
+
+    Args:
+        page (str): The page name.
+        css (str): The critical CSS.
+    """
+    path = get_critical_path(page)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as output:
+        output.write(css)
+    read_critical_css.cache_clear()
+
+
+def remove_critical_css(page):
+    """
+    Removes the critical CSS of a page, if any, so the page loads the
+    stylesheets as before.
+
+    Args:
+        page (str): The page name.
+    """
+    try:
+        os.remove(get_critical_path(page))
+    except FileNotFoundError:
+        pass
+    read_critical_css.cache_clear()
+
+
+def get_critical_css(page):
+    """
+    Gets the critical CSS of a page.
+
+    Args:
+        page (str): The page name.
+
+    Returns:
+        str: The critical CSS, None if it was not built.
+    """
+    return read_critical_css(get_critical_path(page))
+
+
+@lru_cache
+def read_critical_css(path):
+    """ Reads a critical CSS file once per process, None if missing. """
+    try:
+        with open(path, encoding="utf-8") as source:
+            return source.read()
+    except OSError:
+        return None
@@ -0,0 +1,62 @@
+"""
+Feature lists of the home page: the highest rated and the latest published
+recipes. They are the same for all users, so they are computed once and
+cached, and marked stale when recipes or ratings change. The user's own
+ratings and favourites are added to the recipe cards in the browser (see the
+user_recipe_state view).
+"""
+from .cache import get_or_refresh, mark_stale, refresh
+from .models import Recipe
+
+FEATURES_CACHE_KEY = "features"
+# Number of seconds the cached feature lists are fresh
+FEATURES_TIMEOUT = 60 * 10
+# Number of recipes in each feature list
+FEATURES_SIZE = 4
+
+
+def compute_features():
+    """
+    Computes the feature lists.
+
+    Returns:
+        dict: The highest rated published recipes ('recipes_by_rating') and
+        the latest published recipes ('recipes_by_date').
+    """
+    queryset = Recipe.objects.filter(status=1)
+    return {
+        'recipes_by_rating': list(
+            queryset.order_by('-avg_rating', '-id')[:FEATURES_SIZE]),
+        'recipes_by_date': list(
+            queryset.order_by('-created_on', '-id')[:FEATURES_SIZE]),
+    }
+
+
+def get_cached_features():
+    """
+    Gets the cached feature lists shared by all users, computing them if
+    missing or stale.
+
+    Returns:
+        dict: The feature lists, see compute_features().
+    """
+    return get_or_refresh(
+        FEATURES_CACHE_KEY, compute_features, FEATURES_TIMEOUT)
+
+
+def invalidate_features():
+    """
+    Marks the cached feature lists as stale, so they are computed again on
+    the next request.
+    """
+    mark_stale(FEATURES_CACHE_KEY)
+
+
+def refresh_features():
+    """
+    Computes and caches the feature lists.
+
+    Returns:
+        dict: The feature lists, see compute_features().
+    """
+    return refresh(FEATURES_CACHE_KEY, compute_features, FEATURES_TIMEOUT)
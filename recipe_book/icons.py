@@ -0,0 +1,124 @@
+"""
+SVG icon sprite.
+
+Icons are SVG symbols of a sprite inlined in every page (included by
+base.html), and referenced with the icon template tag, so pages need no icon
+font or script. The sprite is generated by the build_icon_sprite command
+from the source icons in recipe_book/icons, and holds exactly the icons
+referenced by the templates ({% icon "name" %}) and scripts
+(iconSvg("name") and setIcon(element, "name")). Run the command again after
+adding or removing an icon.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+from xml.etree import ElementTree
+from django.conf import settings
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+# The source icons, one SVG file per icon, named after the icon
+ICONS_DIR = Path(__file__).resolve().parent / "icons"
+# The ids of the symbols are the icon names with this prefix
+ID_PREFIX = "icon-"
+
+# References to icons in the templates and scripts
+TEMPLATE_REFERENCE = re.compile(r"""{%\s*icon\s+["']([\w-]+)["']""")
+SCRIPT_REFERENCE = re.compile(
+    r"""\b(?:iconSvg\(|setIcon\(.*?,\s*)["']([\w-]+)["']""")
+
+ElementTree.register_namespace("", SVG_NAMESPACE)
+
+
+def get_sprite_path():
+    """
+    Gets the path of the generated sprite, a template in the project
+    templates directory.
+
+    Returns:
+        Path: The path, templates/components/icon-sprite.svg.
+    """
+    return Path(settings.BASE_DIR) / "templates" / "components" / \
+        "icon-sprite.svg"
+
+
+def find_icon_names():
+    """
+    Finds the names of the icons referenced by the templates and scripts of
+    the project.
+
+    Returns:
+        list: The icon names, sorted.
+    """
+    base_dir = Path(settings.BASE_DIR)
+    sources = [
+        (base_dir / "templates", "*.html", TEMPLATE_REFERENCE),
+        (Path(__file__).resolve().parent / "templates", "*.html",
+         TEMPLATE_REFERENCE),
+        (base_dir / "static" / "js", "*.js", SCRIPT_REFERENCE),
+    ]
+    names = set()
+    for directory, pattern, reference in sources:
+        for path in directory.rglob(pattern):
+            names.update(reference.findall(path.read_text(encoding="utf-8")))
+    return sorted(names)
+
+
+def build_sprite(names):
+    """
+    Builds the sprite of the given icons, a hidden SVG element with one
+    symbol per icon.
+
+    Args:
+        names (list): The icon names.
+
+    Returns:
+        str: The sprite.
+
+    Raises:
+        ValueError: If there is no source icon of a name.
+    """
+    symbols = []
+    for name in names:
+        path = ICONS_DIR / f"{name}.svg"
+        if not path.exists():
+            raise ValueError(f"No source icon {path.name} in {ICONS_DIR}.")
+        source = ElementTree.parse(path).getroot()
+        content = "".join(
+            ElementTree.tostring(element, encoding="unicode").replace(
+                f' xmlns="{SVG_NAMESPACE}"', "")
+            for element in source)
+        symbols.append(
+            f'<symbol id="{ID_PREFIX}{name}" '
+            f'viewBox="{source.get("viewBox")}">{content}</symbol>')
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" class="d-none">\n'
+        + "\n".join(symbols) + "\n</svg>\n")
+
+
+def write_sprite():
+    """
+    Generates the sprite of the icons referenced by the project.
+
+    Returns:
+        list: The names of the icons in the sprite.
+    """
+    names = find_icon_names()
+    get_sprite_path().write_text(build_sprite(names), encoding="utf-8")
+    get_view_boxes.cache_clear()
+    return names
+
+
+@lru_cache
+def get_view_boxes():
+    """
+    Reads the view boxes of the icons in the generated sprite, once per
+    process, for the icon template tag.
+
+    Returns:
+        dict: The view box of each icon by name.
+    """
+    sprite = ElementTree.parse(get_sprite_path()).getroot()
+    return {
+        symbol.get("id").removeprefix(ID_PREFIX): symbol.get("viewBox")
+        for symbol in sprite.iter(f"{{{SVG_NAMESPACE}}}symbol")
+    }
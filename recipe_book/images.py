@@ -0,0 +1,328 @@
+"""
+Responsive image variants of recipe images.
+
+The URLs of the variants of a recipe's feature image (card, hero, srcset
+widths and a low-quality placeholder) are built once, when the image is set,
+and stored on the recipe (Recipe.image_variants), so rendering a card only
+looks them up. After the recipe is saved, a tiny blurred preview of the
+image (a base64 data URI, shown inline while the image loads) and the
+intrinsic width and height of the image are added to the variants, so pages
+do not shift when images load. The preview is built in a background thread,
+so saving a recipe in the admin does not wait for the download. The
+rebuild_image_variants and build_image_previews commands backfill them, and
+run on every deploy (see bin/release). The variants are built by the image
+backend chosen with IMAGE_BACKEND in settings:
+
+- "cloudinary" (default): transformed Cloudinary URLs, resized on delivery.
+- "local": images stored under MEDIA_ROOT, with the variants generated on
+disk with Pillow, so the site runs without a Cloudinary account.
+"""
+import base64
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.conf import settings
+from django.db import connections
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import UploadedFile
+
+# Widths of the images in the srcset of recipe cards and the recipe page
+SRCSET_WIDTHS = (320, 480, 640, 960, 1280)
+# Widths of the card and hero (recipe page) images
+CARD_WIDTH = 480
+HERO_WIDTH = 960
+# Width of the low-quality placeholder shown while an image loads
+PLACEHOLDER_WIDTH = 32
+# Width of the inline preview, a few hundred bytes as base64
+PREVIEW_WIDTH = 24
+# Number of seconds to wait for Cloudinary when building a preview
+PREVIEW_TIMEOUT = 10
+# Public id of the default image of recipes without an image
+DEFAULT_IMAGE = "placeholder"
+
+logger = logging.getLogger(__name__)
+
+# Builds the previews of saved recipes outside of the request, one at a time
+_preview_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="image-preview")
+
+
+def get_image_name(resource):
+    """
+    Gets the stored name of a feature image, e.g. "image/upload/v1/name.jpg".
+
+    Args:
+        resource (CloudinaryResource or str): The feature image.
+
+    Returns:
+        str: The stored name, empty if there is no image.
+    """
+    if not resource:
+        return ""
+    if isinstance(resource, str):
+        return resource
+    return resource.get_prep_value()
+
+
+def to_data_uri(data, content_type="image/webp"):
+    """
+    Encodes image data as a base64 data URI, to inline it in a page.
+
+    Args:
+        data (bytes): The image data.
+        content_type (str): The content type of the image.
+
+    Returns:
+        str: The data URI.
+    """
+    return f"data:{content_type};base64,{base64.b64encode(data).decode()}"
+
+
+class CloudinaryImageBackend:
+    """
+    Image backend building transformed Cloudinary URLs. Cloudinary resizes
+    the images on delivery, so nothing is generated up front.
+
+    Methods:
+        save_upload(upload): Returns None, the field uploads the image.
+        build_variants(resource): Returns the URLs of the image variants.
+        build_preview(resource): Downloads a tiny blurred preview and the
+        dimensions of the image.
+    """
+    def save_upload(self, upload):
+        return None
+
+    def build_variants(self, resource):
+        def url(width, **options):
+            return resource.build_url(
+                width=width, crop="limit", fetch_format="auto", **options)
+        return {
+            "card": url(CARD_WIDTH, quality="auto:eco"),
+            "hero": url(HERO_WIDTH, quality="auto:good"),
+            "srcset": ", ".join(
+                f"{url(width, quality='auto:eco')} {width}w"
+                for width in SRCSET_WIDTHS),
+            "placeholder": url(
+                PLACEHOLDER_WIDTH, quality=1, effect="blur:200"),
+        }
+
+    def build_preview(self, resource):
+        preview = requests.get(resource.build_url(
+            width=PREVIEW_WIDTH, crop="limit", quality=30, effect="blur:200",
+            format="webp"), timeout=PREVIEW_TIMEOUT)
+        preview.raise_for_status()
+        # the dimensions of the original image, without downloading it
+        info = requests.get(
+            resource.build_url(flags="getinfo"), timeout=PREVIEW_TIMEOUT)
+        info.raise_for_status()
+        size = info.json()["input"]
+        return {
+            "preview": to_data_uri(preview.content),
+            "width": size["width"],
+            "height": size["height"],
+        }
+
+
+class LocalImageBackend:
+    """
+    Image backend storing images under MEDIA_ROOT and generating resized
+    WebP variants of them on disk with Pillow.
+
+    Methods:
+        save_upload(upload): Stores an uploaded image, returning its name.
+        build_variants(resource): Generates the image variants, returning
+        their URLs.
+        build_preview(resource): Generates a tiny blurred preview, and reads
+        the dimensions of the image.
+        get_name(resource): Returns the name of an image in the storage.
+        generate(name, width, blur): Generates one variant of an image.
+    """
+    def __init__(self):
+        self.storage = FileSystemStorage(
+            location=settings.MEDIA_ROOT, base_url=settings.MEDIA_URL)
+
+    def save_upload(self, upload):
+        return self.storage.save(f"recipes/{upload.name}", upload)
+
+    def get_name(self, resource):
+        """
+        Returns the name of an image in the storage.
+
+        Returns:
+            str: The name, e.g. "recipes/soup.png".
+        """
+        if resource.format:
+            return f"{resource.public_id}.{resource.format}"
+        return resource.public_id
+
+    def build_variants(self, resource):
+        name = self.get_name(resource)
+        srcset = ", ".join(
+            f"{self.generate(name, width)} {width}w"
+            for width in SRCSET_WIDTHS)
+        return {
+            "card": self.generate(name, CARD_WIDTH),
+            "hero": self.generate(name, HERO_WIDTH),
+            "srcset": srcset,
+            "placeholder": self.generate(name, PLACEHOLDER_WIDTH, blur=True),
+        }
+
+    def build_preview(self, resource):
+        from PIL import Image, ImageFilter
+
+        with self.storage.open(self.get_name(resource)) as source:
+            image = Image.open(source).convert("RGB")
+        width, height = image.size
+        image.thumbnail((PREVIEW_WIDTH, height))
+        image = image.filter(ImageFilter.GaussianBlur(1))
+        data = io.BytesIO()
+        image.save(data, "WEBP", quality=30)
+        return {
+            "preview": to_data_uri(data.getvalue()),
+            "width": width,
+            "height": height,
+        }
+
+    def generate(self, name, width, blur=False):
+        """
+        Generates a variant of an image, at most width pixels wide, unless
+        it exists.
+
+        Args:
+            name (str): The name of the image in the storage.
+            width (int): The largest width of the variant.
+            blur (bool): Whether to blur the variant (placeholders).
+
+        Returns:
+            str: The URL of the variant.
+        """
+        # Pillow is only needed with the local backend
+        from PIL import Image, ImageFilter
+
+        stem = os.path.splitext(name)[0]
+        suffix = "-blur" if blur else ""
+        variant = f"variants/{stem}-{width}{suffix}.webp"
+        if not self.storage.exists(variant):
+            with self.storage.open(name) as source:
+                image = Image.open(source).convert("RGB")
+                image.thumbnail((width, image.height))
+                if blur:
+                    image = image.filter(ImageFilter.GaussianBlur(2))
+                path = self.storage.path(variant)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                image.save(path, "WEBP", quality=80)
+        return self.storage.url(variant)
+
+
+IMAGE_BACKENDS = {
+    "cloudinary": CloudinaryImageBackend,
+    "local": LocalImageBackend,
+}
+
+
+def get_image_backend():
+    """
+    Gets the image backend chosen with IMAGE_BACKEND in settings.
+
+    Returns:
+        CloudinaryImageBackend or LocalImageBackend: The image backend.
+    """
+    name = getattr(settings, "IMAGE_BACKEND", "cloudinary")
+    return IMAGE_BACKENDS[name]()
+
+
+def store_upload(recipe):
+    """
+    Stores a newly uploaded feature image of a recipe with the image backend,
+    if the backend stores uploads itself, setting the stored name on the
+    recipe. Cloudinary uploads are left to the field.
+
+    Args:
+        recipe (Recipe): The recipe object, not saved.
+    """
+    if isinstance(recipe.feature_image, UploadedFile):
+        name = get_image_backend().save_upload(recipe.feature_image)
+        if name is not None:
+            recipe.feature_image = name
+
+
+def update_image_variants(recipe):
+    """
+    Builds the image variants of a recipe if its feature image changed since
+    they were built. Recipes with the default image have no variants.
+
+    Args:
+        recipe (Recipe): The recipe object, with its image stored.
+
+    Returns:
+        bool: True if the image variants changed.
+    """
+    if isinstance(recipe.feature_image, UploadedFile):
+        # built after the field uploaded the image
+        return False
+    source = get_image_name(recipe.feature_image)
+    if recipe.image_variants.get("source") == source:
+        return False
+    variants = {"source": source}
+    if source:
+        resource = recipe._meta.get_field("feature_image").to_python(source)
+        if resource.public_id != DEFAULT_IMAGE:
+            variants.update(get_image_backend().build_variants(resource))
+    recipe.image_variants = variants
+    return True
+
+
+def update_image_preview(recipe):
+    """
+    Adds the inline preview and the dimensions of the image to the image
+    variants of a recipe, unless they were added already. Building them may
+    download from Cloudinary, so it is done after the recipe is saved.
+    Failures are logged, leaving the recipe without a preview.
+
+    Args:
+        recipe (Recipe): The recipe object, with its image variants built.
+
+    Returns:
+        bool: True if the image variants changed.
+    """
+    variants = recipe.image_variants
+    if "card" not in variants or "preview" in variants:
+        return False
+    resource = recipe._meta.get_field("feature_image").to_python(
+        variants["source"])
+    try:
+        preview = get_image_backend().build_preview(resource)
+    except (OSError, requests.RequestException, KeyError, ValueError):
+        logger.warning(
+            "Could not build the image preview of recipe %s", recipe.pk,
+            exc_info=True)
+        return False
+    recipe.image_variants = {**variants, **preview}
+    return True
+
+
+def run_in_background(func, *args):
+    """
+    Runs a function in the background thread building image previews, so
+    the request does not wait for it. Errors are logged, and the database
+    connections of the thread are closed when done. The function runs at
+    once if IMAGE_PREVIEWS_IN_BACKGROUND in settings is False (in tests).
+
+    Args:
+        func (callable): The function.
+        *args: The arguments of the function.
+    """
+    if not getattr(settings, "IMAGE_PREVIEWS_IN_BACKGROUND", True):
+        func(*args)
+        return
+
+    def run():
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Could not build an image preview")
+        finally:
+            connections.close_all()
+    _preview_executor.submit(run)
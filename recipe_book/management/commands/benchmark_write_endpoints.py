@@ -0,0 +1,102 @@
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Management command sending concurrent rating and favourite requests to a
+    running server, and reporting the throughput and latencies. Run it
+    against the ASGI server (see the Procfile) and the WSGI server (gunicorn
+    basilandthyme.wsgi) with the same options to compare them. Start the
+    servers with --keep-alive 75, as the clients reuse their connections.
+    """
+    help = (
+        "Benchmarks the rating and favourite endpoints of a running server "
+        "with concurrent clients.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default="http://127.0.0.1:8000",
+            help="Base URL of the server.")
+        parser.add_argument(
+            "--username", required=True, help="User to log in as.")
+        parser.add_argument(
+            "--password", required=True, help="Password of the user.")
+        parser.add_argument(
+            "--recipe-ids", required=True,
+            help="Comma separated ids of the recipes to rate and favourite.")
+        parser.add_argument(
+            "--concurrency", type=int, default=20,
+            help="Number of concurrent clients.")
+        parser.add_argument(
+            "--requests", type=int, default=500,
+            help="Total number of requests.")
+
+    def login(self, url, username, password):
+        """
+        Logs in to the server, returning the cookies of the session.
+
+        Returns:
+            RequestsCookieJar: The session and CSRF cookies.
+        """
+        session = requests.Session()
+        login_url = f"{url}/accounts/login/"
+        session.get(login_url)
+        response = session.post(login_url, data={
+            "login": username,
+            "password": password,
+            "csrfmiddlewaretoken": session.cookies.get("csrftoken"),
+        }, headers={"Referer": login_url}, allow_redirects=False)
+        if "sessionid" not in session.cookies:
+            raise CommandError(
+                f"Could not log in (status {response.status_code}).")
+        return session.cookies
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError(
+                "--requests and --concurrency must be positive.")
+        url = options["url"].rstrip("/")
+        cookies = self.login(url, options["username"], options["password"])
+        recipe_ids = [int(i) for i in options["recipe_ids"].split(",") if i]
+        headers = {"X-CSRFToken": cookies.get("csrftoken"), "Referer": url}
+        local = threading.local()
+
+        def send(_):
+            # one connection per client thread
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+                local.session.cookies.update(cookies)
+            recipe_id = random.choice(recipe_ids)
+            if random.random() < 0.5:
+                path = "/add-update-rating/"
+                data = {"recipeId": recipe_id, "rating": random.randint(1, 5)}
+            else:
+                path = "/add-remove-favourite/"
+                data = {"recipeId": recipe_id}
+            start = time.perf_counter()
+            response = local.session.post(
+                url + path, json=data, headers=headers)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            results = list(executor.map(send, range(options["requests"])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _ in results)
+        errors = sum(1 for _, status in results if status != 200)
+        self.stdout.write(
+            f"{len(results)} requests with {options['concurrency']} clients "
+            f"in {elapsed:.2f}s: {len(results) / elapsed:.1f} requests/s")
+        self.stdout.write(
+            f"latency p50 {statistics.median(latencies) * 1000:.1f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms, "
+            f"max {latencies[-1] * 1000:.1f}ms")
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{errors} failed requests"))
@@ -0,0 +1,33 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from recipe_book.assets import build_bundles
+
+
+class Command(BaseCommand):
+    """
+    Management command building the static assets for deployment: bundles
+    the JavaScript of each page and minifies the bundles and the stylesheet
+    (see recipe_book/assets.py), then runs collectstatic, which fingerprints
+    all static files and writes their gzip and brotli variants. Runs offline.
+    """
+    help = (
+        "Bundles and minifies the JavaScript and CSS, then collects, "
+        "fingerprints and compresses the static files.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-minify", action="store_true",
+            help="Bundle the assets without minifying them.")
+        parser.add_argument(
+            "--no-collectstatic", action="store_true",
+            help="Only build the bundles, without running collectstatic.")
+
+    def handle(self, *args, **options):
+        for path, size, built_size in build_bundles(
+                minified=not options["no_minify"]):
+            self.stdout.write(f"{path}: {size} -> {built_size} bytes")
+        if not options["no_collectstatic"]:
+            call_command(
+                "collectstatic", interactive=False,
+                verbosity=options["verbosity"])
+        self.stdout.write(self.style.SUCCESS("Built the static assets."))
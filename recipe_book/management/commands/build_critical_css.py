@@ -0,0 +1,152 @@
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+import dj_database_url
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+from django.test import Client, override_settings
+from django.urls import reverse
+from recipe_book.critical_css import (
+    CRITICAL_PAGES, PROJECT_STYLESHEET, ElementIndex, extract_critical,
+    find_script_classes, find_unused_selectors, parse_page, read_stylesheets,
+    remove_critical_css, split_at_fold, write_critical_css)
+from recipe_book.models import Recipe
+
+# Only the elements of the pages are used, so static URLs are not hashed and
+# the pages render before collectstatic
+RENDER_STORAGES = {
+    **settings.STORAGES,
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+# The pages are rendered from the sample recipes of this fixture, in a
+# scratch database, with a cache of their own
+SAMPLE_FIXTURE = "critical_css"
+RENDER_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "critical-css",
+    },
+}
+
+
+@contextmanager
+def sample_database():
+    """
+    Replaces the default database with a scratch SQLite database holding the
+    sample recipes, so the pages render without the live database, e.g.
+    while building before the release migrates it.
+    """
+    live = connections[DEFAULT_DB_ALIAS]
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "sample.sqlite3"
+        database = connections.configure_settings({
+            DEFAULT_DB_ALIAS: dj_database_url.parse(f"sqlite:///{path}"),
+        })[DEFAULT_DB_ALIAS]
+        connections[DEFAULT_DB_ALIAS] = load_backend(
+            database["ENGINE"]).DatabaseWrapper(database, DEFAULT_DB_ALIAS)
+        try:
+            with override_settings(DATABASE_REPLICAS=[]):
+                call_command("migrate", verbosity=0, interactive=False)
+                call_command("loaddata", SAMPLE_FIXTURE, verbosity=0)
+                yield
+        finally:
+            connections[DEFAULT_DB_ALIAS].close()
+            connections[DEFAULT_DB_ALIAS] = live
+
+
+class Command(BaseCommand):
+    """
+    Management command extracting the critical (above the fold) CSS of the
+    pages in CRITICAL_PAGES, which the pages inline while loading the full
+    stylesheets asynchronously (see recipe_book/critical_css.py). The pages
+    are rendered for an anonymous user from the sample recipes of the
+    critical_css fixture, in a scratch database, so it runs without the
+    live database. A page that cannot be rendered gets no critical CSS and
+    loads the stylesheets as before, with a warning. It also reports the
+    selectors of the project's stylesheet that no longer match anything.
+    """
+    help = (
+        "Extracts the critical CSS of the pages and reports unused "
+        "selectors.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recipe", help="Slug of the sample recipe to render the recipe "
+            "page for, the latest published recipe by default.")
+        parser.add_argument(
+            "--fail-unused", action="store_true",
+            help="Fail if the project's stylesheet has unused selectors.")
+
+    def get_url(self, url_name, slug):
+        if url_name != "recipe_detail":
+            return reverse(url_name)
+        if not slug:
+            recipe = Recipe.objects.filter(status=1).order_by(
+                "-created_on").only("slug").first()
+            if recipe is None:
+                raise CommandError(
+                    "There is no published recipe to render the recipe "
+                    "page for.")
+            slug = recipe.slug
+        return reverse(url_name, kwargs={"slug": slug})
+
+    def render_page(self, client, url_name, slug):
+        """
+        Renders a page for an anonymous user.
+
+        Returns:
+            tuple: The URL and the HTML of the page.
+
+        Raises:
+            CommandError: If the page cannot be rendered.
+        """
+        url = self.get_url(url_name, slug)
+        with override_settings(
+                ALLOWED_HOSTS=["testserver"], STORAGES=RENDER_STORAGES,
+                CACHES=RENDER_CACHES):
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(
+                f"Could not render {url} (status {response.status_code}).")
+        return url, response.content.decode()
+
+    def handle(self, *args, **options):
+        stylesheets = read_stylesheets()
+        self.stdout.write(
+            f"Stylesheets: {', '.join(name for name, _ in stylesheets)}")
+        client = Client()
+        page_indexes = []
+        with sample_database():
+            for page, (url_name, fold, count) in CRITICAL_PAGES.items():
+                try:
+                    url, html = self.render_page(
+                        client, url_name, options["recipe"])
+                except Exception as error:
+                    remove_critical_css(page)
+                    self.stderr.write(self.style.WARNING(
+                        f"{page}: no critical CSS, {error}"))
+                    continue
+                elements = parse_page(html)
+                page_indexes.append(ElementIndex(elements))
+                above_fold = ElementIndex(
+                    split_at_fold(elements, fold, count))
+                css = "".join(
+                    extract_critical(rules, above_fold)
+                    for _, rules in stylesheets)
+                write_critical_css(page, css)
+                self.stdout.write(f"{page} ({url}): {len(css)} bytes")
+
+        rules = dict(stylesheets)[PROJECT_STYLESHEET]
+        unused = find_unused_selectors(
+            rules, page_indexes, find_script_classes())
+        for selector in unused:
+            self.stdout.write(self.style.WARNING(f"Unused: {selector}"))
+        if unused and options["fail_unused"]:
+            raise CommandError(
+                f"{len(unused)} unused selectors in {PROJECT_STYLESHEET}.")
+        self.stdout.write(self.style.SUCCESS("Built the critical CSS."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from recipe_book.icons import (
+    build_sprite, find_icon_names, get_sprite_path, write_sprite)
+
+
+class Command(BaseCommand):
+    """
+    Management command generating the SVG icon sprite included by base.html
+    from the icons referenced by the templates and scripts (see
+    recipe_book/icons.py). With --check, it only checks that the sprite is
+    up to date, e.g. before deploying.
+    """
+    help = "Generates the SVG icon sprite of the icons used by the project."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Fail if the sprite is not up to date, without writing it.")
+
+    def handle(self, *args, **options):
+        try:
+            if options["check"]:
+                sprite = build_sprite(find_icon_names())
+                path = get_sprite_path()
+                if not path.exists() or path.read_text(
+                        encoding="utf-8") != sprite:
+                    raise CommandError(
+                        "The icon sprite is not up to date, run "
+                        "build_icon_sprite.")
+                self.stdout.write(self.style.SUCCESS(
+                    "The icon sprite is up to date."))
+                return
+            names = write_sprite()
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated the icon sprite with {len(names)} icons: "
+            f"{', '.join(names)}."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from recipe_book.models import Recipe
+
+# Keys of the image variants added by Recipe.add_image_preview()
+PREVIEW_KEYS = ("preview", "width", "height")
+
+
+class Command(BaseCommand):
+    """
+    Management command adding the inline preview and the dimensions of the
+    image to every recipe without them, e.g. recipes saved before previews
+    were built, or whose preview could not be downloaded.
+    """
+    help = "Builds the inline image previews and dimensions of all recipes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Build the previews of recipes which have one.")
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.only("image_variants")
+        count = 0
+        for recipe in recipes.iterator():
+            variants = recipe.image_variants
+            if options["force"] and "preview" in variants:
+                Recipe.objects.filter(pk=recipe.pk).update(image_variants={
+                    key: value for key, value in variants.items()
+                    if key not in PREVIEW_KEYS})
+            if Recipe.add_image_preview(recipe.pk):
+                count += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Built the image previews of {count} recipes."))
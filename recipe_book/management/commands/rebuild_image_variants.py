@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from recipe_book.cache import RECIPES_VERSION, bump_version
+from recipe_book.images import update_image_variants
+from recipe_book.models import Recipe
+
+
+class Command(BaseCommand):
+    """
+    Management command building the image variants of every recipe, e.g.
+    after switching the image backend or changing the variant widths in
+    recipe_book/images.py. Only recipes whose variants change are updated,
+    with queryset updates, so their update time is kept. Recipes whose image
+    cannot be read are reported and skipped. Cached pages are invalidated if
+    any recipe changed. Runs on every deploy (see bin/release).
+    """
+    help = "Builds the image variants of all recipes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Build the variants of images which did not change.")
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.only("feature_image", "image_variants")
+        count = 0
+        for recipe in recipes.iterator():
+            if options["force"]:
+                recipe.image_variants = {}
+            try:
+                changed = update_image_variants(recipe)
+            except OSError as error:
+                # e.g. an image missing from the local media storage
+                self.stderr.write(f"Skipped recipe {recipe.pk}: {error}")
+                continue
+            if changed:
+                Recipe.objects.filter(pk=recipe.pk).update(
+                    image_variants=recipe.image_variants)
+                count += 1
+        if count:
+            bump_version(RECIPES_VERSION)
+        self.stdout.write(self.style.SUCCESS(
+            f"Built the image variants of {count} recipes."))
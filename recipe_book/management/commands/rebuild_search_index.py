@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from recipe_book.models import Recipe
+from recipe_book.search import build_search_document, get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Management command rebuilding the search document and full-text search
+    index entry of every recipe, e.g. after recipes were changed with
+    queryset updates, which bypass Recipe.save() and its signals.
+    """
+    help = "Rebuilds the full-text search index of all recipes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", default="default",
+            help="The database alias to rebuild the index in.")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        backend = get_search_backend(using)
+        recipes = Recipe.objects.using(using).only(
+            "title", "teaser", "ingredients", "content_text",
+            "search_document")
+        count = 0
+        for recipe in recipes.iterator():
+            document = build_search_document(recipe)
+            if document != recipe.search_document:
+                recipe.search_document = document
+                Recipe.objects.using(using).filter(pk=recipe.pk).update(
+                    search_document=document)
+            backend.update_index(recipe)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt the search index of {count} recipes."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from recipe_book.features import refresh_features
+
+
+class Command(BaseCommand):
+    """
+    Management command computing and caching the home page feature lists,
+    e.g. run on a schedule, so requests rarely find them stale.
+    """
+    help = "Refreshes the cached home page feature lists."
+
+    def handle(self, *args, **options):
+        features = refresh_features()
+        count = sum(len(recipes) for recipes in features.values())
+        self.stdout.write(
+            self.style.SUCCESS(f"Cached feature lists with {count} recipes."))
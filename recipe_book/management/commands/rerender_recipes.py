@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from recipe_book.cache import RECIPES_VERSION, bump_version
+from recipe_book.models import Recipe
+from recipe_book.rendering import RENDERED_FIELDS, render_recipe
+from recipe_book.search import build_search_document, get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Management command rendering the stored HTML and text of every recipe
+    again, e.g. after the sanitizing rules in recipe_book/rendering.py
+    changed. Only recipes whose rendered fields change are updated, with
+    queryset updates, so their update time is kept. Cached pages are
+    invalidated if any recipe changed.
+    """
+    help = "Renders the stored HTML and text of all recipes again."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", default="default",
+            help="The database alias to render the recipes in.")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        backend = get_search_backend(using)
+        recipes = Recipe.objects.using(using).only(
+            "title", "teaser", "content", "ingredients", "search_document",
+            *RENDERED_FIELDS)
+        count = 0
+        for recipe in recipes.iterator():
+            if not render_recipe(recipe):
+                continue
+            recipe.search_document = build_search_document(recipe)
+            Recipe.objects.using(using).filter(pk=recipe.pk).update(
+                search_document=recipe.search_document,
+                **{field: getattr(recipe, field) for field in RENDERED_FIELDS})
+            backend.update_index(recipe)
+            count += 1
+        if count:
+            bump_version(RECIPES_VERSION)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rendered {count} changed recipes again."))
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.10 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+def calculate_rating_aggregates(apps, schema_editor):
+    """ Calculates the rating aggregates of recipes with existing ratings """
+    Recipe = apps.get_model('recipe_book', 'Recipe')
+    Rating = apps.get_model('recipe_book', 'Rating')
+    aggregates = {}
+    for recipe_id, rating in Rating.objects.values_list('recipe_id', 'rating'):
+        recipe = aggregates.setdefault(recipe_id, {
+            'ratings_count': 0, 'ratings_sum': 0, 'ratings_1': 0,
+            'ratings_2': 0, 'ratings_3': 0, 'ratings_4': 0, 'ratings_5': 0})
+        recipe['ratings_count'] += 1
+        recipe['ratings_sum'] += rating
+        recipe[f'ratings_{rating}'] += 1
+    for recipe_id, values in aggregates.items():
+        values['avg_rating'] = values['ratings_sum'] / values['ratings_count']
+        Recipe.objects.filter(pk=recipe_id).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_book', '0008_alter_comment_options_alter_recipe_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='avg_rating',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ratings_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ratings_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ratings_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ratings_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ratings_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ratings_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ratings_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            calculate_rating_aggregates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['status', '-avg_rating'], name='recipe_status_avg_rating_idx'),
+        ),
+    ]
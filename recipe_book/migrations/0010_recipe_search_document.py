@@ -0,0 +1,89 @@
+# Generated by Django 4.2.10 on 2026-10-18 10:12
+
+import re
+from html import unescape
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+# Frozen copies of the search helpers at the time of this migration, so
+# later changes to recipe_book/search.py do not change it
+SQLITE_FTS_TABLE = 'recipe_book_recipe_fts'
+
+
+def html_to_text(html):
+    """ Converts HTML to plain text, with whitespace collapsed """
+    text = unescape(strip_tags(re.sub(r"<", " <", html or "")))
+    return " ".join(text.split())
+
+
+def build_search_document(recipe):
+    """ Builds the search document from the teaser, ingredients and content """
+    return " ".join(
+        part for part in (
+            html_to_text(recipe.teaser),
+            html_to_text(recipe.ingredients),
+            html_to_text(recipe.content),
+        ) if part)
+
+
+def populate_search_documents(apps, schema_editor):
+    """ Builds the search document of existing recipes """
+    Recipe = apps.get_model('recipe_book', 'Recipe')
+    for recipe in Recipe.objects.only('teaser', 'ingredients', 'content'):
+        Recipe.objects.filter(pk=recipe.pk).update(
+            search_document=build_search_document(recipe))
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates the full-text search index of the database vendor: a generated,
+    GIN indexed tsvector column on PostgreSQL, and an FTS5 table on SQLite.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE recipe_book_recipe ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english'::regconfig, "
+            "coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english'::regconfig, "
+            "coalesce(search_document, '')), 'B')) STORED")
+        schema_editor.execute(
+            "CREATE INDEX recipe_search_vector_idx ON recipe_book_recipe "
+            "USING GIN (search_vector)")
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SQLITE_FTS_TABLE} USING fts5("
+            "title, search_document, "
+            "tokenize = 'porter unicode61 remove_diacritics 2')")
+        schema_editor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, title, search_document) "
+            "SELECT id, title, search_document FROM recipe_book_recipe")
+
+
+def drop_search_index(apps, schema_editor):
+    """ Drops the full-text search index created by create_search_index """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE recipe_book_recipe DROP COLUMN search_vector")
+    elif vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE {SQLITE_FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_book', '0009_recipe_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(
+            populate_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.10 on 2026-10-18 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_book', '0010_recipe_search_document'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recipe',
+            name='recipe_status_avg_rating_idx',
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['status', '-created_on', '-id'], name='recipe_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['status', '-avg_rating', '-id'], name='recipe_status_avg_rating_idx'),
+        ),
+    ]
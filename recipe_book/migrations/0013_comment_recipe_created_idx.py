@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-18 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_book', '0012_rating_previous_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['recipe', '-created_on', '-id'], name='comment_recipe_created_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.10 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+def count_approved_comments(apps, schema_editor):
+    """ Counts the approved comments of recipes with existing comments """
+    Recipe = apps.get_model('recipe_book', 'Recipe')
+    Comment = apps.get_model('recipe_book', 'Comment')
+    counts = Comment.objects.filter(approved=True).order_by().values(
+        'recipe_id').annotate(count=models.Count('id'))
+    for row in counts:
+        Recipe.objects.filter(pk=row['recipe_id']).update(
+            approved_comments_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_book', '0013_comment_recipe_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='approved_comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            count_approved_comments, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['status', '-approved_comments_count', '-id'], name='recipe_status_comments_idx'),
+        ),
+    ]
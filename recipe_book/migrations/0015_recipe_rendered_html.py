@@ -0,0 +1,161 @@
+# Generated by Django 4.2.10 on 2026-10-18 10:41
+
+import re
+from html import unescape
+from urllib.parse import urlsplit
+import bleach
+from bleach.css_sanitizer import CSSSanitizer
+from bleach.html5lib_shim import Filter
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+# Frozen copies of the rendering and search helpers at the time of this
+# migration, with the markup of the default Summernote toolbar, so later
+# changes to recipe_book/rendering.py, search.py and the toolbar do not
+# change it
+STYLE = ["style"]
+ALLOWED_TAGS = frozenset({
+    "a", "b", "blockquote", "br", "div", "em", "font", "h1", "h2", "h3", "h4",
+    "h5", "h6", "hr", "i", "iframe", "img", "li", "ol", "p", "pre", "s",
+    "span", "strike", "strong", "sub", "sup", "table", "tbody", "td", "th",
+    "thead", "tr", "u", "ul",
+})
+ALLOWED_ATTRIBUTES = {
+    "a": ["href", "target", "title"],
+    "font": ["color", "face", "size"],
+    "img": ["alt", "class", "data-filename", "src", "style"],
+    "table": ["class"],
+    "td": ["colspan", "rowspan", "style"],
+    "th": ["colspan", "rowspan", "style"],
+    **{tag: STYLE for tag in (
+        "blockquote", "div", "h1", "h2", "h3", "h4", "h5", "h6", "li", "p",
+        "pre", "span")},
+}
+VIDEO_ATTRIBUTES = frozenset({
+    "allowfullscreen", "class", "frameborder", "height", "src", "width"})
+VIDEO_HOSTS = frozenset({
+    "player.vimeo.com", "www.dailymotion.com", "www.youtube.com"})
+ALLOWED_STYLES = frozenset({
+    "background-color", "color", "float", "font-family", "font-size",
+    "line-height", "margin-left", "text-align", "width"})
+ALLOWED_PROTOCOLS = frozenset({"http", "https", "mailto"})
+DROPPED_ELEMENTS = re.compile(
+    r"<(script|style)\b.*?(</\1\s*>|$)", re.IGNORECASE | re.DOTALL)
+SQLITE_FTS_TABLE = 'recipe_book_recipe_fts'
+
+
+class StyleSanitizer(CSSSanitizer):
+    """ Sanitizes style attributes with their character references resolved """
+
+    def sanitize_css(self, style):
+        return super().sanitize_css(unescape(style))
+
+
+class EmptyStyleFilter(Filter):
+    """ Drops the style attributes left empty by the CSS sanitizer """
+
+    def __iter__(self):
+        for token in super().__iter__():
+            data = token.get("data")
+            if token["type"] in ("StartTag", "EmptyTag") and data:
+                style = (None, "style")
+                if style in data and not data[style].strip():
+                    del data[style]
+            yield token
+
+
+def allow_video_attribute(tag, name, value):
+    """ Allows the attributes of embedded videos from the video hosts """
+    if name != "src":
+        return name in VIDEO_ATTRIBUTES
+    url = urlsplit(value)
+    return url.scheme in ("", "https") and url.hostname in VIDEO_HOSTS
+
+
+def html_to_text(html):
+    """ Converts HTML to plain text, with whitespace collapsed """
+    text = unescape(strip_tags(re.sub(r"<", " <", html or "")))
+    return " ".join(text.split())
+
+
+def sanitize_html(html):
+    """
+    Sanitizes HTML, keeping only the allowed tags, attributes and styles,
+    and removing scripts and style sheets with their contents
+    """
+    cleaner = bleach.Cleaner(
+        tags=ALLOWED_TAGS,
+        attributes={**ALLOWED_ATTRIBUTES, "iframe": allow_video_attribute},
+        protocols=ALLOWED_PROTOCOLS,
+        css_sanitizer=StyleSanitizer(allowed_css_properties=ALLOWED_STYLES),
+        strip=True, strip_comments=True, filters=[EmptyStyleFilter])
+    return cleaner.clean(DROPPED_ELEMENTS.sub("", html or ""))
+
+
+def render_recipes(apps, schema_editor):
+    """
+    Renders the stored HTML and text of existing recipes, and rebuilds their
+    search document from the rendered text of the instructions.
+    """
+    Recipe = apps.get_model('recipe_book', 'Recipe')
+    recipes = Recipe.objects.only('teaser', 'content', 'ingredients')
+    for recipe in recipes.iterator():
+        content_html = sanitize_html(recipe.content)
+        content_text = html_to_text(content_html)
+        search_document = " ".join(
+            part for part in (
+                html_to_text(recipe.teaser),
+                html_to_text(recipe.ingredients),
+                content_text,
+            ) if part)
+        Recipe.objects.filter(pk=recipe.pk).update(
+            content_html=content_html,
+            ingredients_html=sanitize_html(recipe.ingredients),
+            content_text=content_text,
+            word_count=len(content_text.split()),
+            search_document=search_document)
+
+
+def rebuild_search_index(apps, schema_editor):
+    """
+    Rebuilds the SQLite FTS5 table from the new search documents. The
+    PostgreSQL search vector is generated from them by the database.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DELETE FROM {SQLITE_FTS_TABLE}")
+        schema_editor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, title, search_document) "
+            "SELECT id, title, search_document FROM recipe_book_recipe")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_book', '0014_recipe_approved_comments_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='content_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_recipes, migrations.RunPython.noop),
+        migrations.RunPython(
+            rebuild_search_index, migrations.RunPython.noop),
+    ]
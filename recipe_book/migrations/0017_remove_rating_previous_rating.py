@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-18 12:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_book', '0016_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='rating',
+            name='previous_rating',
+        ),
+    ]
@@ -1,8 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.contrib.auth.models import User
 from django.core.validators import MaxLengthValidator
 from .recipe import Recipe
 
+# Sent when comments are changed in bulk bypassing the model signals, with
+# the recipe_ids of the recipes of the changed comments
+comments_changed = Signal()
+
 
 class Comment(models.Model):
     """
@@ -21,9 +27,20 @@ class Comment(models.Model):
     Meta:
         ordering (list of str): Specifies the default ordering, by date and
         time of creation in descending order.
+        indexes (list): Index supporting the cursor pagination of the
+        comments of a recipe, by date and id in descending order.
 
     Methods:
         __str__: Returns a string representation of the comment.
+        from_db(db, field_names, values): Keeps the values loaded from the
+        database, so changes of the approval can be applied to the number of
+        approved comments of the recipe.
+        get_visible_comments(recipe_id, user): Returns the comments of a
+        recipe visible to a user.
+        update_approved_counts(recipe_ids): Recounts the approved comments of
+        recipes.
+        set_approved(queryset, approved): Approves or disapproves comments in
+        bulk.
     """
     recipe = models.ForeignKey(
         Recipe, on_delete=models.CASCADE, related_name='comments')
@@ -40,6 +57,90 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-created_on"]
+        indexes = [
+            models.Index(
+                fields=["recipe", "-created_on", "-id"],
+                name="comment_recipe_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.author} commented '{self.recipe}'"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Creates an instance from database values, keeping the loaded approval
+        and recipe id.
+
+        Returns:
+            Comment: The loaded Comment object.
+        """
+        instance = super().from_db(db, field_names, values)
+        loaded_values = dict(zip(field_names, values))
+        instance._loaded_approved = loaded_values.get("approved")
+        instance._loaded_recipe_id = loaded_values.get("recipe_id")
+        return instance
+
+    @classmethod
+    def get_visible_comments(cls, recipe_id, user):
+        """
+        Returns the comments of a recipe visible to a user: the approved
+        comments, and the user's own comments whether approved or not.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+            user (User): The user viewing the comments.
+
+        Returns:
+            QuerySet: The visible comments, loading only the fields shown on
+            the recipe page, with the username of the author annotated as
+            author_username, so no further queries are needed per comment.
+        """
+        visible = models.Q(approved=True)
+        if user.is_authenticated:
+            visible |= models.Q(author=user)
+        return cls.objects.filter(
+            visible, recipe_id=recipe_id
+        ).annotate(
+            author_username=models.F("author__username")
+        ).only("id", "author_id", "body", "approved", "created_on")
+
+    @classmethod
+    def update_approved_counts(cls, recipe_ids):
+        """
+        Recounts the approved comments of recipes and stores the counts on the
+        recipes, in a single UPDATE statement. Used after comments are changed
+        in bulk, which bypasses the signals maintaining the counts.
+
+        Args:
+            recipe_ids (iterable): The IDs of the recipes.
+        """
+        approved_count = cls.objects.filter(
+            recipe=models.OuterRef("pk"), approved=True
+        ).order_by().values("recipe").annotate(
+            count=models.Count("id")).values("count")
+        Recipe.objects.filter(pk__in=list(recipe_ids)).update(
+            approved_comments_count=Coalesce(
+                models.Subquery(approved_count), 0))
+
+    @classmethod
+    def set_approved(cls, queryset, approved):
+        """
+        Approves or disapproves the comments of a queryset in bulk, and
+        updates the number of approved comments of the affected recipes.
+
+        Args:
+            queryset (QuerySet): The comments to update.
+            approved (bool): True to approve the comments, False to disapprove
+            them.
+
+        Returns:
+            int: The number of comments changed.
+        """
+        with transaction.atomic():
+            changed = queryset.exclude(approved=approved)
+            recipe_ids = set(changed.values_list("recipe_id", flat=True))
+            count = changed.update(approved=approved)
+            cls.update_approved_counts(recipe_ids)
+        comments_changed.send(sender=cls, recipe_ids=recipe_ids)
+        return count
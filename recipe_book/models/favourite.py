@@ -1,8 +1,56 @@
-from django.db import models
+from array import array
+from asgiref.sync import sync_to_async
+from bisect import bisect_left
+from django.db import connections, models, router, transaction
 from django.contrib.auth.models import User
+from recipe_book.cache import (
+    bump_version, get_or_compute, make_key, user_version)
 from .recipe import Recipe
 
 
+class FavouriteIds:
+    """
+    Compact, sorted set of the recipe IDs favourited by a user, stored as an
+    array of 64-bit integers, so it takes 8 bytes per favourite in the cache.
+
+    Methods:
+        __contains__(recipe_id): Checks if a recipe ID is in the set, with a
+        binary search.
+        __iter__(): Iterates over the recipe IDs in ascending order.
+        __len__(): Returns the number of recipe IDs.
+        to_bytes(): Returns the set as bytes, for caching.
+        from_bytes(data): Creates the set from bytes returned by to_bytes().
+    """
+    def __init__(self, recipe_ids=()):
+        self.ids = array("q", sorted(recipe_ids))
+
+    def __contains__(self, recipe_id):
+        try:
+            recipe_id = int(recipe_id)
+        except (TypeError, ValueError):
+            return False
+        index = bisect_left(self.ids, recipe_id)
+        return index < len(self.ids) and self.ids[index] == recipe_id
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return f"<FavouriteIds {list(self.ids)}>"
+
+    def to_bytes(self):
+        return self.ids.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        favourite_ids = cls()
+        favourite_ids.ids.frombytes(data)
+        return favourite_ids
+
+
 class Favourite(models.Model):
     """
     Model representing the favourites of users for recipes.
@@ -22,13 +70,23 @@ class Favourite(models.Model):
         - is_recipe_favourite_by_ids(user_id, recipe_id): Checks if a recipe is
         marked as a favourite by a user, given user ID and recipe ID.
         - get_user_favourite_ids(user): Retrieves the IDs of recipes favourited
-        by a user.
+        by a user, cached per user.
+        - invalidate_user_favourite_ids(user_id): Invalidates the cached IDs
+        of recipes favourited by a user.
         - create_favourite(user_id, recipe_id): Create a Favourite object given
         a user id and recipe id, given that the favourite object does not
         already exist.
         - delete_favourite(user_id, recipe_id): Delete a Favourite object given
         a user id and recipe id, given that the favourite object exists.
+        - toggle_favourite(user_id, recipe_id): Removes a recipe from the
+        favourites of a user if it is a favourite, else adds it, using ids
+        only.
+        - atoggle_favourite(user_id, recipe_id): Async version of
+        toggle_favourite().
     """
+    # Number of seconds the favourite IDs of a user are cached
+    FAVOURITE_IDS_TIMEOUT = 60 * 60 * 24
+
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='favourite_user'
     )
@@ -90,18 +148,41 @@ class Favourite(models.Model):
     @classmethod
     def get_user_favourite_ids(cls, user):
         """
-        Retrieves the IDs of recipes favourited by a user.
+        Retrieves the IDs of recipes favourited by a user. The IDs are cached
+        per user, and invalidated when the favourites of the user change, so
+        the database is only queried after a change.
 
         Args:
             user (User): The user object.
 
         Returns:
-            list: A list of recipe IDs favourited by the user.
+            FavouriteIds: The sorted set of recipe IDs favourited by the user,
+            empty if the user is not authenticated.
         """
-        if user.is_authenticated:
-            return cls.objects.filter(
-                user=user).values_list('recipe', flat=True)
-        return []
+        if not user.is_authenticated:
+            return FavouriteIds()
+        # versioned by the user's state, so a value computed before a change
+        # is never cached under the current version
+        key = make_key(
+            "favourite_ids", user.id, version=user_version(user.id))
+        data = get_or_compute(
+            key,
+            lambda: FavouriteIds(cls.objects.filter(user=user).values_list(
+                'recipe_id', flat=True)).to_bytes(),
+            cls.FAVOURITE_IDS_TIMEOUT)
+        return FavouriteIds.from_bytes(data)
+
+    @classmethod
+    def invalidate_user_favourite_ids(cls, user_id):
+        """
+        Invalidates the cached IDs of recipes favourited by a user, after the
+        favourites of the user changed, by bumping the version of the user's
+        state. Pages showing the favourites are not reused either.
+
+        Args:
+            user_id (int): The id of the user.
+        """
+        bump_version(user_version(user_id))
 
     @classmethod
     def create_favourite(cls, user_id, recipe_id):
@@ -143,3 +224,73 @@ class Favourite(models.Model):
             favourite.delete()
             return True
         return False
+
+    @classmethod
+    def toggle_favourite(cls, user_id, recipe_id):
+        """
+        Removes a recipe from the favourites of a user if it is a favourite,
+        else adds it. The favourite is deleted with a DELETE ... RETURNING
+        statement, and if there was none, inserted with an INSERT ... ON
+        CONFLICT DO NOTHING statement, so concurrent toggles can not violate
+        the unique_favourite constraint. Both statements return the recipe
+        title, so no other queries are needed. Clears the cached favourite IDs
+        of the user.
+
+        Args:
+            user_id (int): The id of the user.
+            recipe_id (int): The id of the recipe.
+
+        Returns:
+            tuple: The action taken ("removed" or "created") and the title of
+            the recipe.
+
+        Raises:
+            Recipe.DoesNotExist: If the recipe does not exist.
+        """
+        table = cls._meta.db_table
+        recipe_table = Recipe._meta.db_table
+        title = f"(SELECT title FROM {recipe_table} WHERE id = %s)"
+        using = router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} "
+                    "WHERE user_id = %s AND recipe_id = %s "
+                    f"RETURNING {title}",
+                    [user_id, recipe_id, recipe_id])
+                row = cursor.fetchone()
+                action = "removed"
+                if row is None:
+                    # selecting the recipe id inserts nothing if it does not
+                    # exist
+                    cursor.execute(
+                        f"INSERT INTO {table} (user_id, recipe_id) "
+                        f"SELECT %s, id FROM {recipe_table} WHERE id = %s "
+                        "ON CONFLICT (user_id, recipe_id) DO NOTHING "
+                        f"RETURNING {title}",
+                        [user_id, recipe_id, recipe_id])
+                    row = cursor.fetchone()
+                    action = "created"
+        if row is not None:
+            # the favourites of the user changed
+            cls.invalidate_user_favourite_ids(user_id)
+            return action, row[0]
+
+        # a concurrent request added the favourite, or there is no recipe
+        return "created", Recipe.objects.values_list(
+            "title", flat=True).get(pk=recipe_id)
+
+    @classmethod
+    async def atoggle_favourite(cls, user_id, recipe_id):
+        """
+        Async version of toggle_favourite(). The transaction runs in a worker
+        thread, as the async ORM does not support transactions.
+
+        Returns:
+            tuple: The action taken and the title of the recipe, as returned
+            by toggle_favourite().
+
+        Raises:
+            Recipe.DoesNotExist: If the recipe does not exist.
+        """
+        return await sync_to_async(cls.toggle_favourite)(user_id, recipe_id)
@@ -1,7 +1,13 @@
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, connections, models, router, transaction
+from django.dispatch import Signal
 from django.contrib.auth.models import User
 from .recipe import Recipe
 
+# Sent when ratings are written with SQL bypassing the model signals, with
+# the user_id of the user and the recipe_id of the rated recipe
+rating_changed = Signal()
+
 
 class Rating(models.Model):
     """
@@ -19,12 +25,25 @@ class Rating(models.Model):
 
     Methods:
         - __str__(): Returns a string representation of the Rating object.
-        - get_recipe_avg_rating(recipe_id): Calculates the average rating for a
+        - from_db(db, field_names, values): Keeps the values loaded from the
+        database, so changes to the rating can be applied to the rating
+        aggregates of the recipe.
+        - get_recipe_avg_rating(recipe_id): Gets the average rating for a
         given recipe.
         - get_recipe_no_of_ratings(recipe_id): Gets the number of ratings for a
         given recipe.
         - get_user_rating_of_recipe(user_id, recipe_id): Retrieves the rating
         given by a specific user to a recipe.
+        - upsert_rating(user_id, recipe_id, rating): Creates or updates the
+        rating of a user for a recipe, and updates the rating aggregates of
+        the recipe, in one transaction.
+        - delete_rating(user_id, recipe_id): Deletes the rating of a user for
+        a recipe, and updates the rating aggregates of the recipe, in one
+        transaction.
+        - aupsert_rating(user_id, recipe_id, rating): Async version of
+        upsert_rating().
+        - adelete_rating(user_id, recipe_id): Async version of
+        delete_rating().
     """
     RATING_CHOICES = [
         (1, '1'),
@@ -58,27 +77,44 @@ class Rating(models.Model):
         """
         return f"{self.user} gave a rating of {self.rating} to '{self.recipe}'"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Creates an instance from database values, keeping the loaded rating
+        value and recipe id.
+
+        Credit: https://docs.djangoproject.com/en/4.2/ref/models/instances/#customizing-model-loading
+
+        Returns:
+            Rating: The loaded Rating object.
+        """
+        instance = super().from_db(db, field_names, values)
+        loaded_values = dict(zip(field_names, values))
+        instance._loaded_rating = loaded_values.get("rating")
+        instance._loaded_recipe_id = loaded_values.get("recipe_id")
+        return instance
+
     @classmethod
     def get_recipe_avg_rating(cls, recipe_id):
         """
-        Calculates the average rating for a given recipe.
+        Gets the average rating for a given recipe, from the rating aggregates
+        stored on the recipe.
 
         Args:
             recipe_id (int): The ID of the recipe.
 
         Returns:
-            float or None: The average rating of the recipe, or None if no
-            the recipe has no ratings.
+            float: The average rating of the recipe, or 0.0 if the recipe has
+            no ratings.
         """
-        ratings = cls.objects.filter(recipe=recipe_id)
-        return ratings.aggregate(
-            avg_rating=models.functions.Coalesce(
-                models.Avg('rating'), 0.0))['avg_rating']
+        return Recipe.objects.values_list(
+            'avg_rating', flat=True).get(pk=recipe_id)
 
     @classmethod
     def get_recipe_no_of_ratings(cls, recipe_id):
         """
-        Gets the number of ratings for a given recipe.
+        Gets the number of ratings for a given recipe, from the rating
+        aggregates stored on the recipe.
 
         Args:
             recipe_id (int): The ID of the recipe.
@@ -86,7 +122,8 @@ class Rating(models.Model):
         Returns:
             Integer: The number of ratings for a given recipe.
         """
-        return cls.objects.filter(recipe=recipe_id).count()
+        return Recipe.objects.values_list(
+            'ratings_count', flat=True).get(pk=recipe_id)
 
     @classmethod
     def get_user_rating_of_recipe(cls, user_id, recipe_id):
@@ -109,3 +146,122 @@ class Rating(models.Model):
             user_rating = None
 
         return user_rating
+
+    @classmethod
+    def upsert_rating(cls, user_id, recipe_id, rating):
+        """
+        Creates the rating of a user for a recipe with an INSERT ... ON
+        CONFLICT DO NOTHING statement, so concurrent requests can not both
+        create it. If it exists, it is read and locked until the end of the
+        transaction, then updated, so the replaced value is known. Then
+        updates the rating aggregates of the recipe, returning the updated
+        values, in the same transaction.
+
+        Args:
+            user_id (int): The ID of the user.
+            recipe_id (int): The ID of the recipe.
+            rating (int): The rating value, from 1 to 5.
+
+        Returns:
+            tuple: The replaced rating value (None if the rating was created),
+            and a dict with the title, ratings_count and avg_rating of the
+            recipe.
+
+        Raises:
+            Recipe.DoesNotExist: If the recipe does not exist.
+        """
+        table = cls._meta.db_table
+        using = router.db_for_write(cls)
+        ratings = cls.objects.using(using).filter(
+            user_id=user_id, recipe_id=recipe_id)
+        with transaction.atomic(using=using):
+            previous_rating = None
+            # again if the existing rating is deleted before it is locked
+            while True:
+                try:
+                    with connections[using].cursor() as cursor:
+                        cursor.execute(
+                            f"INSERT INTO {table} "
+                            "(user_id, recipe_id, rating) "
+                            "VALUES (%s, %s, %s) "
+                            "ON CONFLICT (user_id, recipe_id) DO NOTHING "
+                            "RETURNING id",
+                            [user_id, recipe_id, rating])
+                        created = cursor.fetchone() is not None
+                except IntegrityError:
+                    # foreign key violation (PostgreSQL checks it immediately)
+                    raise Recipe.DoesNotExist("Recipe does not exist.")
+                if created:
+                    break
+                previous_rating = ratings.select_for_update().values_list(
+                    "rating", flat=True).first()
+                if previous_rating is not None:
+                    ratings.update(rating=rating)
+                    break
+            recipe = Recipe.apply_rating_change(
+                recipe_id, new_rating=rating, old_rating=previous_rating)
+            if recipe is None:
+                # rolls back the rating
+                raise Recipe.DoesNotExist("Recipe does not exist.")
+        rating_changed.send(
+            sender=cls, user_id=user_id, recipe_id=recipe_id)
+        return previous_rating, recipe
+
+    @classmethod
+    def delete_rating(cls, user_id, recipe_id):
+        """
+        Deletes the rating of a user for a recipe with a single DELETE ...
+        RETURNING statement, then updates the rating aggregates of the recipe,
+        returning the updated values, in the same transaction.
+
+        Args:
+            user_id (int): The ID of the user.
+            recipe_id (int): The ID of the recipe.
+
+        Returns:
+            dict or None: The title, ratings_count and avg_rating of the
+            recipe, or None if the rating does not exist.
+        """
+        using = router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {cls._meta.db_table} "
+                    "WHERE user_id = %s AND recipe_id = %s RETURNING rating",
+                    [user_id, recipe_id])
+                row = cursor.fetchone()
+            if row is None:
+                return None
+            recipe = Recipe.apply_rating_change(
+                recipe_id, old_rating=row[0])
+        rating_changed.send(
+            sender=cls, user_id=user_id, recipe_id=recipe_id)
+        return recipe
+
+    @classmethod
+    async def aupsert_rating(cls, user_id, recipe_id, rating):
+        """
+        Async version of upsert_rating(). The transaction runs in a worker
+        thread, as the async ORM does not support transactions.
+
+        Returns:
+            tuple: The replaced rating value and the recipe aggregates, as
+            returned by upsert_rating().
+
+        Raises:
+            Recipe.DoesNotExist: If the recipe does not exist.
+        """
+        return await sync_to_async(cls.upsert_rating)(
+            user_id, recipe_id, rating)
+
+    @classmethod
+    async def adelete_rating(cls, user_id, recipe_id):
+        """
+        Async version of delete_rating(). The transaction runs in a worker
+        thread, as the async ORM does not support transactions.
+
+        Returns:
+            dict or None: The recipe aggregates, as returned by
+            delete_rating().
+        """
+        return await sync_to_async(cls.delete_rating)(user_id, recipe_id)
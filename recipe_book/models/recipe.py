@@ -1,7 +1,15 @@
-from django.db import models
+from functools import partial
+from django.db import connections, models, router, transaction
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 from django.contrib.auth.models import User
+from django.core.files.uploadedfile import UploadedFile
 from cloudinary.models import CloudinaryField
+from recipe_book.cache import RECIPES_VERSION, bump_version
+from recipe_book.images import (
+    run_in_background, store_upload, update_image_preview,
+    update_image_variants)
+from recipe_book.rendering import RENDERED_FIELDS, render_recipe
+from recipe_book.search import build_search_document
 
 
 class Recipe(models.Model):
@@ -16,6 +24,10 @@ class Recipe(models.Model):
     - author (ForeignKey to User): The user who authored the recipe.
     - feature_image (CloudinaryField): The image of the recipe.
     - alt_text (CharField): Alt-text for the feature image.
+    - image_variants (JSONField): The URLs of the card, hero, srcset and
+    placeholder variants of the feature image, its inline preview and its
+    dimensions, empty for the default image. Built automatically when the
+    image is set, see recipe_book/images.py.
     - content (TextField): The detailed content, including recipe instructions.
     Must be 100-5000 characters.
     - ingredients (TextField): Ingredients required for the recipe. Must be
@@ -30,6 +42,28 @@ class Recipe(models.Model):
     Default is 0 - "No category selected".
     - status (IntegerField): Status of the recipe (e.g., Draft, Published).
     Default is 0 - "Draft".
+    - ratings_count (PositiveIntegerField): The number of ratings the recipe
+    has received. Maintained automatically when ratings change.
+    - ratings_sum (PositiveIntegerField): The sum of all rating values of the
+    recipe. Maintained automatically when ratings change.
+    - avg_rating (FloatField): The average rating of the recipe, 0.0 if the
+    recipe has no ratings. Maintained automatically when ratings change.
+    - ratings_1 to ratings_5 (PositiveIntegerField): The number of 1 to 5 star
+    ratings of the recipe (rating histogram). Maintained automatically when
+    ratings change.
+    - approved_comments_count (PositiveIntegerField): The number of approved
+    comments of the recipe. Maintained automatically when comments change.
+    - search_document (TextField): Plain text of the teaser, ingredients and
+    content, indexed together with the title for full-text search. Set
+    automatically when the recipe is saved.
+    - content_html (TextField): The sanitized HTML of the content, shown on
+    the recipe page. Set automatically when the recipe is saved.
+    - ingredients_html (TextField): The sanitized HTML of the ingredients,
+    shown on the recipe page. Set automatically when the recipe is saved.
+    - content_text (TextField): The plain text of the content. Set
+    automatically when the recipe is saved.
+    - word_count (PositiveIntegerField): The number of words of the content.
+    Set automatically when the recipe is saved.
 
     Choices:
         CATEGORIES (tuple): Choices for the categories field.
@@ -38,9 +72,24 @@ class Recipe(models.Model):
     Meta:
         ordering (list): Specifies the default ordering for the model, by
         date/time in descending order.
+        indexes (list): Indexes supporting the sort options of published
+        recipes (by date, by rating and by comments), including the id to
+        match the ordering used by cursor pagination.
 
     Methods:
         __str__(): Returns a string representation of the Recipe object.
+        save(): Renders the stored HTML and text, updates the search document
+        and image variants, and saves the recipe.
+        ratings_histogram: Returns the number of ratings per star value.
+        cache_version: Returns a version identifying the current content and
+        rating aggregates of the recipe, for cached fragments.
+        apply_rating_change(recipe_id, new_rating, old_rating): Updates the
+        stored rating aggregates of a recipe after a rating is added, changed
+        or removed, returning the updated values.
+        apply_comment_change(recipe_id, change): Updates the stored number of
+        approved comments of a recipe.
+        add_image_preview(recipe_id): Adds the inline preview and dimensions
+        of the image to the image variants of a recipe.
     """
     # Choices for the categories and status fields
     CATEGORIES = (
@@ -74,6 +123,7 @@ class Recipe(models.Model):
     alt_text = models.CharField(
         max_length=125,
         default='This ia a placeholder image')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     content = models.TextField(validators=[
             MinLengthValidator(
                 100, message="The text must be at least 100 characters."),
@@ -98,9 +148,39 @@ class Recipe(models.Model):
     updated_on = models.DateTimeField(auto_now=True)
     category = models.IntegerField(choices=CATEGORIES, default=0)
     status = models.IntegerField(choices=STATUS, default=0)
+    # Rating aggregates, kept up to date by apply_rating_change()
+    ratings_count = models.PositiveIntegerField(default=0, editable=False)
+    ratings_sum = models.PositiveIntegerField(default=0, editable=False)
+    avg_rating = models.FloatField(default=0.0, editable=False)
+    ratings_1 = models.PositiveIntegerField(default=0, editable=False)
+    ratings_2 = models.PositiveIntegerField(default=0, editable=False)
+    ratings_3 = models.PositiveIntegerField(default=0, editable=False)
+    ratings_4 = models.PositiveIntegerField(default=0, editable=False)
+    ratings_5 = models.PositiveIntegerField(default=0, editable=False)
+    # Kept up to date by apply_comment_change()
+    approved_comments_count = models.PositiveIntegerField(
+        default=0, editable=False)
+    # Plain text for full-text search, see recipe_book/search.py
+    search_document = models.TextField(blank=True, editable=False)
+    # Rendered from content and ingredients, see recipe_book/rendering.py
+    content_html = models.TextField(blank=True, editable=False)
+    ingredients_html = models.TextField(blank=True, editable=False)
+    content_text = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-created_on"]
+        indexes = [
+            models.Index(
+                fields=["status", "-created_on", "-id"],
+                name="recipe_status_created_idx"),
+            models.Index(
+                fields=["status", "-avg_rating", "-id"],
+                name="recipe_status_avg_rating_idx"),
+            models.Index(
+                fields=["status", "-approved_comments_count", "-id"],
+                name="recipe_status_comments_idx"),
+        ]
 
     def __str__(self):
         """
@@ -110,3 +190,171 @@ class Recipe(models.Model):
             str: The recipe title.
         """
         return self.title
+
+    def save(self, *args, **kwargs):
+        """
+        Renders the sanitized HTML and plain text of the content and
+        ingredients, updates the search document from the teaser,
+        ingredients and content, and the image variants if the image
+        changed, then saves the recipe. The inline preview of a changed
+        image is built in the background after the recipe is committed.
+        """
+        render_recipe(self)
+        self.search_document = build_search_document(self)
+        store_upload(self)
+        # a new image is uploaded to Cloudinary by the field while saving,
+        # so its variants are built after saving
+        uploading = isinstance(self.feature_image, UploadedFile)
+        image_changed = not uploading and update_image_variants(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields, "search_document", "image_variants",
+                *RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+        if uploading and update_image_variants(self):
+            type(self)._base_manager.using(self._state.db).filter(
+                pk=self.pk).update(image_variants=self.image_variants)
+            image_changed = True
+        if image_changed:
+            # may download from Cloudinary, so in the background once the
+            # recipe is committed
+            transaction.on_commit(
+                partial(run_in_background, type(self).add_image_preview,
+                        self.pk),
+                using=self._state.db)
+
+    @property
+    def ratings_histogram(self):
+        """
+        Returns the number of ratings per star value.
+
+        Returns:
+            dict: Star values (1-5) mapped to the number of such ratings.
+        """
+        return {
+            stars: getattr(self, f"ratings_{stars}") for stars in range(1, 6)
+        }
+
+    @property
+    def cache_version(self):
+        """
+        Returns a version identifying the current content, rating aggregates
+        and comment count of the recipe. It changes when the recipe (or its
+        image) is saved, as that sets updated_on, and when a rating or comment
+        changes, as the aggregates are updated without saving the recipe.
+
+        Returns:
+            str: The version.
+        """
+        return (
+            f"{self.updated_on.timestamp()}-"
+            f"{self.ratings_count}-{self.ratings_sum}-"
+            f"{self.approved_comments_count}")
+
+    @classmethod
+    def apply_rating_change(cls, recipe_id, new_rating=None, old_rating=None):
+        """
+        Updates the stored rating aggregates of a recipe after a rating is
+        added (only new_rating given), changed (both given) or removed (only
+        old_rating given), and returns the title and the updated rating count
+        and average. The update is done in a single UPDATE ... RETURNING
+        statement relative to the stored values, so concurrent rating changes
+        do not overwrite each other.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+            new_rating (int or None): The new rating value.
+            old_rating (int or None): The rating value being replaced/removed.
+
+        Returns:
+            dict or None: The title, ratings_count and avg_rating of the
+            recipe, or None if the recipe does not exist.
+        """
+        if new_rating is not None:
+            new_rating = int(new_rating)
+        if old_rating is not None:
+            old_rating = int(old_rating)
+        count_change = (new_rating is not None) - (old_rating is not None)
+        sum_change = (new_rating or 0) - (old_rating or 0)
+        histogram_changes = {}
+        if old_rating is not None:
+            histogram_changes[old_rating] = -1
+        if new_rating is not None:
+            # a changed rating with the same value leaves the histogram as is
+            histogram_changes[new_rating] = (
+                histogram_changes.get(new_rating, 0) + 1)
+
+        # all expressions refer to the values before the update
+        assignments = [
+            "ratings_count = ratings_count + %s",
+            "ratings_sum = ratings_sum + %s",
+            "avg_rating = CASE WHEN ratings_count + %s > 0 "
+            "THEN (ratings_sum + %s) * 1.0 / (ratings_count + %s) "
+            "ELSE 0.0 END",
+        ]
+        params = [
+            count_change, sum_change, count_change, sum_change, count_change]
+        for stars, change in histogram_changes.items():
+            if change:
+                assignments.append(f"ratings_{stars} = ratings_{stars} + %s")
+                params.append(change)
+
+        using = router.db_for_write(cls)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {cls._meta.db_table} SET {', '.join(assignments)} "
+                "WHERE id = %s RETURNING title, ratings_count, avg_rating",
+                params + [recipe_id])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        title, ratings_count, avg_rating = row
+        # SQLite may return a whole number average as an integer
+        return {
+            "title": title,
+            "ratings_count": ratings_count,
+            "avg_rating": float(avg_rating),
+        }
+
+    @classmethod
+    def apply_comment_change(cls, recipe_id, change):
+        """
+        Updates the stored number of approved comments of a recipe after an
+        approved comment is added or removed, or a comment is approved or
+        disapproved, relative to the stored value in a single UPDATE.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+            change (int): The change of the number of approved comments.
+        """
+        if change:
+            cls.objects.filter(pk=recipe_id).update(
+                approved_comments_count=models.F(
+                    "approved_comments_count") + change)
+
+    @classmethod
+    def add_image_preview(cls, recipe_id):
+        """
+        Adds the inline preview and the dimensions of the image to the image
+        variants of a recipe, unless it has no image or they were added
+        already. Invalidates the cached pages if they were added.
+
+        Args:
+            recipe_id (int): The ID of the recipe.
+
+        Returns:
+            bool: True if the preview was added.
+        """
+        recipe = cls.objects.filter(pk=recipe_id).only(
+            "feature_image", "image_variants").first()
+        if recipe is None or not update_image_preview(recipe):
+            return False
+        # unless the image changed meanwhile
+        updated = cls.objects.filter(
+            pk=recipe_id,
+            image_variants__source=recipe.image_variants["source"],
+        ).update(image_variants=recipe.image_variants)
+        if updated:
+            bump_version(RECIPES_VERSION)
+        return bool(updated)
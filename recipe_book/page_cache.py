@@ -0,0 +1,107 @@
+"""
+Full-page cache for anonymous visitors.
+
+Pages of anonymous visitors without a session are the same for all of them,
+so their responses are cached under the path and the normalised query
+string. The cache keys include the versions of the set of recipes and of
+their ratings and comments (see recipe_book/cache.py), so cached pages are
+invalidated when a recipe is saved or a rating or comment changes, and the
+version of the assets and templates, so a deploy renders them again. Cached
+pages contain no CSRF token (templates render it for authenticated users
+only), and a cache hit answers without touching the database.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from .assets import get_assets_version
+from .cache import RECIPES_VERSION, RECIPE_STATS_VERSION, get_version, make_key
+from .replicas import use_primary
+
+# Number of seconds a page is cached for anonymous visitors
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+
+def is_anonymous_request(request):
+    """
+    Returns True if a request is from an anonymous visitor without a
+    session, which is known from the cookies alone, without loading the
+    session or user from the database.
+
+    Args:
+        request (HttpRequest): The request.
+
+    Returns:
+        bool: True if the request can be answered from the page cache.
+    """
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES)
+
+
+def get_page_cache_key(request):
+    """
+    Builds the page cache key of a request, from its path and the query
+    parameters sorted by name, so the same parameters in another order give
+    the same key.
+
+    Args:
+        request (HttpRequest): The request.
+
+    Returns:
+        str: The cache key.
+    """
+    return make_key(
+        "page", request.path, sorted(request.GET.lists()),
+        get_version(RECIPE_STATS_VERSION), get_assets_version(),
+        version=RECIPES_VERSION)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Mixin for views serving pages to anonymous visitors from the page cache,
+    and caching the pages rendered for them. Must come before
+    ConditionalGetMixin, so cached pages are revalidated with their stored
+    ETag instead of computing it again.
+
+    Attributes:
+        page_cache_timeout (int): Number of seconds to cache pages for.
+
+    Methods:
+        get(request, *args, **kwargs): Returns the cached page, or renders
+        and caches it.
+    """
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the cached page for an anonymous visitor (or 304 Not
+        Modified if the visitor has it), else renders the page from the
+        primary database, caching it for anonymous visitors.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        if not is_anonymous_request(request):
+            return super().get(request, *args, **kwargs)
+        key = get_page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            not_modified = get_conditional_response(
+                request, etag=response.get("ETag"))
+            return not_modified or response
+
+        # pages to cache are read from the primary, as a lagging replica
+        # would keep an invalidated page in the cache for the whole timeout
+        with use_primary():
+            response = super().get(request, *args, **kwargs)
+            if response.status_code == 200:
+                def cache_response(rendered):
+                    # a response setting cookies is specific to the visitor
+                    if not rendered.cookies:
+                        cache.set(key, rendered, self.page_cache_timeout)
+                if hasattr(response, "add_post_render_callback"):
+                    response.add_post_render_callback(cache_response)
+                    response.render()
+                else:
+                    cache_response(response)
+        return response
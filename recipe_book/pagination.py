@@ -0,0 +1,326 @@
+import base64
+import json
+from collections.abc import Sequence
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+from .cache import get_or_compute
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator which counts the objects at most once per request, caches the
+    count for repeated identical queries, and can cap the count for very
+    large result sets.
+
+    Attributes:
+        count_cache_key (str or None): The cache key of the count. The count
+        is not cached if None.
+        count_timeout (int): Number of seconds to cache the count for.
+        max_count (int or None): The highest number of objects to count. If
+        there are more, count is max_count and count_capped is True.
+
+    Methods:
+        count: Returns the (possibly cached and capped) number of objects.
+        count_capped: Returns True if there are more than max_count objects.
+    """
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count_cache_key=None,
+                 count_timeout=60 * 15, max_count=None):
+        super().__init__(
+            object_list, per_page, orphans, allow_empty_first_page)
+        self.count_cache_key = count_cache_key
+        self.count_timeout = count_timeout
+        self.max_count = max_count
+
+    @cached_property
+    def _count(self):
+        """
+        Returns the number of objects, capped at max_count + 1, so counting
+        stops early for very large result sets.
+
+        Returns:
+            int: The number of objects, at most max_count + 1.
+        """
+        object_list = self.object_list
+        if self.max_count is not None:
+            object_list = object_list[:self.max_count + 1]
+        if self.count_cache_key is None:
+            return object_list.count()
+        # concurrent requests for the same query count it once
+        return get_or_compute(
+            self.count_cache_key, object_list.count, self.count_timeout)
+
+    @cached_property
+    def count(self):
+        """
+        Returns the number of objects, at most max_count.
+
+        Returns:
+            int: The number of objects.
+        """
+        if self.count_capped:
+            return self.max_count
+        return self._count
+
+    @property
+    def count_capped(self):
+        """
+        Returns True if there are more objects than max_count.
+
+        Returns:
+            bool: True if the count is capped, else False.
+        """
+        return self.max_count is not None and self._count > self.max_count
+
+
+class KeysetPage(Sequence):
+    """
+    A page of objects from keyset (cursor) pagination. Unlike a Page, it has
+    no page number, but cursors pointing to the next and previous pages.
+
+    Attributes:
+        object_list (list): The objects on the page.
+        paginator (KeysetPaginator): The paginator of the page.
+        next_cursor (str or None): The cursor of the next page, if any.
+        previous_cursor (str or None): The cursor of the previous page, if
+        any.
+
+    Methods:
+        has_next(): Returns True if there is a next page.
+        has_previous(): Returns True if there is a previous page.
+        has_other_pages(): Returns True if there is a next or previous page.
+    """
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return "<Keyset page>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator(CachedCountPaginator):
+    """
+    Paginator supporting keyset (cursor) pagination in addition to numbered
+    pages. Instead of skipping the objects of previous pages with OFFSET, a
+    cursor page selects the objects after the last object of the previous
+    page in the ordering, which the database finds through an index, however
+    deep the page.
+
+    The ordering is given as a sequence of field names (optionally prefixed
+    with "-" for descending order), which must end with a unique field, e.g.
+    ("-created_on", "-id"). Cursors are opaque strings containing the values
+    of these fields for the first/last object of a page.
+
+    Methods:
+        cursor_page(cursor, ordering): Returns the page of objects following
+        (or preceding) the position of a cursor.
+        encode_cursor(values, backwards): Returns the cursor of a position.
+        decode_cursor(cursor): Returns the position of a cursor.
+    """
+    def cursor_page(self, cursor, ordering):
+        """
+        Returns the page of objects following the position of a cursor, or
+        preceding it for a previous page cursor. An empty cursor returns the
+        first page.
+
+        Args:
+            cursor (str): The cursor, or an empty string.
+            ordering (tuple): The field names to order the objects by.
+
+        Returns:
+            KeysetPage: The page of objects.
+
+        Raises:
+            Http404: If the cursor is invalid.
+        """
+        object_list = self.object_list
+        backwards = False
+        if cursor:
+            values, backwards = self.decode_cursor(cursor)
+            if len(values) != len(ordering):
+                raise Http404("Invalid cursor")
+            try:
+                object_list = object_list.filter(
+                    self._after(ordering, values, backwards))
+            except (ValidationError, ValueError, TypeError):
+                raise Http404("Invalid cursor")
+        if backwards:
+            ordering = [self._reverse(key) for key in ordering]
+        rows = list(object_list.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = bool(rows), has_more
+            ordering = [self._reverse(key) for key in ordering]
+        else:
+            has_next, has_previous = has_more, bool(cursor) and bool(rows)
+
+        next_cursor = previous_cursor = None
+        if has_next:
+            next_cursor = self.encode_cursor(
+                self._values(rows[-1], ordering), backwards=False)
+        if has_previous:
+            previous_cursor = self.encode_cursor(
+                self._values(rows[0], ordering), backwards=True)
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    @staticmethod
+    def encode_cursor(values, backwards=False):
+        """
+        Returns the cursor of a position in the ordering.
+
+        Args:
+            values (list): The values of the ordering fields at the position.
+            backwards (bool): True for a cursor of the objects before the
+            position, else False.
+
+        Returns:
+            str: The cursor.
+        """
+        # isoformat keeps the microseconds of datetimes, which are needed to
+        # find the exact position
+        data = json.dumps(
+            [values, backwards], default=lambda value: value.isoformat())
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Returns the position of a cursor.
+
+        Args:
+            cursor (str): The cursor.
+
+        Returns:
+            tuple: The values of the ordering fields, and True if the cursor
+            points backwards, else False.
+
+        Raises:
+            Http404: If the cursor is invalid.
+        """
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            values, backwards = json.loads(
+                base64.urlsafe_b64decode(cursor + padding))
+        except (ValueError, TypeError):
+            raise Http404("Invalid cursor")
+        if not isinstance(values, list) or not isinstance(backwards, bool):
+            raise Http404("Invalid cursor")
+        return values, backwards
+
+    @staticmethod
+    def _reverse(key):
+        return key[1:] if key.startswith("-") else "-" + key
+
+    @staticmethod
+    def _values(obj, ordering):
+        return [getattr(obj, key.lstrip("-")) for key in ordering]
+
+    @staticmethod
+    def _after(ordering, values, backwards):
+        """
+        Builds the filter selecting the objects after a position in the
+        ordering (or before it, if backwards), i.e. the objects greater than
+        the position in the first field, or equal in the first field and
+        greater in the second field, and so on.
+        """
+        condition = Q()
+        equal = Q()
+        for key, value in zip(ordering, values):
+            descending = key.startswith("-") != backwards
+            field = key.lstrip("-")
+            lookup = "lt" if descending else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        # the bound on the first field alone lets the database use the index
+        first = ordering[0]
+        lookup = "lte" if first.startswith("-") != backwards else "gte"
+        return Q(**{f"{first.lstrip('-')}__{lookup}": values[0]}) & condition
+
+
+class KeysetPaginationMixin:
+    """
+    Mixin for ListViews, opting in to keyset (cursor) pagination when the
+    request has a cursor parameter (an empty cursor for the first page).
+    Requests without one use numbered pages. The paginator_class must be a
+    KeysetPaginator.
+
+    Attributes:
+        cursor_kwarg (str): The name of the cursor request parameter.
+
+    Methods:
+        get_keyset_ordering(): Returns the ordering of the queryset.
+        paginate_queryset(queryset, page_size): Paginates the queryset by
+        cursor or page number.
+        get_context_data(**kwargs): Adds the request parameters to keep in
+        pagination links.
+    """
+    cursor_kwarg = "cursor"
+
+    def get_keyset_ordering(self):
+        """
+        Returns the ordering of the queryset, which must end with a unique
+        field. Views set keyset_ordering in get_queryset().
+
+        Returns:
+            tuple: The field names the queryset is ordered by.
+        """
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginates the queryset by cursor, if the request has a cursor
+        parameter, else by page number.
+
+        Returns:
+            tuple: The paginator, page, objects on the page and whether there
+            are other pages.
+        """
+        if self.cursor_kwarg not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        page = paginator.cursor_page(
+            self.request.GET[self.cursor_kwarg], self.get_keyset_ordering())
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds the request parameters to keep in pagination links (e.g. the
+        search query and sort) to the context, as a query string.
+
+        Returns:
+            dict: The context data.
+        """
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        params.pop(self.cursor_kwarg, None)
+        context['pagination_params'] = params.urlencode()
+        context['cursor_pagination'] = self.cursor_kwarg in self.request.GET
+        return context
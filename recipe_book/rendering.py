@@ -0,0 +1,213 @@
+"""
+Save-time rendering of recipe HTML.
+
+The content (instructions) and ingredients of a recipe are Summernote HTML.
+When a recipe is saved, they are sanitized with bleach and stored, together
+with the plain text of the instructions and its word count, so pages emit
+the stored strings without sanitizing or stripping them per request. The
+allowed markup is what the buttons of the configured Summernote toolbar
+produce. The rerender_recipes command renders all recipes again, e.g. after
+the toolbar changes.
+"""
+import re
+from functools import cache
+from html import unescape
+from urllib.parse import urlsplit
+import bleach
+from bleach.css_sanitizer import CSSSanitizer
+from bleach.html5lib_shim import Filter
+from django_summernote.utils import get_config
+from recipe_book.search import html_to_text
+
+# The tags, attributes and style properties each Summernote toolbar button
+# produces. Paragraphs, line breaks and links with their targets are always
+# allowed, and the code view adds nothing.
+BASE_TAGS = frozenset({"br", "div", "p", "span"})
+TOOLBAR_MARKUP = {
+    "style": {"tags": {
+        "blockquote", "h1", "h2", "h3", "h4", "h5", "h6", "pre"}},
+    "bold": {"tags": {"b", "strong"}},
+    "italic": {"tags": {"em", "i"}},
+    "underline": {"tags": {"u"}},
+    "superscript": {"tags": {"sup"}},
+    "subscript": {"tags": {"sub"}},
+    "strikethrough": {"tags": {"s", "strike"}},
+    "fontname": {
+        "tags": {"font"}, "attributes": {"font": ["face"]},
+        "styles": {"font-family"}},
+    "fontsize": {
+        "tags": {"font"}, "attributes": {"font": ["size"]},
+        "styles": {"font-size"}},
+    "color": {
+        "tags": {"font"}, "attributes": {"font": ["color"]},
+        "styles": {"background-color", "color"}},
+    "ul": {"tags": {"li", "ul"}},
+    "ol": {"tags": {"li", "ol"}},
+    "paragraph": {"styles": {"margin-left", "text-align"}},
+    "height": {"styles": {"line-height"}},
+    "table": {
+        "tags": {"table", "tbody", "td", "th", "thead", "tr"},
+        "attributes": {
+            "table": ["class"], "td": ["colspan", "rowspan"],
+            "th": ["colspan", "rowspan"]}},
+    "link": {
+        "tags": {"a"}, "attributes": {"a": ["href", "target", "title"]}},
+    "picture": {
+        "tags": {"img"},
+        "attributes": {"img": ["alt", "class", "data-filename", "src"]},
+        "styles": {"float", "width"}},
+    "video": {
+        "tags": {"iframe"},
+        "attributes": {"iframe": [
+            "allowfullscreen", "class", "frameborder", "height", "src",
+            "width"]}},
+    "hr": {"tags": {"hr"}},
+}
+# The elements Summernote sets style attributes on
+STYLED_TAGS = frozenset({
+    "blockquote", "div", "h1", "h2", "h3", "h4", "h5", "h6", "img", "li",
+    "p", "pre", "span", "td", "th"})
+ALLOWED_PROTOCOLS = frozenset({"http", "https", "mailto"})
+# The hosts of the embedded videos Summernote inserts
+VIDEO_HOSTS = frozenset({
+    "player.vimeo.com", "www.dailymotion.com", "www.youtube.com"})
+# The elements removed together with their contents
+DROPPED_ELEMENTS = re.compile(
+    r"<(script|style)\b.*?(</\1\s*>|$)", re.IGNORECASE | re.DOTALL)
+
+# The stored fields set by render_recipe()
+RENDERED_FIELDS = (
+    "content_html", "ingredients_html", "content_text", "word_count")
+
+
+@cache
+def allowed_markup():
+    """
+    Builds the allow-list of the sanitizer from the buttons of the
+    configured Summernote toolbar.
+
+    Returns:
+        tuple: The allowed tags, the allowed attributes by tag and the
+        allowed style properties.
+    """
+    toolbar = get_config()["summernote"]["toolbar"]
+    buttons = [button for _, group in toolbar for button in group]
+    tags = set(BASE_TAGS)
+    attributes = {}
+    styles = set()
+    for button in buttons:
+        markup = TOOLBAR_MARKUP.get(button, {})
+        tags |= markup.get("tags", set())
+        for tag, names in markup.get("attributes", {}).items():
+            attributes.setdefault(tag, set()).update(names)
+        styles |= markup.get("styles", set())
+    if styles:
+        for tag in STYLED_TAGS & tags:
+            attributes.setdefault(tag, set()).add("style")
+    return frozenset(tags), attributes, frozenset(styles)
+
+
+def allow_video_attribute(tag, name, value):
+    """
+    Allows the attributes of an embedded video, if its source is one of the
+    video hosts.
+
+    Args:
+        tag (str): The tag name, iframe.
+        name (str): The attribute name.
+        value (str): The attribute value.
+
+    Returns:
+        bool: True if the attribute is allowed.
+    """
+    if name not in allowed_markup()[1]["iframe"]:
+        return False
+    if name != "src":
+        return True
+    url = urlsplit(value)
+    return url.scheme in ("", "https") and url.hostname in VIDEO_HOSTS
+
+
+class StyleSanitizer(CSSSanitizer):
+    """
+    Sanitizes style attributes with their character references resolved,
+    as bleach passes them on as written, and Summernote quotes font names
+    with &quot;.
+
+    Methods:
+        sanitize_css: Sanitizes a style attribute value.
+    """
+
+    def sanitize_css(self, style):
+        return super().sanitize_css(unescape(style))
+
+
+class EmptyStyleFilter(Filter):
+    """
+    Drops the style attributes left empty by the CSS sanitizer.
+
+    Methods:
+        __iter__: Yields the tokens without the empty style attributes.
+    """
+
+    def __iter__(self):
+        for token in super().__iter__():
+            data = token.get("data")
+            if token["type"] in ("StartTag", "EmptyTag") and data:
+                style = (None, "style")
+                if style in data and not data[style].strip():
+                    del data[style]
+            yield token
+
+
+def sanitize_html(html):
+    """
+    Sanitizes HTML, keeping only the tags, attributes and style properties
+    the Summernote toolbar produces, and the allowed link protocols. Scripts
+    and style sheets are removed with their contents, and other tags are
+    stripped, keeping their text. Embedded videos are kept only from the
+    video hosts.
+
+    Args:
+        html (str): The HTML to sanitize.
+
+    Returns:
+        str: The sanitized HTML.
+    """
+    tags, attributes, styles = allowed_markup()
+    attributes = {tag: list(names) for tag, names in attributes.items()}
+    if "iframe" in attributes:
+        attributes["iframe"] = allow_video_attribute
+    cleaner = bleach.Cleaner(
+        tags=tags, attributes=attributes, protocols=ALLOWED_PROTOCOLS,
+        css_sanitizer=StyleSanitizer(allowed_css_properties=styles),
+        strip=True, strip_comments=True, filters=[EmptyStyleFilter])
+    return cleaner.clean(DROPPED_ELEMENTS.sub("", html or ""))
+
+
+def render_recipe(recipe):
+    """
+    Sets the stored rendered fields of a recipe from its content and
+    ingredients: the sanitized HTML of both, the plain text of the content,
+    and the number of words of the content.
+
+    Args:
+        recipe (Recipe): The recipe object, not saved.
+
+    Returns:
+        bool: True if any of the rendered fields changed.
+    """
+    content_html = sanitize_html(recipe.content)
+    content_text = html_to_text(content_html)
+    values = {
+        "content_html": content_html,
+        "ingredients_html": sanitize_html(recipe.ingredients),
+        "content_text": content_text,
+        "word_count": len(content_text.split()),
+    }
+    changed = False
+    for field, value in values.items():
+        if getattr(recipe, field) != value:
+            setattr(recipe, field, value)
+            changed = True
+    return changed
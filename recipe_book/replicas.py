@@ -0,0 +1,135 @@
+"""
+Read replica routing.
+
+Views marked with use_read_replica = True read the recipe book's data from
+a read replica (settings.DATABASE_REPLICAS) when answering GET and HEAD
+requests. All writes, and all other reads, use the primary (default)
+database. After a user sends a request that may write (e.g. a rating,
+favourite or comment), a short-lived cookie makes the user's reads use the
+primary, so the user sees their own writes before they reach the replicas.
+Values computed to be cached (see recipe_book/cache.py) are read from the
+primary, as a lagging replica would keep stale data in the cache after it
+was invalidated.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# Name of the cookie sending a user's reads to the primary after a write
+STICKY_COOKIE_NAME = "use_primary"
+
+# True while handling a request which may read from a replica
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def get_sticky_seconds():
+    """
+    Returns the number of seconds a user's reads use the primary after the
+    user sent a request that may write, REPLICA_STICKY_SECONDS in settings.
+
+    Returns:
+        int: The number of seconds.
+    """
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+
+
+@contextmanager
+def use_primary():
+    """
+    Context manager sending all reads within it to the primary, e.g. while
+    computing a value to cache, whether or not the request may read from a
+    replica.
+    """
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of recipe book models to a random read
+    replica while a replica is allowed for the current request, and all other
+    queries to the primary database.
+
+    Methods:
+        db_for_read(model, **hints): Returns a replica or the primary.
+        db_for_write(model, **hints): Returns the primary.
+        allow_relation(obj1, obj2, **hints): Allows relations between objects
+        of the primary and the replicas, which hold the same data.
+    """
+    route_app_labels = {"recipe_book"}
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if (replicas and _use_replica.get()
+                and model._meta.app_label in self.route_app_labels):
+            return random.choice(replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {"default", *getattr(settings, "DATABASE_REPLICAS", [])}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware allowing read replicas for GET and HEAD requests to views
+    marked with use_read_replica = True, unless the user recently sent a
+    request that may write. Sets the sticky cookie on responses to requests
+    that may write (all other methods). Supports both sync and async
+    requests, so it does not switch the request to a thread under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.set_sticky_cookie(request, response)
+
+    async def __acall__(self, request):
+        token = _use_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.set_sticky_cookie(request, response)
+
+    def set_sticky_cookie(self, request, response):
+        """
+        Sets the sticky cookie on the response to a request that may write.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            response.set_cookie(
+                STICKY_COOKIE_NAME, "1", max_age=get_sticky_seconds(),
+                httponly=True, samesite="Lax")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, "view_class", view_func)
+        _use_replica.set(
+            request.method in ("GET", "HEAD")
+            and getattr(view, "use_read_replica", False)
+            and STICKY_COOKIE_NAME not in request.COOKIES)
@@ -0,0 +1,203 @@
+"""
+Full-text search for recipes.
+
+Each recipe stores a plain text search document (teaser, ingredients and
+instructions without HTML), which is indexed together with the title:
+
+- PostgreSQL: a generated tsvector column (title weighted above the search
+document) with a GIN index, queried with prefix matching, English stemming
+and ts_rank relevance.
+- SQLite: an FTS5 table with the porter stemmer, queried with prefix matching
+and bm25 relevance. It is kept in sync with the recipe table by the recipe
+post_save/post_delete receivers.
+- Other databases: a plain icontains filter on the search document.
+
+The tables and indexes are created by migration 0010.
+"""
+import re
+from html import unescape
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+# Search terms beyond this number are ignored
+MAX_SEARCH_TERMS = 10
+
+SQLITE_FTS_TABLE = "recipe_book_recipe_fts"
+
+
+def html_to_text(html):
+    """
+    Converts HTML (e.g. Summernote content) to plain text.
+
+    Args:
+        html (str): The HTML to convert.
+
+    Returns:
+        str: The text content of the HTML, with whitespace collapsed.
+    """
+    # keep words in adjacent elements apart before stripping the tags
+    text = unescape(strip_tags(re.sub(r"<", " <", html or "")))
+    return " ".join(text.split())
+
+
+def build_search_document(recipe):
+    """
+    Builds the plain text search document of a recipe, from its teaser,
+    ingredients and instructions (the plain text rendered when the recipe is
+    saved, see recipe_book/rendering.py). The title is indexed separately.
+
+    Args:
+        recipe (Recipe): The recipe object.
+
+    Returns:
+        str: The search document.
+    """
+    return " ".join(
+        part for part in (
+            html_to_text(recipe.teaser),
+            html_to_text(recipe.ingredients),
+            recipe.content_text,
+        ) if part)
+
+
+def get_search_terms(query):
+    """
+    Splits a search query into lowercase search terms (words).
+
+    Args:
+        query (str): The search query.
+
+    Returns:
+        list: The search terms, at most MAX_SEARCH_TERMS.
+    """
+    return re.findall(r"\w+", query.lower())[:MAX_SEARCH_TERMS]
+
+
+class SearchBackend:
+    """
+    Fallback search backend, filtering on the search document with icontains.
+    Subclasses implement indexed search for a database vendor.
+
+    Methods:
+        search(queryset, terms): Filters the queryset to recipes matching all
+        the search terms, annotated with a relevance score (search_rank).
+        update_index(recipe): Updates the index entry of a saved recipe.
+        remove_from_index(recipe_id): Removes the index entry of a recipe.
+    """
+    def __init__(self, using):
+        self.using = using
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                models.Q(title__icontains=term) |
+                models.Q(search_document__icontains=term))
+        return queryset.annotate(search_rank=models.Value(
+            0.0, output_field=models.FloatField()))
+
+    def update_index(self, recipe):
+        pass
+
+    def remove_from_index(self, recipe_id):
+        pass
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Search backend using the GIN indexed search_vector column, which is
+    generated by PostgreSQL from the title and search document, so the index
+    needs no maintenance from the application.
+    """
+    def search(self, queryset, terms):
+        table = queryset.model._meta.db_table
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        matches = RawSQL(
+            f'"{table}"."search_vector" @@ '
+            "to_tsquery('english'::regconfig, %s)",
+            (tsquery,), output_field=models.BooleanField())
+        # ts_rank returns a real, cast to the double precision of Python
+        # floats, so the rank in a pagination cursor compares equal to it
+        rank = RawSQL(
+            f'ts_rank("{table}"."search_vector", '
+            "to_tsquery('english'::regconfig, %s))::double precision",
+            (tsquery,), output_field=models.FloatField())
+        return queryset.filter(matches).annotate(search_rank=rank)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Search backend using an FTS5 table with the title and search document of
+    each recipe, stored under the recipe id as rowid.
+    """
+    def search(self, queryset, terms):
+        table = queryset.model._meta.db_table
+        # quoted prefix terms, so user input is never parsed as FTS syntax
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        matching_ids = RawSQL(
+            f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s",
+            (fts_query,))
+        # bm25 is lower for better matches, the title weighs 10x the document
+        rank = RawSQL(
+            f"SELECT -bm25({SQLITE_FTS_TABLE}, 10.0, 1.0) "
+            f"FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s "
+            f'AND rowid = "{table}"."id"',
+            (fts_query,), output_field=models.FloatField())
+        return queryset.filter(id__in=matching_ids).annotate(search_rank=rank)
+
+    def update_index(self, recipe):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s",
+                [recipe.pk])
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE} "
+                "(rowid, title, search_document) VALUES (%s, %s, %s)",
+                [recipe.pk, recipe.title, recipe.search_document])
+
+    def remove_from_index(self, recipe_id):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s",
+                [recipe_id])
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using="default"):
+    """
+    Gets the search backend for a database connection.
+
+    Args:
+        using (str): The database alias.
+
+    Returns:
+        SearchBackend: The search backend for the database vendor.
+    """
+    vendor = connections[using].vendor
+    return SEARCH_BACKENDS.get(vendor, SearchBackend)(using)
+
+
+def search_recipes(queryset, query):
+    """
+    Filters a recipe queryset to the recipes matching a search query, and
+    annotates each with its relevance as search_rank (higher is better).
+    Every word of the query must match the start of a (stemmed) word in the
+    title, teaser, ingredients or instructions.
+
+    Args:
+        queryset (QuerySet): The Recipe queryset to search in.
+        query (str): The search query.
+
+    Returns:
+        QuerySet: The matching recipes, annotated with search_rank.
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return queryset.none()
+    return get_search_backend(queryset.db).search(queryset, terms)
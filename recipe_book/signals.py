@@ -0,0 +1,237 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .cache import (
+    RECIPES_VERSION, RECIPE_STATS_VERSION, bump_version,
+    recipe_comments_version, user_version)
+from .features import invalidate_features
+from .models import (
+    Recipe, Rating, Favourite, Comment, rating_changed, comments_changed)
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Rating)
+def update_rating_aggregates_on_save(sender, instance, created, **kwargs):
+    """
+    Applies a created or updated rating to the rating aggregates stored on the
+    rated recipe. If the rating was moved to another recipe, it is removed
+    from the aggregates of the previous recipe.
+
+    Args:
+        sender (Model): The Rating model class.
+        instance (Rating): The saved Rating object.
+        created (bool): True if the rating was created, else False.
+    """
+    old_rating = None
+    old_recipe_id = None
+    if not created:
+        old_rating = getattr(instance, "_loaded_rating", None)
+        old_recipe_id = getattr(instance, "_loaded_recipe_id", None)
+
+    if old_recipe_id is not None and old_recipe_id != instance.recipe_id:
+        Recipe.apply_rating_change(old_recipe_id, old_rating=old_rating)
+        Recipe.apply_rating_change(
+            instance.recipe_id, new_rating=instance.rating)
+    elif old_rating != int(instance.rating):
+        Recipe.apply_rating_change(
+            instance.recipe_id,
+            new_rating=instance.rating,
+            old_rating=old_rating)
+
+    # the saved values are now the stored values
+    instance._loaded_rating = int(instance.rating)
+    instance._loaded_recipe_id = instance.recipe_id
+
+
+@receiver(post_delete, sender=Rating)
+def update_rating_aggregates_on_delete(sender, instance, **kwargs):
+    """
+    Removes a deleted rating from the rating aggregates stored on the recipe.
+    Also called for ratings deleted through querysets and cascades.
+
+    Args:
+        sender (Model): The Rating model class.
+        instance (Rating): The deleted Rating object.
+    """
+    old_rating = getattr(instance, "_loaded_rating", None) or instance.rating
+    old_recipe_id = (
+        getattr(instance, "_loaded_recipe_id", None) or instance.recipe_id)
+    Recipe.apply_rating_change(old_recipe_id, old_rating=old_rating)
+
+
+@receiver(post_save, sender=Comment)
+def update_approved_comments_count_on_save(sender, instance, created,
+                                           **kwargs):
+    """
+    Applies a created, approved or disapproved comment to the number of
+    approved comments stored on the recipe. If the comment was moved to
+    another recipe, it is removed from the count of the previous recipe.
+
+    Args:
+        sender (Model): The Comment model class.
+        instance (Comment): The saved Comment object.
+        created (bool): True if the comment was created, else False.
+    """
+    old_approved = None
+    old_recipe_id = None
+    if not created:
+        old_approved = getattr(instance, "_loaded_approved", None)
+        old_recipe_id = getattr(instance, "_loaded_recipe_id", None)
+
+    if old_recipe_id is not None and old_recipe_id != instance.recipe_id:
+        Recipe.apply_comment_change(old_recipe_id, -int(bool(old_approved)))
+        Recipe.apply_comment_change(
+            instance.recipe_id, int(instance.approved))
+    elif old_approved is None:
+        if created:
+            Recipe.apply_comment_change(
+                instance.recipe_id, int(instance.approved))
+    elif old_approved != instance.approved:
+        Recipe.apply_comment_change(
+            instance.recipe_id, 1 if instance.approved else -1)
+
+    # the saved values are now the stored values
+    instance._loaded_approved = instance.approved
+    instance._loaded_recipe_id = instance.recipe_id
+
+
+@receiver(post_delete, sender=Comment)
+def update_approved_comments_count_on_delete(sender, instance, **kwargs):
+    """
+    Removes a deleted approved comment from the number of approved comments
+    stored on the recipe. Also called for comments deleted through querysets
+    and cascades.
+
+    Args:
+        sender (Model): The Comment model class.
+        instance (Comment): The deleted Comment object.
+    """
+    old_approved = getattr(instance, "_loaded_approved", None)
+    if old_approved is None:
+        old_approved = instance.approved
+    old_recipe_id = (
+        getattr(instance, "_loaded_recipe_id", None) or instance.recipe_id)
+    if old_approved:
+        Recipe.apply_comment_change(old_recipe_id, -1)
+
+
+@receiver(post_save, sender=Recipe)
+def update_search_index_on_save(sender, instance, using, **kwargs):
+    """
+    Updates the full-text search index entry of a saved recipe.
+
+    Args:
+        sender (Model): The Recipe model class.
+        instance (Recipe): The saved Recipe object.
+        using (str): The database alias the recipe was saved to.
+    """
+    get_search_backend(using).update_index(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def update_search_index_on_delete(sender, instance, using, **kwargs):
+    """
+    Removes a deleted recipe from the full-text search index.
+
+    Args:
+        sender (Model): The Recipe model class.
+        instance (Recipe): The deleted Recipe object.
+        using (str): The database alias the recipe was deleted from.
+    """
+    get_search_backend(using).remove_from_index(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_caches(sender, instance, **kwargs):
+    """
+    Invalidates cached values depending on the set of recipes, such as the
+    number of results of recipe searches and the home page feature lists,
+    when a recipe is saved or deleted.
+
+    Args:
+        sender (Model): The Recipe model class.
+        instance (Recipe): The saved or deleted Recipe object.
+    """
+    bump_version(RECIPES_VERSION)
+    invalidate_features()
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(rating_changed, sender=Rating)
+def invalidate_rating_caches(sender, instance=None, user_id=None, **kwargs):
+    """
+    Invalidates cached values depending on the ratings of recipes, such as
+    the highest rated recipes on the home page, and the versions of pages
+    showing ratings, when a rating is saved, deleted or upserted.
+
+    Args:
+        sender (Model): The Rating model class.
+        instance (Rating or None): The saved or deleted Rating object.
+        user_id (int or None): The ID of the user, for upserted ratings.
+    """
+    if instance is not None:
+        user_id = instance.user_id
+    bump_version(RECIPE_STATS_VERSION)
+    bump_version(user_version(user_id))
+    invalidate_features()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_caches(sender, instance, **kwargs):
+    """
+    Invalidates the versions of pages showing comments or comment counts
+    when a comment is saved or deleted.
+
+    Args:
+        sender (Model): The Comment model class.
+        instance (Comment): The saved or deleted Comment object.
+    """
+    bump_version(RECIPE_STATS_VERSION)
+    bump_version(recipe_comments_version(instance.recipe_id))
+
+
+@receiver(comments_changed, sender=Comment)
+def invalidate_bulk_comment_caches(sender, recipe_ids, **kwargs):
+    """
+    Invalidates the versions of pages showing comments or comment counts
+    when comments are changed in bulk.
+
+    Args:
+        sender (Model): The Comment model class.
+        recipe_ids (iterable): The IDs of the recipes of the comments.
+    """
+    bump_version(RECIPE_STATS_VERSION)
+    for recipe_id in recipe_ids:
+        bump_version(recipe_comments_version(recipe_id))
+
+
+@receiver(post_save, sender=Favourite)
+@receiver(post_delete, sender=Favourite)
+def invalidate_favourite_ids(sender, instance, **kwargs):
+    """
+    Removes the cached favourite recipe IDs of a user when a favourite of the
+    user is saved or deleted, e.g. in the admin or when a recipe is deleted.
+
+    Args:
+        sender (Model): The Favourite model class.
+        instance (Favourite): The saved or deleted Favourite object.
+    """
+    Favourite.invalidate_user_favourite_ids(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_new_user_favourite_ids(sender, instance, created, **kwargs):
+    """
+    Removes any cached favourite recipe IDs of a new user, which could have
+    been cached for a previous user with the same id.
+
+    Args:
+        sender (Model): The User model class.
+        instance (User): The saved User object.
+        created (bool): True if the user was created, else False.
+    """
+    if created:
+        Favourite.invalidate_user_favourite_ids(instance.id)
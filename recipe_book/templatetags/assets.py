@@ -0,0 +1,79 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+from recipe_book.assets import get_bundle_urls
+from recipe_book.critical_css import get_critical_css
+from recipe_book.icons import ID_PREFIX, get_view_boxes
+
+register = template.Library()
+
+
+@register.simple_tag
+def script_bundle(name):
+    """
+    Renders the deferred script tags loading a JavaScript bundle.
+
+    Args:
+        name (str): The name of the bundle, see recipe_book/assets.py.
+
+    Returns:
+        str: The script tags.
+    """
+    return format_html_join(
+        "\n", '<script src="{}" defer></script>',
+        ((url,) for url in get_bundle_urls("js", name)))
+
+
+@register.simple_tag
+def style_bundle(name, critical=""):
+    """
+    Renders the link tags loading a stylesheet bundle. With the name of a
+    page whose critical CSS was built (see recipe_book/critical_css.py), the
+    critical CSS is inlined and the bundle is loaded without blocking
+    rendering.
+
+    Args:
+        name (str): The name of the bundle, see recipe_book/assets.py.
+        critical (str): The page name in CRITICAL_PAGES, e.g. "index".
+
+    Returns:
+        str: The style and link tags.
+    """
+    urls = [(url,) for url in get_bundle_urls("css", name)]
+    critical_css = get_critical_css(critical) if critical else None
+    if critical_css is None:
+        return format_html_join(
+            "\n", '<link rel="stylesheet" href="{}">', urls)
+    # the critical CSS is generated from the project's own stylesheets
+    return format_html(
+        "<style>{}</style>\n{}", mark_safe(critical_css), format_html_join(
+            "\n", '<link rel="preload" href="{0}" as="style" '
+            'onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+            '<noscript><link rel="stylesheet" href="{0}"></noscript>', urls))
+
+
+@register.simple_tag
+def icon(name, css_class="", title=""):
+    """
+    Renders an icon of the icon sprite (see recipe_book/icons.py), sized
+    like text. Icons without a title are hidden from screen readers.
+
+    Args:
+        name (str): The name of the icon, e.g. "heart".
+        css_class (str): Classes to add to the icon.
+        title (str): The title of the icon, shown as a tooltip.
+
+    Returns:
+        str: The svg element.
+    """
+    attributes = format_html(
+        'class="{}" viewBox="{}"', f"icon {css_class}".strip(),
+        get_view_boxes().get(name, ""))
+    if title:
+        return format_html(
+            '<svg {} role="img" aria-label="{}"><title>{}</title>'
+            '<use href="#{}{}"></use></svg>',
+            attributes, title, title, ID_PREFIX, name)
+    return format_html(
+        '<svg {} aria-hidden="true"><use href="#{}{}"></use></svg>',
+        attributes, ID_PREFIX, name)
@@ -19,6 +19,8 @@ class AddRemoveFavouriteViewTests(TestCase):
         - `test_remove_favourite_authenticated_user`: Test that a favourite is
         removed when the request is by  valid user and recipe, and favourite
         already exists.
+        - `test_favourite_recipe_does_not_exist`: Test that the response is
+        404 when the recipe does not exist.
     """
     def setUp(self):
         """ Set up mock data for testing """
@@ -73,3 +75,17 @@ class AddRemoveFavouriteViewTests(TestCase):
             Favourite.objects.filter(
                 user=self.user, recipe=self.recipe).exists(),
             msg="Favourite exists after deletion")
+
+    def test_favourite_recipe_does_not_exist(self):
+        """
+        Test that the response is 404, and no favourite is created, when the
+        recipe does not exist.
+        """
+        data = {'recipeId': self.recipe.id + 100}
+        response = self.client.post(
+            '/add-remove-favourite/', data, content_type='application/json')
+        self.assertEqual(
+            response.status_code, 404, msg="Incorrect status, should be 404")
+        self.assertFalse(
+            Favourite.objects.exists(),
+            msg="Favourite created for missing recipe")
@@ -18,6 +18,18 @@ class AddUpdateRatingViewTest(TestCase):
         - `test_update_rating_authenticated_user`: Test method is returning the
         correct response, 200, and rating is updated with new rating value,
         when request with an authenticated user and an existing rating.
+        - `test_update_rating_returns_aggregates`: Test the response contains
+        the updated rating count and average of the recipe.
+        - `test_add_rating_invalid_value`: Test method is returning 400, and
+        no rating is created, when the rating value is not 1 to 5.
+        - `test_add_rating_recipe_does_not_exist`: Test method is returning
+        404, and no rating is created, when the recipe does not exist.
+        - `test_add_rating_unauthenticated_user`: Test method is returning
+        401 with a message when the user is not logged in.
+        - `test_add_rating_async_client`: Test the async view handles a
+        request on the event loop.
+        - `test_get_not_allowed`: Test method is returning 405 for a GET
+        request.
     """
     def setUp(self):
         """ Set up mock data for testing """
@@ -30,6 +42,7 @@ class AddUpdateRatingViewTest(TestCase):
         self.user = User.objects.create_user(
             username='testuser', password='testpassword')
         self.client.login(username="testuser", password="testpassword")
+        self.async_client.login(username="testuser", password="testpassword")
 
         self.recipe = Recipe.objects.create(
             title='Test Recipe', author=self.super_user)
@@ -74,3 +87,97 @@ class AddUpdateRatingViewTest(TestCase):
         self.assertTrue(
             updated_rating.rating == 1,
             msg="Rating value not updated")
+
+    def test_update_rating_returns_aggregates(self):
+        """
+        Test the response of adding and then updating a rating contains the
+        updated rating count and average of the recipe, and that updating does
+        not count the rating twice.
+        """
+        data = {'recipeId': self.recipe.id, 'rating': '4'}
+        response = self.client.post(
+            '/add-update-rating/', data, content_type='application/json')
+        self.assertEqual(
+            (response.json()['count'], response.json()['average']), (1, 4.0),
+            msg="Incorrect aggregates after adding rating")
+
+        data = {'recipeId': self.recipe.id, 'rating': '2'}
+        response = self.client.post(
+            '/add-update-rating/', data, content_type='application/json')
+        self.assertEqual(
+            (response.json()['count'], response.json()['average']), (1, 2.0),
+            msg="Incorrect aggregates after updating rating")
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            self.recipe.ratings_histogram, {1: 0, 2: 1, 3: 0, 4: 0, 5: 0},
+            msg="Incorrect rating histogram after updating rating")
+
+    def test_add_rating_invalid_value(self):
+        """
+        Test method is returning 400, and no rating is created, when the
+        rating value is not a whole number from 1 to 5.
+        """
+        for rating in ['6', '0', 'five', None]:
+            data = {'recipeId': self.recipe.id, 'rating': rating}
+            response = self.client.post(
+                '/add-update-rating/', data, content_type='application/json')
+            self.assertEqual(
+                response.status_code, 400,
+                msg=f"Incorrect, status should be 400 for rating {rating}")
+        self.assertFalse(
+            Rating.objects.exists(), msg="Rating created with invalid value")
+
+    def test_add_rating_recipe_does_not_exist(self):
+        """
+        Test method is returning 404, and no rating is created, when the
+        recipe does not exist.
+        """
+        data = {'recipeId': self.recipe.id + 100, 'rating': '3'}
+        response = self.client.post(
+            '/add-update-rating/', data, content_type='application/json')
+        self.assertEqual(
+            response.status_code, 404, msg="Incorrect, status should be 404")
+        self.assertFalse(
+            Rating.objects.exists(), msg="Rating created for missing recipe")
+
+    def test_add_rating_unauthenticated_user(self):
+        """
+        Test method is returning 401 with a message when the user is not
+        logged in, and no rating is created.
+        """
+        self.client.logout()
+        data = {'recipeId': self.recipe.id, 'rating': '3'}
+        response = self.client.post(
+            '/add-update-rating/', data, content_type='application/json')
+        self.assertEqual(
+            response.status_code, 401, msg="Incorrect, status should be 401")
+        self.assertEqual(
+            response.json()['message'],
+            "You need to be logged in to rate recipes!",
+            msg="Incorrect json response message")
+        self.assertFalse(
+            Rating.objects.exists(), msg="Rating created for anonymous user")
+
+    async def test_add_rating_async_client(self):
+        """
+        Test the async view creates the rating when requested through the
+        ASGI handler.
+        """
+        data = {'recipeId': self.recipe.id, 'rating': 4}
+        response = await self.async_client.post(
+            '/add-update-rating/', data, content_type='application/json')
+
+        self.assertEqual(
+            response.status_code, 200, msg="Incorrect status, should be 200")
+        self.assertEqual(
+            response.json()['count'], 1, msg="Incorrect rating count")
+        self.assertTrue(
+            await Rating.objects.filter(
+                user=self.user, recipe=self.recipe, rating=4).aexists(),
+            msg="Rating was not created")
+
+    def test_get_not_allowed(self):
+        """ Test method is returning 405 for a GET request. """
+        response = self.client.get('/add-update-rating/')
+        self.assertEqual(
+            response.status_code, 405, msg="Incorrect status, should be 405")
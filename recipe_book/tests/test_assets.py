@@ -0,0 +1,200 @@
+import os
+import shutil
+import tempfile
+from unittest import skipUnless
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from recipe_book.assets import (
+    JS_BUNDLES, build_bundles, get_assets_version, read_manifest)
+from recipe_book.models import Recipe
+
+try:
+    import rcssmin  # noqa: F401
+    import rjsmin  # noqa: F401
+    HAS_MINIFIERS = True
+except ImportError:
+    HAS_MINIFIERS = False
+
+
+class TestAssetBundles(SimpleTestCase):
+    """
+    A test case class to test the static asset bundles (assets.py), built to
+    a temporary directory.
+
+    Test methods:
+        - `setUp`: Creates the temporary build directory.
+        - `tearDown`: Removes the temporary build directory.
+        - `render`: Renders a template loading the asset tags.
+        - `test_source_files_before_build`: Test that the source files of a
+        bundle are loaded until it is built.
+        - `test_built_bundle`: Test that a built bundle concatenates its
+        source files in order, and is loaded instead of them.
+        - `test_minified_bundles`: Test that minified bundles are smaller.
+        - `test_assets_version`: Test that the build writes a version of the
+        bundles.
+    """
+
+    def setUp(self):
+        """ Creates the temporary build directory. """
+        self.build_dir = tempfile.mkdtemp()
+        settings = override_settings(ASSETS_BUILD_DIR=self.build_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        read_manifest.cache_clear()
+
+    def tearDown(self):
+        """ Removes the temporary build directory. """
+        shutil.rmtree(self.build_dir)
+        read_manifest.cache_clear()
+
+    def render(self, source):
+        """
+        Renders a template loading the asset tags.
+
+        Args:
+            source (str): The template source, without the load tag.
+
+        Returns:
+            str: The rendered template.
+        """
+        return Template("{% load assets %}" + source).render(Context())
+
+    def test_source_files_before_build(self):
+        """
+        Test that the source files of a bundle are loaded, in order, until
+        it is built.
+        """
+        html = self.render('{% script_bundle "recipe" %}')
+        for path in JS_BUNDLES["recipe"]:
+            self.assertIn(
+                f'<script src="/static/{path}" defer></script>', html,
+                msg=f"{path} not loaded")
+        positions = [html.index(path) for path in JS_BUNDLES["recipe"]]
+        self.assertEqual(
+            positions, sorted(positions), msg="Incorrect order of scripts")
+
+    def test_built_bundle(self):
+        """
+        Test that a built bundle concatenates its source files in order, and
+        is loaded instead of them.
+        """
+        build_bundles(minified=False)
+        with open(os.path.join(self.build_dir, "js", "recipe.js")) as bundle:
+            content = bundle.read()
+        positions = [
+            content.index(f"initialize{name}Script")
+            for name in ("Comment", "Favourite", "Ratings", "")]
+        self.assertEqual(
+            positions, sorted(positions), msg="Incorrect order of sources")
+
+        html = self.render(
+            '{% script_bundle "recipe" %}{% style_bundle "style" %}')
+        self.assertInHTML(
+            '<script src="/static/build/js/recipe.js" defer></script>', html)
+        self.assertInHTML(
+            '<link rel="stylesheet" href="/static/build/css/style.css">',
+            html)
+        self.assertNotIn("js/comments.js", html, msg="Source file loaded")
+
+    @skipUnless(HAS_MINIFIERS, "rjsmin and rcssmin are not installed")
+    def test_minified_bundles(self):
+        """ Test that the minified bundles are smaller than their sources. """
+        for path, size, built_size in build_bundles():
+            self.assertLess(built_size, size, msg=f"{path} not minified")
+
+    def test_assets_version(self):
+        """
+        Test that the build writes a version of the bundles, which changes
+        with them.
+        """
+        self.assertEqual(
+            get_assets_version(), "", msg="Version before the build")
+        build_bundles(minified=False)
+        version = get_assets_version()
+        self.assertTrue(version, msg="No version written")
+        build_bundles(minified=False)
+        self.assertEqual(
+            get_assets_version(), version, msg="Version not reproducible")
+        if HAS_MINIFIERS:
+            build_bundles()
+            self.assertNotEqual(
+                get_assets_version(), version,
+                msg="Version not changed with the bundles")
+
+
+class TestManifestStaticFiles(TestCase):
+    """
+    A test case class to test that the pages render with the production
+    static files storage, which raises an error for static files missing
+    from its manifest. The static files are collected to a temporary
+    directory.
+
+    Test methods:
+        - `setUpClass`: Collects the static files with the manifest storage.
+        - `tearDownClass`: Removes the collected static files.
+        - `setUp`: Sets up a recipe without an image.
+        - `test_recipe_page_without_image`: Test that the page of a recipe
+        without an image renders.
+        - `test_recipe_list_page`: Test that the recipe list page renders.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """ Collects the static files with the manifest storage. """
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.storage_settings = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STORAGES={
+                "default": {
+                    "BACKEND":
+                        "django.core.files.storage.FileSystemStorage",
+                },
+                "staticfiles": {
+                    "BACKEND": "whitenoise.storage."
+                               "CompressedManifestStaticFilesStorage",
+                },
+            })
+        cls.storage_settings.enable()
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        """ Removes the collected static files. """
+        cls.storage_settings.disable()
+        shutil.rmtree(cls.static_root)
+        super().tearDownClass()
+
+    def setUp(self):
+        """ Sets up a recipe without an image. """
+        cache.clear()
+        user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        self.recipe = Recipe.objects.create(
+            title="Test Recipe",
+            author=user,
+            slug="test-recipe",
+            content="Test Recipe Content",
+            status=1,
+        )
+
+    def test_recipe_page_without_image(self):
+        """
+        Test that the page of a recipe without image variants renders with
+        its placeholder image.
+        """
+        response = self.client.get(
+            reverse('recipe_detail', kwargs={'slug': self.recipe.slug}))
+        self.assertEqual(
+            response.status_code, 200, msg="Status code not 200")
+        self.assertContains(response, 'alt="placeholder image"')
+
+    def test_recipe_list_page(self):
+        """ Test that the recipe list page renders. """
+        response = self.client.get(reverse('recipe_list_page'))
+        self.assertEqual(
+            response.status_code, 200, msg="Status code not 200")
@@ -0,0 +1,97 @@
+import threading
+import time
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from recipe_book.cache import (
+    bump_version, get_or_compute, get_or_refresh, make_key)
+
+
+class TestCacheHelpers(SimpleTestCase):
+    """
+    A test case class to test the cache helpers (cache.py).
+
+    Test methods:
+        - `setUp`: Clears the cache.
+        - `compute_concurrently`: Gets a value from several threads at once.
+        - `test_get_or_compute_single_flight`: Test that concurrent misses of
+        the same key compute the value once.
+        - `test_get_or_refresh_single_flight`: Test that concurrent misses of
+        a stale-while-revalidate value compute it once.
+        - `test_get_or_compute_caches_none`: Test that None is cached.
+        - `test_versioned_keys`: Test that bumping a version changes the keys
+        built with it.
+    """
+
+    def setUp(self):
+        """ Clears the cache. """
+        cache.clear()
+
+    def compute_concurrently(self, get, threads=8):
+        """
+        Gets a value from several threads at once, with a slow computation
+        counting its calls.
+
+        Args:
+            get (callable): Function getting the value, called with the
+            compute function.
+            threads (int): The number of threads.
+
+        Returns:
+            tuple: The values returned in the threads, and the number of times
+            the value was computed.
+        """
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        def run():
+            results.append(get(compute))
+
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results, len(calls)
+
+    def test_get_or_compute_single_flight(self):
+        """ Test that concurrent misses of the same key compute it once. """
+        results, calls = self.compute_concurrently(
+            lambda compute: get_or_compute("key", compute, 60))
+        self.assertEqual(calls, 1, msg="Value computed more than once")
+        self.assertEqual(
+            results, ["value"] * 8, msg="Incorrect values returned")
+
+    def test_get_or_refresh_single_flight(self):
+        """
+        Test that concurrent misses of a stale-while-revalidate value compute
+        it once.
+        """
+        results, calls = self.compute_concurrently(
+            lambda compute: get_or_refresh("key", compute, 60))
+        self.assertEqual(calls, 1, msg="Value computed more than once")
+        self.assertEqual(
+            results, ["value"] * 8, msg="Incorrect values returned")
+
+    def test_get_or_compute_caches_none(self):
+        """ Test that a computed None is cached and not computed again. """
+        calls = []
+        for _ in range(2):
+            value = get_or_compute("key", lambda: calls.append(1), 60)
+        self.assertIsNone(value, msg="Incorrect value returned")
+        self.assertEqual(len(calls), 1, msg="None was not cached")
+
+    def test_versioned_keys(self):
+        """ Test that bumping a version changes the keys built with it. """
+        key = make_key("prefix", 1, version="test")
+        self.assertEqual(
+            key, make_key("prefix", 1, version="test"),
+            msg="Key is not stable")
+        bump_version("test")
+        self.assertNotEqual(
+            key, make_key("prefix", 1, version="test"),
+            msg="Key did not change with the version")
@@ -0,0 +1,124 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from recipe_book.models import Recipe, Comment, Favourite, Rating
+
+
+class TestConditionalGet(TestCase):
+    """
+    A test case class to test that the recipe page, recipe list page and home
+    page answer 304 Not Modified for an unchanged page, and are rendered
+    again after a change shown on the page.
+
+    Test methods:
+        - `setUp`: Sets up test mock data.
+        - `get_revalidated`: Requests a page with the ETag of its previous
+        response.
+        - `test_recipe_detail_not_modified`: Test conditional GET of the
+        recipe page.
+        - `test_recipe_list_not_modified`: Test conditional GET of the recipe
+        list page.
+        - `test_features_list_not_modified`: Test conditional GET of the home
+        page.
+        - `test_etag_differs_per_user`: Test that the ETag of a page differs
+        between users.
+    """
+
+    def setUp(self):
+        """ Set up test mock data including a mock user and recipe. """
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        self.client.login(username="testuser", password="testpassword")
+        self.recipe = Recipe.objects.create(
+            title="Test Recipe",
+            author=self.user,
+            slug="test-recipe",
+            content="Test Recipe Content",
+            status=1,
+        )
+        # the first page sets the CSRF cookie, which is part of the ETag
+        self.client.get(reverse('home_page'))
+
+    def get_revalidated(self, url, response, params=None):
+        """
+        Requests a page again with the ETag of its previous response.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        self.assertIn("ETag", response, msg="Response has no ETag")
+        return self.client.get(
+            url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_recipe_detail_not_modified(self):
+        """
+        Test that the recipe page answers 304 Not Modified while unchanged,
+        and 200 after a comment, rating or favourite of the user is added.
+        """
+        url = reverse('recipe_detail', kwargs={'slug': self.recipe.slug})
+        response = self.client.get(url)
+        changes = [
+            lambda: Comment.objects.create(
+                body="Comment", author=self.user, recipe=self.recipe),
+            lambda: Rating.upsert_rating(self.user.id, self.recipe.id, 4),
+            lambda: Favourite.toggle_favourite(self.user.id, self.recipe.id),
+        ]
+        for change in changes:
+            not_modified = self.get_revalidated(url, response)
+            self.assertEqual(
+                not_modified.status_code, 304, msg="Status code is not 304")
+            change()
+            response = self.get_revalidated(url, response)
+            self.assertEqual(
+                response.status_code, 200,
+                msg="Changed page answered with 304")
+
+    def test_recipe_list_not_modified(self):
+        """
+        Test that the recipe list page answers 304 Not Modified while
+        unchanged, and 200 for other parameters or after a rating is added.
+        """
+        url = reverse('recipe_list_page')
+        response = self.client.get(url, {'q': 'all'})
+        not_modified = self.get_revalidated(url, response, {'q': 'all'})
+        self.assertEqual(
+            not_modified.status_code, 304, msg="Status code is not 304")
+        other_query = self.get_revalidated(url, response, {'q': 'chicken'})
+        self.assertEqual(
+            other_query.status_code, 200, msg="Other search answered 304")
+        Rating.objects.create(user=self.user, recipe=self.recipe, rating=3)
+        changed = self.get_revalidated(url, response, {'q': 'all'})
+        self.assertEqual(
+            changed.status_code, 200, msg="Changed page answered with 304")
+
+    def test_features_list_not_modified(self):
+        """
+        Test that the home page answers 304 Not Modified while unchanged, and
+        200 after a recipe is updated.
+        """
+        url = reverse('home_page')
+        response = self.client.get(url)
+        not_modified = self.get_revalidated(url, response)
+        self.assertEqual(
+            not_modified.status_code, 304, msg="Status code is not 304")
+        self.recipe.teaser = "A new teaser"
+        self.recipe.save()
+        changed = self.get_revalidated(url, response)
+        self.assertEqual(
+            changed.status_code, 200, msg="Changed page answered with 304")
+        self.assertContains(changed, "A new teaser")
+
+    def test_etag_differs_per_user(self):
+        """
+        Test that a page cached by one user is not reused for another user.
+        """
+        url = reverse('recipe_detail', kwargs={'slug': self.recipe.slug})
+        response = self.client.get(url)
+        User.objects.create_user(username="other", password="testpassword")
+        self.client.login(username="other", password="testpassword")
+        other_user = self.get_revalidated(url, response)
+        self.assertEqual(
+            other_user.status_code, 200,
+            msg="Page of another user answered with 304")
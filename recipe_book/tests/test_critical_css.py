@@ -0,0 +1,209 @@
+import shutil
+import tempfile
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from recipe_book.critical_css import (
+    ElementIndex, extract_critical, find_unused_selectors, get_critical_path,
+    parse_page, parse_stylesheet, read_critical_css, split_at_fold,
+    write_critical_css)
+from recipe_book.models import Recipe
+
+PAGE = """
+<html><body>
+<header class="nav"><a class="nav-link" href="/">Home</a></header>
+<main><section id="hero"><h1 class="title">Title</h1><img src="a.webp">
+</section><section class="below"><p class="teaser">Text</p></section></main>
+<footer>Footer</footer>
+</body></html>
+"""
+STYLESHEET = """
+@import url('https://fonts.example.com/font.css');
+/* comment { not a rule } */
+body { margin: 0; }
+.nav > .nav-link:hover, .unknown { color: red; }
+main .title { color: blue; }
+.below p, .teaser { color: green; }
+@media screen and (min-width: 768px) {
+    #hero .title { font-size: 2rem; }
+    .teaser { font-size: 1rem; }
+}
+@keyframes spin { from { opacity: 0; } to { opacity: 1; } }
+.title::after { content: "{"; }
+"""
+
+
+class TestCriticalCssExtraction(SimpleTestCase):
+    """
+    A test case class to test the extraction of critical CSS
+    (critical_css.py).
+
+    Test methods:
+        - `setUp`: Parses the test page and stylesheet.
+        - `test_split_at_fold`: Test that the elements before the fold
+        element are kept.
+        - `test_extract_critical`: Test that only the rules matching elements
+        above the fold are kept, with their matching selectors.
+        - `test_find_unused_selectors`: Test that selectors matching nothing
+        are reported, unless the scripts set their classes.
+    """
+
+    def setUp(self):
+        """ Parses the test page and stylesheet. """
+        self.elements = parse_page(PAGE)
+        self.rules = parse_stylesheet(STYLESHEET)
+
+    def test_split_at_fold(self):
+        """ Test that the elements before the fold element are kept. """
+        above_fold = split_at_fold(self.elements, "main section", 2)
+        self.assertEqual(
+            [element.tag for element in above_fold],
+            ["html", "body", "header", "a", "main", "section", "h1", "img"],
+            msg="Incorrect elements above the fold")
+        self.assertEqual(
+            len(split_at_fold(self.elements, ".missing", 1)),
+            len(self.elements), msg="Elements missing without a fold")
+
+    def test_extract_critical(self):
+        """
+        Test that only the rules matching elements above the fold are kept,
+        with only their matching selectors, and at-rules are left out.
+        """
+        above_fold = ElementIndex(
+            split_at_fold(self.elements, "section.below", 1))
+        css = extract_critical(self.rules, above_fold)
+        self.assertEqual(
+            css,
+            'body{margin:0}.nav > .nav-link:hover{color:red}'
+            'main .title{color:blue}'
+            '@media screen and (min-width: 768px){#hero .title'
+            '{font-size:2rem}}.title::after{content:"{"}',
+            msg="Incorrect critical CSS")
+
+    def test_find_unused_selectors(self):
+        """
+        Test that selectors matching no element are reported, unless the
+        scripts set one of their classes.
+        """
+        index = ElementIndex(self.elements)
+        self.assertEqual(
+            find_unused_selectors(self.rules, [index], set()), [".unknown"],
+            msg="Incorrect unused selectors")
+        self.assertEqual(
+            find_unused_selectors(self.rules, [index], {"unknown"}), [],
+            msg="Class set by the scripts reported")
+
+
+class TestCriticalCssBuild(TestCase):
+    """
+    A test case class to test the build_critical_css command and the inlined
+    critical CSS, built to a temporary directory.
+
+    Test methods:
+        - `setUp`: Creates a published recipe and the build directory.
+        - `tearDown`: Removes the build directory.
+        - `test_build_critical_css`: Test that the command writes the
+        critical CSS of each page.
+        - `test_build_from_sample_recipes`: Test that the pages are rendered
+        from the sample recipes, leaving the database alone.
+        - `test_build_without_page`: Test that a page that cannot be
+        rendered gets no critical CSS, without failing the build.
+        - `test_style_bundle_inlines_critical_css`: Test that pages inline
+        their critical CSS and load the stylesheet asynchronously.
+        - `test_style_bundle_without_critical_css`: Test that the stylesheet
+        blocks rendering until the critical CSS is built.
+    """
+
+    def setUp(self):
+        """ Creates a published recipe and the temporary build directory. """
+        cache.clear()
+        user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        Recipe.objects.create(
+            title="Test Recipe", slug="test-recipe", author=user,
+            content="<p>Content</p>", status=1)
+        self.build_dir = tempfile.mkdtemp()
+        settings = override_settings(ASSETS_BUILD_DIR=self.build_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        read_critical_css.cache_clear()
+
+    def tearDown(self):
+        """ Removes the temporary build directory. """
+        shutil.rmtree(self.build_dir)
+        read_critical_css.cache_clear()
+
+    def test_build_critical_css(self):
+        """ Test that the command writes the critical CSS of each page. """
+        call_command("build_critical_css", stdout=StringIO())
+        for page in ("base", "index", "recipes", "recipe"):
+            with open(get_critical_path(page)) as critical:
+                css = critical.read()
+            self.assertIn(
+                ".bg-brand-green{", css, msg=f"Navbar CSS missing ({page})")
+            self.assertNotIn("@import", css, msg="Blocking import kept")
+        with open(get_critical_path("recipe")) as critical:
+            self.assertNotIn(
+                "#comments-list", critical.read(),
+                msg="CSS below the fold kept")
+
+    def test_build_from_sample_recipes(self):
+        """
+        Test that the pages are rendered from the sample recipes in a
+        scratch database, leaving the database and its recipes alone.
+        """
+        output = StringIO()
+        call_command("build_critical_css", stdout=output)
+        self.assertIn(
+            "recipe (/recipes/lemon-herb-roast-chicken/)", output.getvalue(),
+            msg="Recipe page not rendered from the sample recipes")
+        self.assertEqual(
+            list(Recipe.objects.values_list("slug", flat=True)),
+            ["test-recipe"], msg="Sample recipes loaded into the database")
+
+    def test_build_without_page(self):
+        """
+        Test that a page that cannot be rendered gets no critical CSS, and
+        loads the stylesheet as before, while the other pages are built.
+        """
+        write_critical_css("recipe", "body{margin:0}")
+        errors = StringIO()
+        call_command(
+            "build_critical_css", recipe="missing", stdout=StringIO(),
+            stderr=errors)
+        self.assertIn(
+            "recipe: no critical CSS", errors.getvalue(),
+            msg="Missing page not reported")
+        self.assertIsNone(
+            read_critical_css(get_critical_path("recipe")),
+            msg="Stale critical CSS kept")
+        self.assertIsNotNone(
+            read_critical_css(get_critical_path("index")),
+            msg="Other pages not built")
+
+    def test_style_bundle_inlines_critical_css(self):
+        """
+        Test that pages inline their critical CSS and preload the
+        stylesheet, with a fallback without JavaScript.
+        """
+        write_critical_css("index", "body{margin:0}")
+        response = self.client.get(reverse('home_page'))
+        self.assertContains(response, "<style>body{margin:0}</style>")
+        self.assertContains(
+            response, '<link rel="preload" href="/static/css/style.css" '
+            'as="style" onload="this.onload=null;this.rel=\'stylesheet\'">')
+        self.assertContains(
+            response, '<noscript><link rel="stylesheet" '
+            'href="/static/css/style.css"></noscript>')
+
+    def test_style_bundle_without_critical_css(self):
+        """ Test that the stylesheet is linked until critical CSS is built. """
+        html = Template(
+            '{% load assets %}{% style_bundle "style" critical="index" %}'
+        ).render(Context())
+        self.assertHTMLEqual(
+            html, '<link rel="stylesheet" href="/static/css/style.css">')
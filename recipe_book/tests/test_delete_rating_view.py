@@ -1,3 +1,4 @@
+from asgiref.sync import async_to_sync
 from django.test import TestCase
 from django.contrib.auth.models import User, AnonymousUser
 from django.http import JsonResponse
@@ -51,7 +52,7 @@ class DeleteRatingViewTest(TestCase):
         """
         request = Mock(
             method='DELETE', user=self.user, GET={'recipeId': self.recipe.id})
-        response = delete_rating(request)
+        response = async_to_sync(delete_rating)(request)
         self.assertEqual(
             response.status_code, 200, msg="Status code should be 200")
         self.assertEqual(
@@ -73,7 +74,7 @@ class DeleteRatingViewTest(TestCase):
         request = Mock(
             method='DELETE',
             user=AnonymousUser(), GET={'recipeId': self.recipe.id})
-        response = delete_rating(request)
+        response = async_to_sync(delete_rating)(request)
         self.assertEqual(
             response.status_code, 401, msg="Status should be 401, anonymous")
         self.assertEqual(
@@ -94,7 +95,7 @@ class DeleteRatingViewTest(TestCase):
         self.rating.delete()
         request = Mock(
             method='DELETE', user=self.user, GET={'recipeId': self.recipe.id})
-        response = delete_rating(request)
+        response = async_to_sync(delete_rating)(request)
         self.assertEqual(
             response.status_code, 400, msg="Status code should be 400")
         self.assertEqual(
@@ -1,5 +1,10 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from recipe_book.models import Recipe, Rating, Favourite
 
 
 class TestFeaturesListView(TestCase):
@@ -9,12 +14,41 @@ class TestFeaturesListView(TestCase):
     Contains tests to ensure the correct rendering of the features list page.
 
     Test methods:
+        - `setUp`: Sets up test mock data and clears the cache.
         - `test_features_list_page_status_code`: Test the status code of the
         retrieving the features list page (home page).
         - `test_features_list_page_template_used`: Test the correct template is
         used for the FeaturesListView.
+        - `test_features_cached_for_anonymous_user`: Test that the feature
+        lists are cached, and that the Rating table is not queried for an
+        anonymous user.
+        - `test_features_updated_after_rating`: Test that the cached feature
+        lists are updated when a rating changes the highest rated recipe.
+        - `test_features_without_user_state`: Test that the recipe cards do
+        not contain the user's ratings and favourites.
     """
 
+    def setUp(self):
+        """ Set up mock data and clear cached feature lists. """
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@test.com", password="testpassword"
+        )
+        self.recipe1 = Recipe.objects.create(
+            title="Test Recipe 1",
+            author=self.user,
+            slug="test-recipe-1",
+            content="Test Recipe 1 Content",
+            status=1,
+        )
+        self.recipe2 = Recipe.objects.create(
+            title="Test Recipe 2",
+            author=self.user,
+            slug="test-recipe-2",
+            content="Test Recipe 2 Content",
+            status=1,
+        )
+
     def test_features_list_page_status_code(self):
         """ Test the status code of the home page. """
         response = self.client.get(reverse('home_page'))
@@ -24,3 +58,50 @@ class TestFeaturesListView(TestCase):
         """ Test the correct template is used for the FeaturesListView. """
         response = self.client.get(reverse('home_page'))
         self.assertTemplateUsed(response, 'recipe_book/index.html')
+
+    def test_features_cached_for_anonymous_user(self):
+        """
+        Test that the feature lists are computed on the first request and
+        taken from the cache on the next, and that the Rating table is never
+        queried for an anonymous user.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home_page'))
+        self.assertEqual(
+            list(response.context['recipes_by_date']),
+            [self.recipe2, self.recipe1],
+            msg="Incorrect latest recipes")
+        self.assertFalse(
+            any("recipe_book_rating" in query['sql'] for query in queries),
+            msg="Rating table queried for anonymous user")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('home_page'))
+        self.assertEqual(
+            len(queries), 0, msg="Cached feature lists not used")
+
+    def test_features_updated_after_rating(self):
+        """
+        Test that a new rating marks the cached feature lists as stale, so
+        the newly rated recipe is listed first by rating on the next request.
+        """
+        self.client.get(reverse('home_page'))
+        Rating.objects.create(user=self.user, recipe=self.recipe1, rating=5)
+        response = self.client.get(reverse('home_page'))
+        self.assertEqual(
+            response.context['recipes_by_rating'][0], self.recipe1,
+            msg="Feature lists not updated after rating")
+
+    def test_features_without_user_state(self):
+        """
+        Test that the recipe cards of a logged in user do not contain the
+        user's ratings and favourites, which are added in the browser, so the
+        cards are the same for all users.
+        """
+        Rating.objects.create(user=self.user, recipe=self.recipe1, rating=3)
+        Favourite.objects.create(user=self.user, recipe=self.recipe1)
+        self.client.login(username="testuser", password="testpassword")
+        response = self.client.get(reverse('home_page'))
+        self.assertNotContains(response, 'data-user-rating="3"')
+        self.assertNotContains(response, "Remove from favourites")
+        self.assertContains(response, 'data-logged-in="true"', count=1)
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+from django.urls import reverse
+from recipe_book.icons import (
+    ICONS_DIR, build_sprite, find_icon_names, get_sprite_path,
+    get_view_boxes)
+
+
+class TestIconSprite(TestCase):
+    """
+    A test case class to test the icon sprite (icons.py) and the icon
+    template tag.
+
+    Test methods:
+        - `setUp`: Clears the cache.
+        - `render`: Renders a template loading the icon tag.
+        - `test_sprite_up_to_date`: Test that the generated sprite holds
+        exactly the referenced icons.
+        - `test_icons_share_em_size`: Test that all icons are 512 units high,
+        the em size the stroke widths in style.css are given in.
+        - `test_icon_hidden`: Test that an icon without a title is hidden
+        from screen readers.
+        - `test_icon_with_title`: Test that an icon with a title is labelled.
+        - `test_page_includes_sprite`: Test that pages include the sprite and
+        no icon font script.
+    """
+
+    def setUp(self):
+        """ Clears the cache. """
+        cache.clear()
+
+    def render(self, source):
+        """
+        Renders a template loading the icon tag.
+
+        Args:
+            source (str): The template source, without the load tag.
+
+        Returns:
+            str: The rendered template.
+        """
+        return Template("{% load assets %}" + source).render(Context())
+
+    def test_sprite_up_to_date(self):
+        """
+        Test that every referenced icon has a source icon, and that the
+        generated sprite is up to date (run build_icon_sprite otherwise).
+        """
+        names = find_icon_names()
+        for name in ("heart", "heart-regular", "star-half-stroke", "fish"):
+            self.assertIn(name, names, msg=f"{name} icon not found")
+        for name in names:
+            self.assertTrue(
+                (ICONS_DIR / f"{name}.svg").exists(),
+                msg=f"No source icon of {name}")
+        self.assertEqual(
+            get_sprite_path().read_text(encoding="utf-8"),
+            build_sprite(names), msg="Icon sprite is not up to date")
+
+    def test_icons_share_em_size(self):
+        """
+        Test that all source icons are 512 units high, as the Font Awesome 6
+        icons, so the stroke widths in style.css fit every icon.
+        """
+        for name, view_box in get_view_boxes().items():
+            self.assertEqual(
+                view_box.split()[1:4:2], ["0", "512"],
+                msg=f"Icon {name} is not 512 units high")
+
+    def test_icon_hidden(self):
+        """ Test that an icon without a title is hidden and sized. """
+        html = self.render('{% icon "heart" "m-1" %}')
+        self.assertInHTML(
+            '<svg class="icon m-1" viewBox="0 0 512 512" '
+            'aria-hidden="true"><use href="#icon-heart"></use></svg>', html)
+
+    def test_icon_with_title(self):
+        """ Test that an icon with a title has an escaped accessible name. """
+        html = Template(
+            '{% load assets %}{% icon "fish" title=title %}').render(
+            Context({"title": "<b>Fish</b>"}))
+        self.assertIn('role="img"', html, msg="Icon has no role")
+        self.assertIn(
+            "<title>&lt;b&gt;Fish&lt;/b&gt;</title>", html,
+            msg="Title not rendered or not escaped")
+        self.assertNotIn("aria-hidden", html, msg="Icon is hidden")
+
+    def test_page_includes_sprite(self):
+        """
+        Test that pages include the sprite, and no longer load the Font
+        Awesome kit.
+        """
+        response = self.client.get(reverse('home_page'))
+        self.assertContains(response, '<symbol id="icon-heart"', count=1)
+        self.assertNotContains(response, "kit.fontawesome.com")
@@ -0,0 +1,231 @@
+import os
+import tempfile
+from io import StringIO
+import requests
+from unittest import mock, skipUnless
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe_book.images import update_image_variants
+from recipe_book.models import Recipe
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class TestImageVariants(TestCase):
+    """
+    A test case class to test the image variants stored on recipes
+    (images.py).
+
+    Test methods:
+        - `setUp`: Sets up test mock data.
+        - `test_cloudinary_variants_built_on_save`: Test that the Cloudinary
+        URLs of the variants are stored when a recipe is saved.
+        - `test_default_image_has_no_variants`: Test that a recipe without an
+        image has no variants.
+        - `test_variants_built_when_image_changes`: Test that the variants
+        are only built again when the image changes.
+        - `test_cards_render_without_building_urls`: Test that the recipe
+        list page renders the stored URLs without building any.
+        - `test_local_backend_generates_variants`: Test that the local
+        backend generates the variants on disk.
+        - `test_preview_added_after_commit`: Test that the inline preview and
+        dimensions are added after the recipe is saved, and rendered.
+        - `test_preview_failure_ignored`: Test that a failed download leaves
+        the recipe without a preview.
+        - `test_variants_built_once_on_save`: Test that saving a recipe
+        builds its variants once.
+        - `test_preview_built_in_background`: Test that the preview is built
+        in the background thread, not in the request.
+        - `test_rebuild_command_skips_unreadable_images`: Test that the
+        rebuild_image_variants command skips images it cannot read.
+    """
+
+    def setUp(self):
+        """ Set up test mock data including a mock user and recipe. """
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        self.recipe = Recipe.objects.create(
+            title="Test Recipe",
+            author=self.user,
+            slug="test-recipe",
+            content="Test Recipe Content",
+            feature_image="image/upload/v1713093927/lasagne.jpg",
+            status=1,
+        )
+
+    def test_cloudinary_variants_built_on_save(self):
+        """
+        Test that the card, hero, srcset and placeholder URLs are stored
+        when a recipe is saved.
+        """
+        variants = Recipe.objects.get(pk=self.recipe.pk).image_variants
+        self.assertIn("w_480", variants["card"], msg="Incorrect card URL")
+        self.assertIn(
+            "v1713093927/lasagne.jpg", variants["card"],
+            msg="Card URL not of the image")
+        self.assertIn("w_960", variants["hero"], msg="Incorrect hero URL")
+        self.assertEqual(
+            variants["srcset"].count("w,") + 1, 5,
+            msg="Incorrect number of srcset widths")
+        self.assertIn(
+            "e_blur", variants["placeholder"],
+            msg="Placeholder is not blurred")
+
+    def test_default_image_has_no_variants(self):
+        """ Test that a recipe without an image has no variants. """
+        recipe = Recipe.objects.create(
+            title="Other Recipe", author=self.user, slug="other-recipe")
+        self.assertNotIn(
+            "card", recipe.image_variants, msg="Default image has variants")
+
+    def test_variants_built_when_image_changes(self):
+        """
+        Test that the variants are kept when the recipe is saved with the
+        same image, and built again for a new image.
+        """
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        with mock.patch(
+                "recipe_book.images.CloudinaryImageBackend.build_variants"
+                ) as build_variants:
+            recipe.save()
+        build_variants.assert_not_called()
+
+        recipe.feature_image = "image/upload/v2/risotto.jpg"
+        recipe.save()
+        self.assertIn(
+            "risotto.jpg", recipe.image_variants["card"],
+            msg="Variants not built for the new image")
+
+    def test_cards_render_without_building_urls(self):
+        """
+        Test that the recipe cards show the stored URLs, without building
+        any image URL while rendering.
+        """
+        with mock.patch(
+                "cloudinary.CloudinaryResource.build_url",
+                side_effect=AssertionError("URL built while rendering")):
+            response = self.client.get(reverse('recipe_list_page'))
+        self.assertContains(response, self.recipe.image_variants["card"])
+        self.assertContains(response, 'srcset="')
+
+    @skipUnless(Image, "Pillow is not installed")
+    def test_local_backend_generates_variants(self):
+        """
+        Test that the local backend generates resized variants of an image
+        in MEDIA_ROOT, and stores their media URLs.
+        """
+        with tempfile.TemporaryDirectory() as media_root:
+            os.makedirs(os.path.join(media_root, "recipes"))
+            Image.new("RGB", (1600, 1067), "green").save(
+                os.path.join(media_root, "recipes", "soup.png"))
+            with override_settings(
+                    IMAGE_BACKEND="local", MEDIA_ROOT=media_root):
+                self.recipe.feature_image = "recipes/soup.png"
+                self.recipe.save()
+            card = self.recipe.image_variants["card"]
+            self.assertEqual(
+                card, "/media/variants/recipes/soup-480.webp",
+                msg="Incorrect card URL")
+            with Image.open(os.path.join(
+                    media_root, "variants", "recipes", "soup-480.webp")
+                    ) as variant:
+                self.assertEqual(
+                    variant.width, 480, msg="Variant not resized")
+
+    def test_preview_added_after_commit(self):
+        """
+        Test that the inline preview and dimensions of the image are added
+        once the saved recipe is committed, and rendered on the recipe cards.
+        """
+        preview = mock.Mock(content=b"webp", raise_for_status=mock.Mock())
+        info = mock.Mock(raise_for_status=mock.Mock())
+        info.json.return_value = {"input": {"width": 1600, "height": 1067}}
+        with mock.patch(
+                "recipe_book.images.requests.get",
+                side_effect=[preview, info]) as get:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.recipe.feature_image = "image/upload/v2/risotto.jpg"
+                self.recipe.save()
+        self.assertIn("fl_getinfo", get.call_args.args[0])
+
+        variants = Recipe.objects.get(pk=self.recipe.pk).image_variants
+        self.assertEqual(
+            variants["preview"], "data:image/webp;base64,d2VicA==",
+            msg="Incorrect preview")
+        self.assertEqual(
+            (variants["width"], variants["height"]), (1600, 1067),
+            msg="Incorrect dimensions")
+        response = self.client.get(reverse('recipe_list_page'))
+        self.assertContains(response, 'width="1600" height="1067"')
+        self.assertContains(response, "data:image/webp;base64,d2VicA==")
+
+    def test_preview_failure_ignored(self):
+        """
+        Test that a failed preview download leaves the recipe without a
+        preview, falling back to the placeholder URL.
+        """
+        with mock.patch(
+                "recipe_book.images.requests.get",
+                side_effect=requests.ConnectionError):
+            with self.assertLogs("recipe_book.images", "WARNING"):
+                added = Recipe.add_image_preview(self.recipe.pk)
+        self.assertFalse(added, msg="Preview added after a failure")
+        self.assertNotIn(
+            "preview", Recipe.objects.get(pk=self.recipe.pk).image_variants,
+            msg="Preview stored after a failure")
+
+    def test_variants_built_once_on_save(self):
+        """
+        Test that saving a recipe with a changed image builds its variants
+        once.
+        """
+        with mock.patch(
+                "recipe_book.models.recipe.update_image_variants",
+                wraps=update_image_variants) as update:
+            self.recipe.feature_image = "image/upload/v2/risotto.jpg"
+            self.recipe.save()
+        self.assertEqual(update.call_count, 1, msg="Variants built twice")
+        self.assertIn(
+            "risotto", self.recipe.image_variants["card"],
+            msg="Variants not built")
+
+    @override_settings(IMAGE_PREVIEWS_IN_BACKGROUND=True)
+    def test_preview_built_in_background(self):
+        """
+        Test that the preview of a changed image is submitted to the
+        background thread once the recipe is committed, without downloading
+        it in the request.
+        """
+        with mock.patch(
+                "recipe_book.images._preview_executor") as executor, \
+                mock.patch("recipe_book.images.requests.get") as get:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.recipe.feature_image = "image/upload/v2/risotto.jpg"
+                self.recipe.save()
+        self.assertEqual(
+            executor.submit.call_count, 1, msg="Preview not submitted")
+        get.assert_not_called()
+
+    def test_rebuild_command_skips_unreadable_images(self):
+        """
+        Test that the rebuild_image_variants command reports and skips a
+        recipe whose image cannot be read, instead of failing.
+        """
+        stdout, stderr = StringIO(), StringIO()
+        with mock.patch(
+                "recipe_book.images.CloudinaryImageBackend.build_variants",
+                side_effect=OSError("cannot identify image file")):
+            call_command(
+                "rebuild_image_variants", "--force",
+                stdout=stdout, stderr=stderr)
+        self.assertIn(
+            f"Skipped recipe {self.recipe.pk}", stderr.getvalue(),
+            msg="Unreadable image not reported")
+        self.assertIn("0 recipes", stdout.getvalue(), msg="Recipe updated")
@@ -0,0 +1,83 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class TestRecipeDataMigrations(TransactionTestCase):
+    """
+    A test case class to test that the data migrations upgrade a database
+    with existing recipes, migrated from before the search document (0009)
+    to the latest migration.
+
+    Test methods:
+        - `setUp`: Migrates back to 0009 and creates a recipe.
+        - `tearDown`: Migrates to the latest migration.
+        - `migrate`: Migrates the app to a migration.
+        - `test_upgrade_existing_recipe`: Test that an existing recipe gets
+        its search document, rendered HTML and text, and no image
+        variants.
+    """
+
+    def migrate(self, target):
+        """
+        Migrates the app to a migration, returning the historical models.
+
+        Args:
+            target (str): The name of the migration.
+
+        Returns:
+            StateApps: The models at the migration.
+        """
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([("recipe_book", target)])
+        return executor.loader.project_state(
+            [("recipe_book", target)]).apps
+
+    def setUp(self):
+        """ Migrates back to 0009 and creates a recipe with old columns. """
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes("recipe_book")[0][1]
+        apps = self.migrate("0009_recipe_rating_aggregates")
+        User = apps.get_model("auth", "User")
+        Recipe = apps.get_model("recipe_book", "Recipe")
+        user = User.objects.create(username="testuser")
+        self.recipe_id = Recipe.objects.create(
+            title="Leek Soup", slug="leek-soup", author=user,
+            teaser="A warm soup", ingredients="<ul><li>Leeks</li></ul>",
+            content="<p>Stir the pot <script>x()</script>slowly</p>",
+            status=1).pk
+
+    def tearDown(self):
+        """ Migrates to the latest migration, for the following tests. """
+        self.migrate(self.latest)
+
+    def test_upgrade_existing_recipe(self):
+        """
+        Test that an existing recipe gets a search document with its
+        instructions, indexed for search, and its rendered HTML and text,
+        and that its image variants are left to the management commands.
+        """
+        apps = self.migrate(self.latest)
+        recipe = apps.get_model("recipe_book", "Recipe").objects.get(
+            pk=self.recipe_id)
+        self.assertEqual(
+            recipe.content_html, "<p>Stir the pot slowly</p>",
+            msg="Content not sanitized")
+        self.assertEqual(
+            recipe.content_text, "Stir the pot slowly",
+            msg="Incorrect content text")
+        self.assertEqual(
+            recipe.search_document, "A warm soup Leeks Stir the pot slowly",
+            msg="Search document without the instructions")
+        self.assertEqual(
+            recipe.image_variants, {},
+            msg="Image variants built by the migration")
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT search_document FROM recipe_book_recipe_fts "
+                    "WHERE rowid = %s", [self.recipe_id])
+                self.assertEqual(
+                    cursor.fetchone()[0], recipe.search_document,
+                    msg="Search index not rebuilt")
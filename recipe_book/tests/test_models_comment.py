@@ -0,0 +1,85 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from recipe_book.models import Recipe, Comment
+
+
+class TestCommentModel(TestCase):
+    """
+    A test case class to test the Comment model, and the number of approved
+    comments stored on the recipe.
+
+    Test methods:
+        - `setUp`: Sets up test mock data.
+        - `test_approved_comments_count_maintained`: Test that the number of
+        approved comments is updated when comments are created, approved,
+        disapproved, moved and deleted.
+        - `test_set_approved_in_bulk`: Test that approving and disapproving
+        comments in bulk keeps the number of approved comments correct.
+    """
+
+    def setUp(self):
+        """ Set up test mock data including a mock user and two recipes. """
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        self.recipe1 = Recipe.objects.create(
+            title="Test Recipe 1", author=self.user, slug="test-recipe-1",
+            content="Test Recipe 1 Content", status=1)
+        self.recipe2 = Recipe.objects.create(
+            title="Test Recipe 2", author=self.user, slug="test-recipe-2",
+            content="Test Recipe 2 Content", status=1)
+
+    def assertApprovedCounts(self, count1, count2):
+        """ Asserts the stored number of approved comments of the recipes. """
+        self.recipe1.refresh_from_db()
+        self.recipe2.refresh_from_db()
+        self.assertEqual(
+            (self.recipe1.approved_comments_count,
+             self.recipe2.approved_comments_count),
+            (count1, count2),
+            msg="Incorrect number of approved comments")
+
+    def test_approved_comments_count_maintained(self):
+        """
+        Test that the number of approved comments is updated when comments
+        are created, approved, disapproved, moved and deleted.
+        """
+        comment = Comment.objects.create(
+            body="Comment", author=self.user, recipe=self.recipe1)
+        Comment.objects.create(
+            body="Unapproved", author=self.user, recipe=self.recipe1,
+            approved=False)
+        self.assertApprovedCounts(1, 0)
+
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.approved = False
+        comment.save()
+        self.assertApprovedCounts(0, 0)
+        comment.approved = True
+        comment.save()
+        self.assertApprovedCounts(1, 0)
+
+        comment.recipe = self.recipe2
+        comment.save()
+        self.assertApprovedCounts(0, 1)
+
+        comment.delete()
+        Comment.objects.filter(recipe=self.recipe1).delete()
+        self.assertApprovedCounts(0, 0)
+
+    def test_set_approved_in_bulk(self):
+        """
+        Test that approving and disapproving comments in bulk, as done by the
+        admin actions, keeps the number of approved comments correct.
+        """
+        for recipe in (self.recipe1, self.recipe1, self.recipe2):
+            Comment.objects.create(
+                body="Comment", author=self.user, recipe=recipe,
+                approved=False)
+        changed = Comment.set_approved(Comment.objects.all(), True)
+        self.assertEqual(changed, 3, msg="Incorrect number of changes")
+        self.assertApprovedCounts(2, 1)
+
+        changed = Comment.set_approved(
+            Comment.objects.filter(recipe=self.recipe1), False)
+        self.assertEqual(changed, 2, msg="Incorrect number of changes")
+        self.assertApprovedCounts(0, 1)
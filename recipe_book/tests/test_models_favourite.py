@@ -1,6 +1,7 @@
 from django.contrib.auth.models import User
 from django.test import TestCase
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from recipe_book.models import Recipe, Favourite
 
 
@@ -34,6 +35,12 @@ class TestFavouriteModel(TestCase):
         - `test_delete_favourite`: Test if the method returns True when
         favourite is deleted and False when favourite is not deleted due to
         either not existing or if the recipe id does not exist.
+        - `test_toggle_favourite`: Test that the method adds a favourite if it
+        does not exist and removes it if it does, returning the action and
+        recipe title from one statement each, and raises an error if the
+        recipe does not exist.
+        - `test_get_user_favourite_ids_cached`: Test that the favourite IDs of
+        a user are cached, and updated when the favourites of the user change.
     """
     def setUp(self):
         """ Set up mock data for testing """
@@ -201,3 +208,85 @@ class TestFavouriteModel(TestCase):
             Recipe.DoesNotExist,
                 msg="Exception not raised when recipe id does not exist"):
             Favourite.delete_favourite(user_id, recipe_id)
+
+    def test_toggle_favourite(self):
+        """
+        Test that the method adds a favourite if it does not exist (with a
+        DELETE and an INSERT statement) and removes it if it does (with a
+        single DELETE statement), returning the action and recipe title, and
+        that it raises an error if the recipe does not exist.
+        """
+        user_id = self.user.id
+        recipe_id = self.recipe.id
+        with CaptureQueriesContext(connection) as queries:
+            result = Favourite.toggle_favourite(user_id, recipe_id)
+        self.assertEqual(
+            result, ("created", self.recipe.title),
+            msg="Should have created favourite")
+        self.assertTrue(
+            Favourite.is_recipe_favourite(self.user, self.recipe),
+            msg="Favourite does not exist after toggle")
+        statements = [
+            query['sql'] for query in queries
+            if not query['sql'].upper().startswith(
+                ("SAVEPOINT", "RELEASE", "ROLLBACK"))]
+        self.assertEqual(
+            len(statements), 2, msg="Incorrect number of statements for add")
+
+        with CaptureQueriesContext(connection) as queries:
+            result = Favourite.toggle_favourite(user_id, recipe_id)
+        self.assertEqual(
+            result, ("removed", self.recipe.title),
+            msg="Should have removed favourite")
+        self.assertFalse(
+            Favourite.is_recipe_favourite(self.user, self.recipe),
+            msg="Favourite exists after toggle")
+        statements = [
+            query['sql'] for query in queries
+            if not query['sql'].upper().startswith(
+                ("SAVEPOINT", "RELEASE", "ROLLBACK"))]
+        self.assertEqual(
+            len(statements), 1,
+            msg="Incorrect number of statements for remove")
+
+        with self.assertRaises(
+            Recipe.DoesNotExist,
+                msg="Error not raised when recipe does not exist"):
+            Favourite.toggle_favourite(user_id, 999)
+        self.assertFalse(
+            Favourite.objects.exists(),
+            msg="Favourite created for missing recipe")
+
+    def test_get_user_favourite_ids_cached(self):
+        """
+        Test that the favourite IDs of a user are queried once and then taken
+        from the cache, and that the cached IDs are updated when a favourite
+        is toggled, or created or deleted through the ORM.
+        """
+        recipe2 = Recipe.objects.create(
+            title="Test favourite recipe 2",
+            author=self.super_user,
+            slug="test-favourite-recipe-2",
+            status=1,
+        )
+        Favourite.objects.create(user=self.user, recipe=recipe2)
+        self.assertEqual(
+            list(Favourite.get_user_favourite_ids(self.user)), [recipe2.id],
+            msg="Incorrect favourite ids")
+        with self.assertNumQueries(0):
+            favourite_ids = Favourite.get_user_favourite_ids(self.user)
+        self.assertIn(recipe2.id, favourite_ids, msg="Cached id missing")
+        self.assertNotIn(
+            self.recipe.id, favourite_ids, msg="Incorrect cached id")
+
+        Favourite.toggle_favourite(self.user.id, self.recipe.id)
+        self.assertEqual(
+            list(Favourite.get_user_favourite_ids(self.user)),
+            [self.recipe.id, recipe2.id],
+            msg="Cached ids not updated after toggle")
+
+        Favourite.objects.filter(user=self.user, recipe=recipe2).delete()
+        self.assertEqual(
+            list(Favourite.get_user_favourite_ids(self.user)),
+            [self.recipe.id],
+            msg="Cached ids not updated after deletion")
@@ -28,6 +28,9 @@ class TestRatingModel(TestCase):
         - `test_get_user_rating_of_recipe`: Test that the method returns the
         user's existing rating value for a given recipe, or None if the user
         has not rated the recipe.
+        - `test_rating_aggregates_updated`: Test that the rating aggregates
+        stored on the recipe follow ratings being created, updated and
+        deleted.
     """
     def setUp(self):
         """ Set up mock test data """
@@ -152,3 +155,48 @@ class TestRatingModel(TestCase):
             user_id=user.id, recipe_id=self.recipe.id)
         self.assertIsNone(
             noneRating, msg="Returned incorrect rating value. Should be none")
+
+    def test_rating_aggregates_updated(self):
+        """
+        Test that the rating aggregates stored on the recipe follow ratings
+        being created, updated and deleted.
+        """
+        user_2 = User.objects.create_user(
+            username="testuser2", email="test2@test.com",
+            password="test2password"
+        )
+        rating = Rating.objects.create(
+            user=self.user, recipe=self.recipe, rating=2)
+        Rating.objects.create(user=user_2, recipe=self.recipe, rating=5)
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            self.recipe.ratings_count, 2, msg="Incorrect count after create")
+        self.assertEqual(
+            self.recipe.avg_rating, 3.5, msg="Incorrect avg after create")
+        self.assertEqual(
+            self.recipe.ratings_histogram, {1: 0, 2: 1, 3: 0, 4: 0, 5: 1},
+            msg="Incorrect histogram after create")
+
+        # Update the first rating
+        rating.rating = 4
+        rating.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            self.recipe.ratings_count, 2, msg="Incorrect count after update")
+        self.assertEqual(
+            self.recipe.ratings_sum, 9, msg="Incorrect sum after update")
+        self.assertEqual(
+            self.recipe.ratings_histogram, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1},
+            msg="Incorrect histogram after update")
+
+        # Delete both ratings, one through a queryset
+        rating.delete()
+        Rating.objects.filter(user=user_2).delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            self.recipe.ratings_count, 0, msg="Incorrect count after delete")
+        self.assertEqual(
+            self.recipe.avg_rating, 0.0, msg="Incorrect avg after delete")
+        self.assertEqual(
+            self.recipe.ratings_histogram, {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
+            msg="Incorrect histogram after delete")
@@ -33,6 +33,10 @@ class TestRecipeModel(TestCase):
         raised when the category field has an invalid value.
         - `test_status_invalid_choice`: Test that a validation error is raised
         when the status field has an invalid value.
+        - `test_rendered_html_sanitized`: Test that saving a recipe stores the
+        sanitized HTML, plain text and word count of its content.
+        - `test_rendered_html_keeps_summernote_markup`: Test that saving a
+        recipe keeps the images, videos and styled text Summernote produces.
     """
 
     def setUp(self):
@@ -301,3 +305,65 @@ class TestRecipeModel(TestCase):
             self.fail(
                 "ValidationError not raised for an invalid status choice."
                 )
+
+    def test_rendered_html_sanitized(self):
+        """
+        Test that saving a recipe stores the sanitized HTML of the content
+        and ingredients, without scripts, event handlers or javascript links,
+        and the plain text and word count of the content.
+        """
+        self.recipe.content = (
+            '<p onclick="steal()">Chop the <b>onions</b>.</p>'
+            '<script>steal()</script><a href="javascript:steal()">Fry</a>')
+        self.recipe.ingredients = '<ul><li style="color: red">Onions</li></ul>'
+        self.recipe.save()
+        self.recipe.refresh_from_db()
+
+        self.assertEqual(
+            self.recipe.content_html,
+            '<p>Chop the <b>onions</b>.</p><a>Fry</a>',
+            msg="Content HTML not sanitized")
+        self.assertEqual(
+            self.recipe.ingredients_html,
+            '<ul><li style="color: red;">Onions</li></ul>',
+            msg="Ingredients HTML not sanitized")
+        self.assertEqual(
+            self.recipe.content_text, "Chop the onions . Fry",
+            msg="Incorrect plain text")
+        self.assertEqual(
+            self.recipe.word_count, 5, msg="Incorrect word count")
+
+    def test_rendered_html_keeps_summernote_markup(self):
+        """
+        Test that saving a recipe keeps the images, embedded videos, fonts
+        and styled text Summernote produces, without disallowed styles,
+        event handlers, videos from other hosts or style sheets.
+        """
+        self.recipe.content = (
+            '<p style="text-align: center;"><img style="width: 50%; '
+            'float: right; position: fixed;" data-filename="soup.jpg" '
+            'src="https://res.cloudinary.com/demo/image/upload/soup.jpg" '
+            'onerror="steal()"><span style="font-family: &quot;Comic Sans '
+            'MS&quot;; font-size: 18px; color: rgb(255, 0, 0);">Hot</span> '
+            '<font color="#0000ff">soup</font></p>'
+            '<style>p { display: none; }</style>'
+            '<iframe frameborder="0" src="//www.youtube.com/embed/abc" '
+            'width="640" height="360" class="note-video-clip"></iframe>'
+            '<iframe src="https://example.com/steal"></iframe>')
+        self.recipe.save()
+        self.recipe.refresh_from_db()
+
+        self.assertEqual(
+            self.recipe.content_html,
+            '<p style="text-align: center;"><img style="width: 50%; '
+            'float: right;" data-filename="soup.jpg" '
+            'src="https://res.cloudinary.com/demo/image/upload/soup.jpg">'
+            '<span style=\'font-family: "Comic Sans MS"; font-size: 18px; '
+            'color: rgb(255, 0, 0);\'>Hot</span> '
+            '<font color="#0000ff">soup</font></p>'
+            '<iframe frameborder="0" src="//www.youtube.com/embed/abc" '
+            'width="640" height="360" class="note-video-clip"></iframe>'
+            '<iframe></iframe>',
+            msg="Summernote markup not kept")
+        self.assertEqual(
+            self.recipe.content_text, "Hot soup", msg="Incorrect plain text")
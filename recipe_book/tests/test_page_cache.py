@@ -0,0 +1,100 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from recipe_book.models import Recipe, Comment, Rating
+
+
+class TestAnonymousPageCache(TestCase):
+    """
+    A test case class to test the full-page cache for anonymous visitors.
+
+    Test methods:
+        - `setUp`: Sets up test mock data.
+        - `test_anonymous_pages_served_from_cache`: Test that repeated
+        anonymous requests are answered without database queries.
+        - `test_query_string_normalised`: Test that the order of the query
+        parameters does not matter.
+        - `test_cache_invalidated_by_changes`: Test that cached pages are
+        rendered again after a recipe, rating or comment changes.
+        - `test_logged_in_pages_not_cached`: Test that pages of logged in
+        users are neither cached nor served from the cache.
+    """
+
+    def setUp(self):
+        """ Set up test mock data including a mock user and recipe. """
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        self.recipe = Recipe.objects.create(
+            title="Test Recipe",
+            author=self.user,
+            slug="test-recipe",
+            content="Test Recipe Content",
+            teaser="The first teaser",
+            status=1,
+        )
+        self.detail_url = reverse(
+            'recipe_detail', kwargs={'slug': self.recipe.slug})
+
+    def test_anonymous_pages_served_from_cache(self):
+        """
+        Test that the home page, the recipe list page and the recipe page
+        are answered without database queries when cached, and contain no
+        CSRF token.
+        """
+        urls = [
+            (reverse('home_page'), {}),
+            (reverse('recipe_list_page'), {'q': 'all', 's': 'newest'}),
+            (self.detail_url, {}),
+        ]
+        for url, params in urls:
+            response = self.client.get(url, params)
+            self.assertEqual(
+                response.status_code, 200, msg="Status code is not 200")
+            self.assertNotContains(response, "csrf")
+            with self.assertNumQueries(0):
+                cached = self.client.get(url, params)
+            self.assertEqual(
+                cached.content, response.content, msg="Cached page differs")
+
+    def test_query_string_normalised(self):
+        """ Test that the order of the query parameters does not matter. """
+        url = reverse('recipe_list_page')
+        self.client.get(f"{url}?q=all&s=oldest")
+        with self.assertNumQueries(0):
+            self.client.get(f"{url}?s=oldest&q=all")
+
+    def test_cache_invalidated_by_changes(self):
+        """
+        Test that a cached recipe page is rendered again after the recipe is
+        edited, and after a rating or comment is added.
+        """
+        self.client.get(self.detail_url)
+        self.recipe.teaser = "The second teaser"
+        self.recipe.save()
+        response = self.client.get(self.detail_url)
+        self.assertContains(response, "The second teaser")
+
+        Rating.objects.create(user=self.user, recipe=self.recipe, rating=5)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(
+            response.context['rating_count'], 1, msg="Cached rating count")
+
+        Comment.objects.create(
+            body="A new comment", author=self.user, recipe=self.recipe)
+        response = self.client.get(self.detail_url)
+        self.assertContains(response, "A new comment")
+
+    def test_logged_in_pages_not_cached(self):
+        """
+        Test that a logged in user gets a rendered page with a CSRF token,
+        and that the page is not served to anonymous visitors.
+        """
+        self.client.login(username="testuser", password="testpassword")
+        response = self.client.get(self.detail_url)
+        self.assertContains(response, 'name="csrf-token"')
+        self.client.logout()
+        response = self.client.get(self.detail_url)
+        self.assertNotContains(response, "csrf")
+        self.assertContains(response, "Sign In")
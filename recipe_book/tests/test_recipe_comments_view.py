@@ -0,0 +1,148 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipe_book.models import Recipe, Comment
+from recipe_book.views.comments_list import COMMENTS_PER_PAGE
+
+
+class TestRecipeCommentsView(TestCase):
+    """
+    A test case class to test the paginated loading of the comments of a
+    recipe, on the recipe page and through the recipe_comments view.
+
+    Test methods:
+        - `setUp`: Sets up test mock data.
+        - `test_recipe_page_renders_first_page_of_comments`: Test that the
+        recipe page renders only the first page of comments.
+        - `test_load_all_comments`: Test loading all pages of comments by
+        following the cursors.
+        - `test_unapproved_comments_hidden`: Test that unapproved comments are
+        only loaded for their author.
+        - `test_query_count_independent_of_comments`: Test that the number
+        of queries does not grow with the number of comments and authors.
+        - `test_invalid_cursor`: Test loading comments with an invalid cursor.
+        - `test_recipe_does_not_exist`: Test loading comments of a nonexistent
+        recipe.
+    """
+
+    def setUp(self):
+        """
+        Set up test mock data including a mock user, recipe, and more than a
+        page of comments.
+        """
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        self.recipe = Recipe.objects.create(
+            title="Test Recipe",
+            author=self.user,
+            slug="test-recipe",
+            content="Test Recipe Content",
+            status=1,
+        )
+        self.comments = [
+            Comment.objects.create(
+                body=f"Comment {i}", author=self.user, recipe=self.recipe)
+            for i in range(COMMENTS_PER_PAGE * 2 + 1)
+        ]
+        self.url = reverse(
+            'recipe_comments', kwargs={'slug': self.recipe.slug})
+
+    def test_recipe_page_renders_first_page_of_comments(self):
+        """
+        Test that the recipe page renders only the first page of comments,
+        newest first, with a cursor for the next page.
+        """
+        response = self.client.get(reverse(
+            'recipe_detail', kwargs={'slug': self.recipe.slug}))
+        self.assertEqual(
+            response.status_code, 200, msg="Status code is not 200")
+        self.assertEqual(
+            [comment.id for comment in response.context['comments']],
+            [comment.id for comment in
+             self.comments[::-1][:COMMENTS_PER_PAGE]],
+            msg="Wrong comments on first page")
+        self.assertIsNotNone(
+            response.context['comments_next_cursor'],
+            msg="Missing cursor of next page")
+        self.assertContains(response, 'id="load-comments-btn"')
+
+    def test_load_all_comments(self):
+        """
+        Test loading all pages of comments by following the cursors, so each
+        comment is loaded exactly once.
+        """
+        response = self.client.get(reverse(
+            'recipe_detail', kwargs={'slug': self.recipe.slug}))
+        loaded = len(response.context['comments'])
+        cursor = response.context['comments_next_cursor']
+        while cursor:
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(
+                response.status_code, 200, msg="Status code is not 200")
+            data = response.json()
+            loaded += data['html'].count('class="row comment-container')
+            cursor = data['next_cursor']
+        self.assertEqual(
+            loaded, len(self.comments), msg="Not all comments loaded once")
+
+    def test_unapproved_comments_hidden(self):
+        """
+        Test that an unapproved comment is only loaded for its author.
+        """
+        Comment.objects.update(approved=False)
+        response = self.client.get(self.url, {'cursor': ''})
+        self.assertEqual(
+            response.json()['html'].count('class="row comment-container'), 0,
+            msg="Unapproved comments loaded for other users")
+        self.client.login(username="testuser", password="testpassword")
+        response = self.client.get(self.url, {'cursor': ''})
+        self.assertEqual(
+            response.json()['html'].count('class="row comment-container'),
+            COMMENTS_PER_PAGE,
+            msg="Unapproved comments not loaded for author")
+
+    def test_query_count_independent_of_comments(self):
+        """
+        Test that rendering the recipe page and loading a page of comments
+        take the same number of queries for a recipe with hundreds of
+        comments by different authors as for a recipe with a single page.
+        """
+        self.client.login(username="testuser", password="testpassword")
+        detail_url = reverse(
+            'recipe_detail', kwargs={'slug': self.recipe.slug})
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as detail_queries:
+                response = self.client.get(detail_url)
+            cursor = response.context['comments_next_cursor']
+            with CaptureQueriesContext(connection) as page_queries:
+                self.client.get(self.url, {'cursor': cursor})
+            return len(detail_queries), len(page_queries)
+
+        expected = count_queries()
+        authors = User.objects.bulk_create(
+            User(username=f"author{i}") for i in range(300))
+        Comment.objects.bulk_create(
+            Comment(body=f"Comment by {author.username}", author=author,
+                    recipe=self.recipe)
+            for author in authors)
+        response = self.client.get(self.url, {'cursor': ''})
+        self.assertContains(response, "Comment by author")
+        self.assertEqual(
+            count_queries(), expected,
+            msg="Number of queries grows with the number of comments")
+
+    def test_invalid_cursor(self):
+        """ Test loading comments with an invalid cursor returns 404. """
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(
+            response.status_code, 404, msg="Status code is not 404")
+
+    def test_recipe_does_not_exist(self):
+        """ Test loading comments of a nonexistent recipe returns 404. """
+        response = self.client.get(reverse(
+            'recipe_comments', kwargs={'slug': 'non-existing-slug'}))
+        self.assertEqual(
+            response.status_code, 404, msg="Status code is not 404")
@@ -1,8 +1,10 @@
 import json
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from recipe_book.models import Recipe, Favourite, Comment
+from recipe_book.models import Recipe, Favourite, Comment, Rating
 
 
 class TestRecipeDetailView(TestCase):
@@ -24,6 +26,8 @@ class TestRecipeDetailView(TestCase):
         - `test_render_recipe_detail_page_with_nonfavourited_recipe`: Test
         rendering a recipe detail page when the recipe is not favorited by the
         logged-in user.
+        - `test_render_recipe_detail_page_in_one_query`: Test that the recipe
+        and its derived figures are fetched in a single query.
         - `test_post_valid_comment`: Test posting a valid comment.
         - `test_post_comment_not_authenticated`: Test posting a comment while
         not logged in.
@@ -114,6 +118,45 @@ class TestRecipeDetailView(TestCase):
         self.assertFalse(
             response.context['is_favourite'], msg="Incorrectly favourited")
 
+    def test_render_recipe_detail_page_in_one_query(self):
+        """
+        Test that the recipe, its comment count, favourite flag and the user's
+        rating are fetched in a single query, with the correct values. The
+        small query of the version of the page (ETag) is not counted.
+        """
+        other_user = User.objects.create_user(
+            username="otheruser", password="testpassword")
+        Comment.objects.create(
+            body="Approved", author=other_user, recipe=self.recipe,
+            approved=True)
+        Comment.objects.create(
+            body="Not approved", author=other_user, recipe=self.recipe,
+            approved=False)
+        Rating.objects.create(user=self.user, recipe=self.recipe, rating=4)
+        Rating.objects.create(user=other_user, recipe=self.recipe, rating=2)
+        url = reverse('recipe_detail', kwargs={'slug': 'test-recipe'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(
+            response.status_code, 200, msg="Status code is not 200")
+        recipe_queries = [
+            query["sql"] for query in queries.captured_queries
+            if '"recipe_book_recipe"."content_html"' in query["sql"]
+            or 'FROM "recipe_book_favourite"' in query["sql"]
+            or 'FROM "recipe_book_rating"' in query["sql"]]
+        self.assertEqual(
+            len(recipe_queries), 1,
+            msg="Recipe figures not fetched in a single query")
+        self.assertEqual(
+            response.context['no_of_comments'], 1,
+            msg="Wrong number of approved comments")
+        self.assertTrue(
+            response.context['is_favourite'], msg="Should be favourite")
+        self.assertEqual(
+            response.context['user_rating'], 4, msg="Wrong user rating")
+        self.assertEqual(
+            response.context['rating_count'], 2, msg="Wrong rating count")
+
     def test_post_valid_comment(self):
         """
         Test posting a valid comment. Check that status code is 200 and that
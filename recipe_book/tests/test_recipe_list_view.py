@@ -1,7 +1,16 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from recipe_book.models import Recipe, Favourite
+from recipe_book.assets import MANIFEST_NAME
+from recipe_book.models import Recipe, Favourite, Rating, Comment
+from recipe_book.search import search_recipes
+from recipe_book.views import RecipeListView
 
 
 class TestRecipeListView(TestCase):
@@ -19,6 +28,10 @@ class TestRecipeListView(TestCase):
         - `test_render_recipe_list_page_with_no_result`: Test rendering the
         recipe list page with a search query for which there is no matching
         result.
+        - `test_search_matches_stemmed_ingredients`: Test that a search query
+        matches other word forms in the ingredients, ignoring HTML markup.
+        - `test_search_results_ordered_by_relevance`: Test that search results
+        with a match in the title are listed before matches in the content.
         - `test_render_recipe_list_page_with_category_search`: Test rendering
         the recipe list page with a category search result.
         - `test_recipe_list_page_pagination`: Test pagination on the recipe
@@ -26,6 +39,20 @@ class TestRecipeListView(TestCase):
         - `test_recipe_list_page_not_paginated`: Test to ensure the recipe
         list page is not paginated when the number of recipes is smaller than
         the paginate_by number.
+        - `test_result_count_cached`: Test that the number of results of a
+        search is counted once and reused until recipes change.
+        - `test_result_count_capped`: Test that the number of results is
+        capped at max_count and shown as "more than" max_count.
+        - `test_cursor_pagination`: Test that following the next and previous
+        cursors walks through all recipes in order, for each sort option.
+        - `test_search_cursor_pagination`: Test that following the next
+        cursors of search results visits every match once, by relevance.
+        - `test_invalid_cursor`: Test that an invalid cursor returns a 404.
+        - `test_cached_recipe_card_updated`: Test that the cached parts of a
+        recipe card are updated when the recipe, its ratings or its comments
+        change.
+        - `test_cached_recipe_card_new_deploy`: Test that the cached parts of
+        a recipe card are rendered again with new assets and templates.
     """
 
     def setUp(self):
@@ -113,6 +140,59 @@ class TestRecipeListView(TestCase):
             response.content,
             msg="Incorrect result is on page")
 
+    def test_search_matches_stemmed_ingredients(self):
+        """
+        Test that a search query matches other forms of a word in the
+        ingredients (e.g. "tomato" matches "Tomatoes"), and that HTML markup
+        in the ingredients is not searched.
+        """
+        Recipe.objects.create(
+            title="Pasta Sauce",
+            author=self.user,
+            slug="pasta-sauce",
+            content="Test Recipe Content",
+            ingredients="<ul><li>400 g Tomatoes</li><li>Garlic</li></ul>",
+            status=1,
+        )
+        response = self.client.get(
+            reverse('recipe_list_page'), {'q': 'tomato'})
+        self.assertEqual(response.status_code, 200, msg="Status code not 200")
+        self.assertIn(
+            b"Pasta Sauce", response.content, msg="Recipe not found")
+        self.assertNotIn(
+            b"Test Recipe 1", response.content, msg="Incorrect result")
+
+        response = self.client.get(reverse('recipe_list_page'), {'q': 'li'})
+        self.assertNotIn(
+            b"Pasta Sauce", response.content, msg="HTML markup was searched")
+
+    def test_search_results_ordered_by_relevance(self):
+        """
+        Test that search results are ordered by relevance when no sort
+        parameter is given, with a match in the title ranking above a match
+        in the content, even if the content match is newer.
+        """
+        in_title = Recipe.objects.create(
+            title="Lemon Chicken",
+            author=self.user,
+            slug="lemon-chicken",
+            content="Roast the chicken.",
+            status=1,
+        )
+        in_content = Recipe.objects.create(
+            title="Roast Chicken",
+            author=self.user,
+            slug="roast-chicken",
+            content="Season with salt, pepper and lemon zest.",
+            status=1,
+        )
+        response = self.client.get(
+            reverse('recipe_list_page'), {'q': 'lemon'})
+        self.assertEqual(
+            list(response.context['page_obj'].object_list),
+            [in_title, in_content],
+            msg="Search results not ordered by relevance")
+
     def test_render_recipe_list_page_with_category_search(self):
         """
         Test rendering the recipe list page with a category
@@ -175,3 +255,212 @@ class TestRecipeListView(TestCase):
         self.assertEqual(
             len(paginator.page(1).object_list), 2,
             msg="Incorrect no of results on page 1")
+
+    def test_result_count_cached(self):
+        """
+        Test that the number of results of a search is counted once, and
+        that the cached count is reused for the same search (with different
+        letter case), until a recipe is added.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('recipe_list_page'), {'q': 'all'})
+        self.assertEqual(
+            sum("COUNT(" in query['sql'] for query in queries), 1,
+            msg="Results not counted exactly once")
+        self.assertIn(
+            b"a total of 2.", response.content, msg="Incorrect count")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('recipe_list_page'), {'q': 'ALL'})
+        self.assertFalse(
+            any("COUNT(" in query['sql'] for query in queries),
+            msg="Cached count not used")
+        self.assertEqual(
+            response.context['paginator'].count, 2,
+            msg="Incorrect cached count")
+
+        Recipe.objects.create(
+            title="Test Recipe 3",
+            author=self.user,
+            slug="test-recipe-3",
+            content="Test Recipe 3 Content",
+            status=1,
+        )
+        response = self.client.get(reverse('recipe_list_page'), {'q': 'all'})
+        self.assertIn(
+            b"a total of 3.", response.content, msg="Cached count not updated")
+
+    def test_result_count_capped(self):
+        """
+        Test that the number of results is capped at max_count, and shown as
+        "more than" max_count in the heading.
+        """
+        with patch.object(RecipeListView, 'max_count', 1):
+            response = self.client.get(
+                reverse('recipe_list_page'), {'q': 'all'})
+        self.assertEqual(
+            response.context['paginator'].count, 1, msg="Count not capped")
+        self.assertIn(
+            b"a total of more than 1.",
+            response.content,
+            msg="Capped count not in heading")
+
+    def test_cursor_pagination(self):
+        """
+        Test that following the next cursors from the first page visits every
+        recipe once, in the order of the sort option, and that the previous
+        cursor of the last page leads back to the previous page.
+        """
+        for i in range(10):
+            recipe = Recipe.objects.create(
+                title=f"Test Recipe {i + 3}",
+                author=self.user,
+                slug=f"test-recipe-{i + 3}",
+                content="Test Recipe Content",
+                status=1,
+            )
+            # several recipes with the same rating, to test ties
+            Recipe.apply_rating_change(recipe.id, new_rating=i % 3 + 1)
+
+        for sort in RecipeListView.SORT_ORDERINGS:
+            expected = list(Recipe.objects.filter(status=1).order_by(
+                *RecipeListView.SORT_ORDERINGS[sort]))
+            pages = []
+            params = {'s': sort, 'cursor': ''}
+            while True:
+                response = self.client.get(
+                    reverse('recipe_list_page'), params)
+                self.assertEqual(
+                    response.status_code, 200, msg="Status code not 200")
+                page = response.context['page_obj']
+                pages.append(list(page.object_list))
+                if not page.has_next():
+                    break
+                self.assertIn(
+                    f"cursor={page.next_cursor}".encode(),
+                    response.content,
+                    msg="Next page link not on the page")
+                params['cursor'] = page.next_cursor
+            self.assertEqual(
+                [recipe for page in pages for recipe in page], expected,
+                msg=f"Incorrect recipes or order for sort '{sort}'")
+            self.assertEqual(
+                [len(page) for page in pages], [8, 4],
+                msg="Incorrect no of recipes per page")
+
+            params['cursor'] = response.context['page_obj'].previous_cursor
+            response = self.client.get(reverse('recipe_list_page'), params)
+            self.assertEqual(
+                list(response.context['page_obj'].object_list), pages[0],
+                msg="Previous cursor did not return the previous page")
+            self.assertFalse(
+                response.context['page_obj'].has_previous(),
+                msg="First page has a previous page")
+
+    def test_search_cursor_pagination(self):
+        """
+        Test that following the next cursors of a search visits every
+        matching recipe once, best match first, including recipes with equal
+        relevance on both sides of a page boundary.
+        """
+        for i in range(10):
+            Recipe.objects.create(
+                title=f"Test Recipe {i + 3}",
+                author=self.user,
+                slug=f"test-recipe-{i + 3}",
+                # two groups of recipes with the same relevance, so the
+                # page boundary falls between recipes with equal rank
+                content="Leek soup " + "with leeks " * (i // 5),
+                status=1,
+            )
+        expected = list(search_recipes(
+            Recipe.objects.filter(status=1), "leek"
+        ).order_by('-search_rank', '-created_on', '-id'))
+        self.assertEqual(len(expected), 10, msg="Incorrect no of matches")
+        recipes = []
+        params = {'q': 'leek', 'cursor': ''}
+        while True:
+            response = self.client.get(reverse('recipe_list_page'), params)
+            page = response.context['page_obj']
+            recipes.extend(page.object_list)
+            if not page.has_next():
+                break
+            params['cursor'] = page.next_cursor
+        self.assertEqual(
+            recipes, expected, msg="Incorrect search results or order")
+
+    def test_invalid_cursor(self):
+        """ Test that an invalid cursor returns a 404 response. """
+        response = self.client.get(
+            reverse('recipe_list_page'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404, msg="Status code not 404")
+
+    def test_cached_recipe_card_updated(self):
+        """
+        Test that the cached parts of a recipe card (rating stars, comment
+        count, title and teaser) are rendered again after a rating or comment
+        is added and after the recipe is updated, while the per-user heart
+        state is not cached.
+        """
+        params = {'q': 'chicken'}
+        response = self.client.get(reverse('recipe_list_page'), params)
+        self.assertIn(b"(0)", response.content, msg="Ratings count missing")
+
+        Rating.objects.create(user=self.user, recipe=self.recipe1, rating=4)
+        response = self.client.get(reverse('recipe_list_page'), params)
+        self.assertIn(
+            b"(1)", response.content, msg="Cached ratings count not updated")
+
+        Comment.objects.create(
+            body="Test comment", author=self.user, recipe=self.recipe1)
+        response = self.client.get(reverse('recipe_list_page'), params)
+        self.assertIn(
+            b"1 comment\n", response.content,
+            msg="Cached comment count not updated")
+
+        self.recipe1.teaser = "A new teaser"
+        self.recipe1.save()
+        response = self.client.get(reverse('recipe_list_page'), params)
+        self.assertIn(
+            b"A new teaser", response.content, msg="Cached teaser not updated")
+
+        self.favourite1.delete()
+        response = self.client.get(reverse('recipe_list_page'), params)
+        self.assertIn(
+            b"Add to favourites", response.content,
+            msg="Heart state cached with the card")
+
+    def test_cached_recipe_card_new_deploy(self):
+        """
+        Test that the cached parts of a recipe card are rendered again when
+        the version of the assets and templates changes, e.g. after a
+        deploy, even if the recipe did not change.
+        """
+        params = {'q': 'chicken'}
+        with tempfile.TemporaryDirectory() as build_dir:
+            manifest = os.path.join(build_dir, MANIFEST_NAME)
+            with override_settings(ASSETS_BUILD_DIR=build_dir):
+                with open(manifest, "w") as output:
+                    json.dump({"version": "old"}, output)
+                self.client.get(reverse('recipe_list_page'), params)
+                # a change the cached card does not know about
+                Recipe.objects.filter(pk=self.recipe1.pk).update(
+                    teaser="Deploy teaser")
+                response = self.client.get(
+                    reverse('recipe_list_page'), params)
+                self.assertNotIn(
+                    b"Deploy teaser", response.content,
+                    msg="Card not cached")
+
+            with override_settings(ASSETS_BUILD_DIR=build_dir + "/new"):
+                os.makedirs(build_dir + "/new")
+                with open(os.path.join(build_dir, "new", MANIFEST_NAME),
+                          "w") as output:
+                    json.dump({"version": "new"}, output)
+                response = self.client.get(
+                    reverse('recipe_list_page'), params)
+        self.assertIn(
+            b"Deploy teaser", response.content,
+            msg="Card of the previous deploy served")
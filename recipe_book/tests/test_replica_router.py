@@ -0,0 +1,156 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from recipe_book.cache import get_or_compute
+from recipe_book.models import Recipe, Favourite
+from recipe_book.replicas import (
+    STICKY_COOKIE_NAME, ReplicaRoutingMiddleware, _use_replica)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class TestReplicaRouter(TestCase):
+    """
+    A test case class to test that the read-only views read from the replica,
+    with two SQLite databases standing in for the primary and the replica.
+    The recipe is only on the primary until it is copied to the replica, as
+    if replication lagged behind.
+
+    Test methods:
+        - `setUp`: Sets up test mock data on the primary.
+        - `copy_to_replica`: Copies the user and recipe to the replica.
+        - `test_read_views_use_replica`: Test that the recipe page and recipe
+        list page read from the replica.
+        - `test_writes_use_primary`: Test that a favourite is written to the
+        primary.
+        - `test_reads_use_primary_after_write`: Test that a user reads from
+        the primary after writing.
+        - `test_cached_values_use_primary`: Test that a value computed to be
+        cached is read from the primary.
+        - `test_cached_pages_use_primary`: Test that a page cached for
+        anonymous visitors is rendered from the primary.
+        - `test_middleware_async`: Test that the middleware runs async
+        requests without a thread, and sets the sticky cookie.
+    """
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        """ Set up test mock data including a mock user and recipe. """
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        self.recipe = Recipe.objects.create(
+            title="Test Recipe",
+            author=self.user,
+            slug="test-recipe",
+            content="Test Recipe Content",
+            status=1,
+        )
+        self.detail_url = reverse(
+            'recipe_detail', kwargs={'slug': self.recipe.slug})
+        self.client.login(username="testuser", password="testpassword")
+
+    def copy_to_replica(self):
+        """ Copies the user and recipe to the replica, like replication. """
+        self.user.save(using="replica", force_insert=True)
+        self.recipe.save(using="replica", force_insert=True)
+        cache.clear()
+
+    def test_read_views_use_replica(self):
+        """
+        Test that the recipe page and recipe list page read from the replica,
+        so the recipe is not shown before it is on the replica.
+        """
+        response = self.client.get(self.detail_url)
+        self.assertEqual(
+            response.status_code, 404, msg="Recipe page read from primary")
+        response = self.client.get(reverse('recipe_list_page'))
+        self.assertNotContains(response, "Test Recipe")
+
+        self.copy_to_replica()
+        response = self.client.get(self.detail_url)
+        self.assertEqual(
+            response.status_code, 200, msg="Recipe page not read from replica")
+        response = self.client.get(reverse('recipe_list_page'))
+        self.assertContains(response, "Test Recipe")
+
+    def test_writes_use_primary(self):
+        """ Test that a favourite is written to the primary only. """
+        self.copy_to_replica()
+        response = self.client.post(
+            '/add-remove-favourite/', {'recipeId': self.recipe.id},
+            content_type='application/json')
+        self.assertEqual(
+            response.status_code, 200, msg="Status code is not 200")
+        self.assertTrue(
+            Favourite.objects.using("default").filter(
+                user=self.user).exists(),
+            msg="Favourite not written to the primary")
+        self.assertFalse(
+            Favourite.objects.using("replica").filter(
+                user=self.user).exists(),
+            msg="Favourite written to the replica")
+
+    def test_reads_use_primary_after_write(self):
+        """
+        Test that a write sets the sticky cookie, and that the user's reads
+        use the primary while the cookie is set.
+        """
+        response = self.client.post(
+            '/add-remove-favourite/', {'recipeId': self.recipe.id},
+            content_type='application/json')
+        self.assertIn(
+            STICKY_COOKIE_NAME, response.cookies, msg="Sticky cookie not set")
+        response = self.client.get(self.detail_url)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Recipe page not read from primary after a write")
+
+        del self.client.cookies[STICKY_COOKIE_NAME]
+        response = self.client.get(self.detail_url)
+        self.assertEqual(
+            response.status_code, 404, msg="Recipe page read from primary")
+
+    def test_cached_values_use_primary(self):
+        """
+        Test that a value computed to be cached is read from the primary,
+        while other reads of the request use the replica.
+        """
+        token = _use_replica.set(True)
+        try:
+            count = get_or_compute(
+                "recipe-count", Recipe.objects.count, 60)
+            replica_count = Recipe.objects.count()
+        finally:
+            _use_replica.reset(token)
+        self.assertEqual(count, 1, msg="Cached value read from the replica")
+        self.assertEqual(
+            replica_count, 0, msg="Uncached read not from the replica")
+
+    def test_cached_pages_use_primary(self):
+        """
+        Test that the recipe page of an anonymous visitor, which is cached,
+        is rendered from the primary.
+        """
+        response = Client().get(self.detail_url)
+        self.assertEqual(
+            response.status_code, 200,
+            msg="Cached page not rendered from the primary")
+
+    def test_middleware_async(self):
+        """
+        Test that the middleware is a coroutine function with an async
+        get_response, so Django does not run it in a thread under ASGI, and
+        that it sets the sticky cookie on the response to a write.
+        """
+        async def get_response(request):
+            return HttpResponse()
+        middleware = ReplicaRoutingMiddleware(get_response)
+        self.assertTrue(
+            iscoroutinefunction(middleware), msg="Middleware not async")
+        request = RequestFactory().post("/add-remove-favourite/")
+        response = async_to_sync(middleware)(request)
+        self.assertIn(
+            STICKY_COOKIE_NAME, response.cookies, msg="Sticky cookie not set")
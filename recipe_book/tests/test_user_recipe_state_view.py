@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipe_book.models import Recipe, Favourite, Rating
+
+
+class TestUserRecipeStateView(TestCase):
+    """
+    A test case class to test the user_recipe_state view, returning the
+    user's favourites and ratings of the recipes on a page.
+
+    Test methods:
+        - `setUp`: Sets up test mock data.
+        - `test_user_recipe_state`: Test the favourites and ratings returned
+        for a logged in user, fetched in one query.
+        - `test_user_recipe_state_not_logged_in`: Test the state returned for
+        a user who is not logged in.
+        - `test_user_recipe_state_invalid_ids`: Test the response for invalid
+        recipe ids.
+    """
+
+    def setUp(self):
+        """
+        Set up test mock data including a mock user, three recipes, a
+        favourite and a rating.
+        """
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword")
+        self.recipes = [
+            Recipe.objects.create(
+                title=f"Test Recipe {i}",
+                author=self.user,
+                slug=f"test-recipe-{i}",
+                content="Test Recipe Content",
+                status=1,
+            )
+            for i in range(3)
+        ]
+        Favourite.objects.create(user=self.user, recipe=self.recipes[0])
+        Rating.objects.create(user=self.user, recipe=self.recipes[1], rating=4)
+        self.ids = ",".join(str(recipe.id) for recipe in self.recipes)
+        self.url = reverse('user_recipe_state')
+
+    def test_user_recipe_state(self):
+        """
+        Test that a logged in user gets the favourited recipe and the rating,
+        fetched in a single query.
+        """
+        self.client.login(username="testuser", password="testpassword")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'ids': self.ids})
+        self.assertEqual(
+            response.status_code, 200, msg="Status code is not 200")
+        self.assertEqual(response.json(), {
+            'logged_in': True,
+            'favourites': [self.recipes[0].id],
+            'ratings': {str(self.recipes[1].id): 4},
+        }, msg="Incorrect user state")
+        state_queries = [
+            query for query in queries.captured_queries
+            if 'recipe_book_' in query["sql"]]
+        self.assertEqual(
+            len(state_queries), 1, msg="State not fetched in one query")
+
+    def test_user_recipe_state_not_logged_in(self):
+        """ Test that a user who is not logged in gets an empty state. """
+        response = self.client.get(self.url, {'ids': self.ids})
+        self.assertEqual(response.json(), {
+            'logged_in': False, 'favourites': [], 'ratings': {}},
+            msg="Incorrect state for user not logged in")
+
+    def test_user_recipe_state_invalid_ids(self):
+        """ Test that invalid recipe ids return a 400 response. """
+        self.client.login(username="testuser", password="testpassword")
+        response = self.client.get(self.url, {'ids': '1,abc'})
+        self.assertEqual(
+            response.status_code, 400, msg="Status code is not 400")
@@ -10,6 +10,11 @@ urlpatterns = [
         views.RecipeDetailView.as_view(),
         name='recipe_detail'
         ),
+    path(
+        'recipes/<slug:slug>/comments/',
+        views.recipe_comments,
+        name='recipe_comments'
+        ),
     path(
         'favourites/',
         views.FavouritesList.as_view(),
@@ -26,4 +31,9 @@ urlpatterns = [
         name='add_update_rating'
         ),
     path('delete-rating/', views.delete_rating, name='delete_rating'),
+    path(
+        'user-recipe-state/',
+        views.user_recipe_state,
+        name='user_recipe_state'
+        ),
 ]
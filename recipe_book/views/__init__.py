@@ -1,7 +1,9 @@
 from .recipe_list import *
 from .features_list import *
 from .recipe_detail import *
+from .comments_list import *
 from .favourites_list import *
 from .favourites_crud import *
 from .ratings_crud import *
+from .user_state import *
 from .errors import *
@@ -0,0 +1,65 @@
+from django.http import Http404, JsonResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET
+from ..models import Recipe, Comment
+from ..pagination import KeysetPaginator
+
+# Number of comments rendered per page of the comments section
+COMMENTS_PER_PAGE = 10
+# Newest first, the id makes the ordering unique for cursor pagination
+COMMENTS_ORDERING = ("-created_on", "-id")
+
+
+def get_comments_page(recipe_id, user, cursor=""):
+    """
+    Returns a page of the comments of a recipe visible to a user, newest
+    first, using cursor pagination.
+
+    Args:
+        recipe_id (int): The ID of the recipe.
+        user (User): The user viewing the comments.
+        cursor (str): The cursor of the page, or an empty string for the first
+        page.
+
+    Returns:
+        KeysetPage: The page of comments, with the cursor of the next page.
+
+    Raises:
+        Http404: If the cursor is invalid.
+    """
+    paginator = KeysetPaginator(
+        Comment.get_visible_comments(recipe_id, user), COMMENTS_PER_PAGE)
+    return paginator.cursor_page(cursor, COMMENTS_ORDERING)
+
+
+@require_GET
+def recipe_comments(request, slug):
+    """
+    View to handle GET requests for further pages of the comments of a
+    recipe, loaded by the "Load more comments" button of the recipe page.
+
+    Args:
+        request (HttpRequest): HTTP request object containing the cursor of
+        the page.
+        slug (str): The slug of the recipe.
+
+    Returns:
+        JsonResponse: JSON response with the rendered comments (html) and the
+        cursor of the next page (next_cursor), which is null on the last
+        page.
+
+    Raises:
+        Http404: If no published recipe has the slug, or the cursor is
+        invalid.
+    """
+    recipe_id = Recipe.objects.filter(
+        status=1, slug=slug).values_list("id", flat=True).first()
+    if recipe_id is None:
+        raise Http404("No recipe found matching the query")
+    page = get_comments_page(
+        recipe_id, request.user, request.GET.get("cursor", ""))
+    html = render_to_string(
+        "components/comments.html",
+        {"comments": page.object_list},
+        request=request)
+    return JsonResponse({"html": html, "next_cursor": page.next_cursor})
@@ -1,16 +1,15 @@
 import json
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import HttpResponseNotAllowed, JsonResponse
+from ..async_helpers import aget_user
 from ..models import Recipe, Favourite
 
 
-@require_POST
-def add_remove_favourite(request):
+async def add_remove_favourite(request):
     """
-    View to handle POST request to add/remove recipe from a user's favourites.
-    If the user is authenticated, the recipe will be added to or removed from
-    the users favourites based on whether it was already a favourite or not.
-    Messages are returned to provide user feedback.
+    Async view to handle POST request to add/remove recipe from a user's
+    favourites. If the user is authenticated, the recipe will be added to or
+    removed from the users favourites based on whether it was already a
+    favourite or not. Messages are returned to provide user feedback.
 
     Args:
         request (HttpRequest): HTTP request object containing the recipe id.
@@ -18,38 +17,33 @@ def add_remove_favourite(request):
     Returns:
         JsonResponse: JSON response indicating success or failure.
     """
-    if request.method == 'POST':
-        user = request.user
-        if user.is_authenticated:
-            user_id = user.id
-            try:
-                data = json.loads(request.body)
-                recipe_id = data.get("recipeId")
-                is_favourite = Favourite.is_recipe_favourite_by_ids(
-                    user_id, recipe_id)
-                # handle case where recipe is a favourite of the user
-                if (is_favourite):
-                    confirm = Favourite.delete_favourite(user_id, recipe_id)
-                    if (confirm):
-                        return JsonResponse(
-                            {"action": "removed",
-                                "message": "Removed from favourites: " +
-                                Recipe.objects.get(id=recipe_id).title},
-                            status=200)
-                # handle case where recipe is not a favourite of the user
-                else:
-                    confirm = Favourite.create_favourite(user_id, recipe_id)
-                    if (confirm):
-                        return JsonResponse(
-                            {"action": "created",
-                                "message": "Added to favourites: " +
-                                Recipe.objects.get(id=recipe_id).title},
-                            status=200)
-            except json.JSONDecodeError:
-                return JsonResponse(
-                    {"message": "Sorry, something went wrong!"},
-                    status=400)
-        else:
+    # the require_POST decorator does not support async views in Django 4.2
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    user = await aget_user(request)
+    if user.is_authenticated:
+        user_id = user.id
+        try:
+            data = json.loads(request.body)
+            recipe_id = int(data.get("recipeId"))
+            # add or remove the favourite, depending on whether it exists
+            action, title = await Favourite.atoggle_favourite(
+                user_id, recipe_id)
+            if action == "removed":
+                message = "Removed from favourites: " + title
+            else:
+                message = "Added to favourites: " + title
             return JsonResponse(
-                        {"message": "Log in to favourite recipes"},
-                        status=401)
+                {"action": action, "message": message}, status=200)
+        except Recipe.DoesNotExist:
+            return JsonResponse(
+                {"message": "Sorry, we could not find this recipe"},
+                status=404)
+        except (json.JSONDecodeError, TypeError, ValueError):
+            return JsonResponse(
+                {"message": "Sorry, something went wrong!"},
+                status=400)
+    else:
+        return JsonResponse(
+            {"message": "Log in to favourite recipes"},
+            status=401)
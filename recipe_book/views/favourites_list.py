@@ -1,64 +1,56 @@
-from django.db import models
 from django.views.generic import ListView
-from ..models import Recipe, Favourite, Rating
+from ..models import Recipe, Favourite
+from ..pagination import KeysetPaginationMixin, KeysetPaginator
 
 
-class FavouritesList(ListView):
+class FavouritesList(KeysetPaginationMixin, ListView):
     """
     View to display a list of a user's favorite recipes. If the user is
-    authenticated, the view will return the user's favourite recipes, + some
-    additional data such as average rating and rating count. If the user is not
-    authenticated, the view will return an empty queryset.
+    authenticated, the view will return the user's favourite recipes. If the
+    user is not authenticated, the view will return an empty queryset.
+    Paginated by page number, or by cursor if the request has a cursor
+    parameter.
 
     Attributes:
         model (Model): The model associated with the view (Recipe).
         template_name (str): The name of the template used for rendering the
         view.
         paginate_by (int): The number of items to paginate by.
+        paginator_class (class): Paginator supporting cursor pagination.
+        keyset_ordering (tuple): The ordering of the recipes, newest first.
+        use_read_replica (bool): GET requests may read from a replica.
 
     Methods:
         get_queryset(self): Retrieves the queryset of favorite recipes for the
         authenticated user or an empty queryset if user is not authenticated.
-        Annotates each recipe object with additional details.
         get_context_data(self, **kwargs): Adds extra context data, the range
         used for creating star buttons.
     """
     model = Recipe
     template_name = "recipe_book/favourites.html"
     paginate_by = 8
+    paginator_class = KeysetPaginator
+    keyset_ordering = ('-created_on', '-id')
+    use_read_replica = True
 
     def get_queryset(self):
         """
         Retrieves the queryset of favorite recipes for an authenticated user.
 
         Returns:
-            QuerySet: The queryset of favorite recipes with additional
-            annotations if the user is authenticated, or an empty queryset if
-            the user is not authenticated.
+            QuerySet: The queryset of favorite recipes if the user is
+            authenticated, or an empty queryset if the user is not
+            authenticated.
         """
         user = self.request.user
         if user.is_authenticated:
-            favourite_recipes = Favourite.get_user_favourite_ids(user)
-            base = Recipe.objects.filter(id__in=favourite_recipes, status=1)
-            # https://docs.djangoproject.com/en/5.0/ref/models/querysets/#annotate
-            queryset = base.annotate(
-                avg_rating=models.Avg('rating_recipe__rating'),
-                ratings_count=models.Count('rating_recipe')
-            )
-            # create a subquery to get the user's rating for each recipe
-            ratings_subquery = Rating.objects.filter(
-                recipe=models.OuterRef('pk'),
-                user=user
-            ).values('rating')[:1]
-
-            # Annotate the queryset with user's rating
-            queryset = queryset.annotate(
-                user_rating=models.Subquery(
-                    ratings_subquery,
-                    output_field=models.IntegerField(default=None))
-            )
-
-            return queryset
+            # the favourite ids are cached, so no Favourite query is needed
+            favourite_recipes = list(Favourite.get_user_favourite_ids(user))
+            # avg rating and rating count are stored on the recipe
+            # the user's ratings are added in the browser
+            return Recipe.objects.filter(
+                id__in=favourite_recipes, status=1
+            ).order_by(*self.keyset_ordering)
 
         else:
             return Recipe.objects.none()
@@ -1,13 +1,22 @@
 import json
+from django.db.models import Exists, IntegerField, OuterRef, Subquery, Value
 from django.views.generic import DetailView
-from django.http import JsonResponse
-from ..models import Recipe, Favourite, Rating
+from django.http import Http404, JsonResponse
+from ..cache import (
+    RECIPES_VERSION, get_version, recipe_comments_version, user_version)
+from ..conditional import ConditionalGetMixin
+from ..page_cache import AnonymousPageCacheMixin
+from ..models import Recipe, Favourite, Rating, Comment
 from ..forms import CommentForm
+from .comments_list import get_comments_page
 
 
-class RecipeDetailView(DetailView):
+class RecipeDetailView(
+        AnonymousPageCacheMixin, ConditionalGetMixin, DetailView):
     """
-    View for displaying details of a single recipe.
+    View for displaying details of a single recipe. Answers 304 Not Modified
+    if the browser has the current version of the page. Pages of anonymous
+    visitors are cached.
 
     Attributes:
         queryset (QuerySet): The queryset used to retrieve recipe objects with
@@ -18,11 +27,94 @@ class RecipeDetailView(DetailView):
         the template context.
         slug_url_kwarg (str): The name of the URL keyword argument containing
         the recipe slug.
+        use_read_replica (bool): GET requests may read from a replica.
+
+    Methods:
+        get_etag_parts(): Returns the values identifying the version of the
+        page.
+        get_queryset(): Returns the published recipes, annotated with the
+        figures shown on the page.
+        get_object(queryset=None): Returns the recipe, fetched once per
+        request.
+        get_context_data(**kwargs): Adds extra context data for rendering the
+        recipe detail template.
+        get_recipe_id(): Returns the id of the recipe.
+        get_comment(comment_id): Returns a comment of the recipe.
+        post(request, *args, **kwargs): Adds a comment to the recipe.
+        delete(request, *args, **kwargs): Deletes a comment of the recipe.
+        put(request, *args, **kwargs): Updates a comment of the recipe.
     """
     queryset = Recipe.objects.filter(status=1)
     template_name = "recipe_book/recipe-page.html"
     context_object_name = "recipe"
     slug_url_kwarg = "slug"
+    use_read_replica = True
+
+    def get_etag_parts(self):
+        """
+        Returns the values identifying the version of the page: the stored
+        update time, rating aggregates and comment count of the recipe, and
+        the versions of the recipes (bumped when recipes are rendered again),
+        of its comments and of the user's own state (favourites and ratings),
+        fetched in one small query and from the cache.
+
+        Returns:
+            list or None: The values, or None if no published recipe has the
+            slug, so the normal 404 response is given.
+        """
+        recipe = Recipe.objects.filter(
+            status=1, slug=self.kwargs[self.slug_url_kwarg]
+        ).values_list(
+            "id", "updated_on", "ratings_count", "ratings_sum",
+            "approved_comments_count").first()
+        if recipe is None:
+            return None
+        return [
+            recipe,
+            get_version(RECIPES_VERSION),
+            get_version(recipe_comments_version(recipe[0])),
+            get_version(user_version(self.request.user.id)),
+        ]
+
+    def get_queryset(self):
+        """
+        Returns the published recipes, annotated, for an authenticated user,
+        with whether the recipe is a favourite of the user (is_favourite) and
+        the user's rating (user_rating). The rating aggregates and number of
+        approved comments are stored on the recipe, so the recipe and all
+        figures derived from it are fetched in a single query.
+
+        Returns:
+            QuerySet: The annotated recipe queryset.
+        """
+        user = self.request.user
+        # the page shows the HTML rendered when the recipe was saved
+        queryset = super().get_queryset().defer(
+            "content", "ingredients", "content_text", "search_document")
+        if not user.is_authenticated:
+            return queryset.annotate(
+                is_favourite=Value(False),
+                user_rating=Value(None, output_field=IntegerField()))
+        return queryset.annotate(
+            is_favourite=Exists(Favourite.objects.filter(
+                user=user, recipe=OuterRef("pk"))),
+            user_rating=Subquery(Rating.objects.filter(
+                user=user, recipe=OuterRef("pk")).values("rating")[:1]))
+
+    def get_object(self, queryset=None):
+        """
+        Returns the recipe, reusing the object already fetched during the
+        request.
+
+        Returns:
+            Recipe: The annotated recipe object.
+
+        Raises:
+            Http404: If no published recipe has the slug.
+        """
+        if queryset is None and getattr(self, "object", None) is not None:
+            return self.object
+        return super().get_object(queryset)
 
     def get_context_data(self, **kwargs):
         """
@@ -40,30 +132,70 @@ class RecipeDetailView(DetailView):
                 buttons.
                 - 'user_rating' (int): The rating given by the current user for
                 the recipe.
-                - 'comments' (QuerySet): The comments associated with the
-                recipe.
+                - 'comments' (list): The first page of comments of the
+                recipe visible to the user.
+                - 'comments_next_cursor' (str or None): The cursor of the next
+                page of comments, if any.
                 - 'no_of_comments' (int): The number of approved comments for
                 the recipe.
                 - 'comment_form' (CommentForm): The form for adding comments.
         """
         context = super().get_context_data(**kwargs)
-        recipe = self.get_object()
-        user = self.request.user
-        # print("Image url:", recipe.feature_image.secure_url)
-        comments = recipe.comments.all().order_by("-created_on")
-        no_of_comments = comments.filter(approved=True).count()
+        recipe = self.object
+        # only the first page of comments, further pages are loaded by the
+        # recipe_comments view
+        comments_page = get_comments_page(recipe.id, self.request.user)
         comment_form = CommentForm()
         context['comment_form'] = comment_form
-        context['comments'] = comments
-        context['no_of_comments'] = no_of_comments
-        context['is_favourite'] = Favourite.is_recipe_favourite(user, recipe)
-        context['avg_rating'] = Rating.get_recipe_avg_rating(recipe.id)
-        context['rating_count'] = Rating.get_recipe_no_of_ratings(recipe.id)
+        context['comments'] = comments_page.object_list
+        context['comments_next_cursor'] = comments_page.next_cursor
+        context['no_of_comments'] = recipe.approved_comments_count
+        context['is_favourite'] = recipe.is_favourite
+        context['avg_rating'] = recipe.avg_rating
+        context['rating_count'] = recipe.ratings_count
         context['stars_range'] = range(1, 6)
-        context['user_rating'] = Rating.get_user_rating_of_recipe(
-            user.id, recipe.id)
+        context['user_rating'] = recipe.user_rating
         return context
 
+    def get_recipe_id(self):
+        """
+        Returns the id of the recipe, without fetching the whole recipe, for
+        requests changing its comments.
+
+        Returns:
+            int: The id of the recipe.
+
+        Raises:
+            Http404: If no published recipe has the slug.
+        """
+        recipe_id = Recipe.objects.filter(
+            status=1, slug=self.kwargs[self.slug_url_kwarg]
+        ).values_list("id", flat=True).first()
+        if recipe_id is None:
+            raise Http404("No recipe found matching the query")
+        return recipe_id
+
+    def get_comment(self, comment_id):
+        """
+        Returns a comment of the recipe.
+
+        Args:
+            comment_id (int): The id of the comment.
+
+        Returns:
+            Comment or None: The comment, or None if the recipe has no comment
+            with the id.
+
+        Raises:
+            Http404: If no published recipe has the slug.
+        """
+        recipe_id = self.get_recipe_id()
+        try:
+            return Comment.objects.filter(
+                recipe_id=recipe_id, id=comment_id).first()
+        except (TypeError, ValueError):
+            return None
+
     def post(self, request, *args, **kwargs):
         """
         Handles POST requests to add a new comment to the recipe.
@@ -79,7 +211,7 @@ class RecipeDetailView(DetailView):
             if comment_form.is_valid():
                 comment = comment_form.save(commit=False)
                 comment.author = request.user
-                comment.recipe = self.get_object()
+                comment.recipe_id = self.get_recipe_id()
                 comment.save()
                 response_data = {
                     "body": comment.body,
@@ -110,15 +242,14 @@ class RecipeDetailView(DetailView):
         """
         # get commentId from request url
         comment_id = request.GET.get("commentId")
-        recipe = self.get_object()
         # get the comment with matching id
-        comment = recipe.comments.filter(id=comment_id).first()
+        comment = self.get_comment(comment_id)
         if comment is None:
             return JsonResponse(
                 {'message': 'Comment could not be found'},
                 status=400)
 
-        if comment.author == request.user:
+        if comment.author_id == request.user.id:
             comment.delete()
             return JsonResponse({'message': "Comment succesfully deleted!"},
                                 status=200)
@@ -137,14 +268,13 @@ class RecipeDetailView(DetailView):
         """
         data = json.loads(request.body)
         comment_id = data["commentId"]
-        recipe = self.get_object()
-        comment = recipe.comments.filter(id=comment_id).first()
+        comment = self.get_comment(comment_id)
 
         if comment is None:
             return JsonResponse(
                 {'message': 'Comment not found'}, status=400)
 
-        elif comment.author != request.user:
+        elif comment.author_id != request.user.id:
             return JsonResponse(
                 {'message': 'You are not authorised to edit this comment'},
                 status=401)
@@ -1,58 +1,79 @@
-from django.db import models
 from django.views.generic import ListView
-from django.db.models import Q
-from ..models import Recipe, Favourite, Rating
+from ..cache import (
+    RECIPES_VERSION, RECIPE_STATS_VERSION, get_version, make_key)
+from ..conditional import ConditionalGetMixin
+from ..page_cache import AnonymousPageCacheMixin
+from ..models import Recipe
+from ..pagination import KeysetPaginationMixin, KeysetPaginator
+from ..search import get_search_terms, search_recipes
 
 
-class RecipeListView(ListView):
+class RecipeListView(AnonymousPageCacheMixin, ConditionalGetMixin,
+                     KeysetPaginationMixin, ListView):
     """
     View for displaying a list of recipes based on search queries and
     categories, or all published recipes if there is no search query.
+    Paginated by page number, or by cursor if the request has a cursor
+    parameter. Answers 304 Not Modified if the browser has the current
+    version of the page. Pages of anonymous visitors are cached.
 
     Attributes:
         model (Model): The model associated with the view (Recipe).
         template_name (str): The name of the template used to render the page.
         paginate_by (int): The number of items to paginate by.
+        paginator_class (class): Paginator caching the number of results,
+        supporting cursor pagination.
+        max_count (int): The highest number of results counted. Larger
+        result sets are shown as "more than max_count" results.
+        SORT_ORDERINGS (dict): The ordering of each sort option, ending with
+        the id so it is unique.
+        use_read_replica (bool): GET requests may read from a replica.
     """
     model = Recipe
     template_name = 'recipe_book/recipes.html'
     paginate_by = 8
+    paginator_class = KeysetPaginator
+    max_count = 10000
+    use_read_replica = True
+    SORT_ORDERINGS = {
+        "newest": ('-created_on', '-id'),
+        "oldest": ('created_on', 'id'),
+        "highest-rating": ('-avg_rating', '-id'),
+        "most-comments": ('-approved_comments_count', '-id'),
+    }
+
+    def get_etag_parts(self):
+        """
+        Returns the values identifying the version of the page: the request
+        parameters, and the versions of the set of recipes and of their
+        ratings and comments, read from the cache.
+
+        Returns:
+            list: The values.
+        """
+        return [
+            sorted(self.request.GET.lists()),
+            get_version(RECIPES_VERSION),
+            get_version(RECIPE_STATS_VERSION),
+        ]
 
     def get_queryset(self):
         """
         Retrieves the queryset of recipes based on search queries and
-        categories, or all published recipes if there is no query. Sorts the
-        recipes if a sort parameter is present. Annotates each recipe with
-        additional details avg rating, rating count, and if user is
-        authenticated, the users rating of the recipe.
+        categories, or all published recipes if there is no query. Free text
+        queries use the full-text search index. Sorts the recipes if a sort
+        parameter is present, else search results by relevance and other
+        recipes by newest first. The user's ratings and favourites are added
+        in the browser, so the recipes are the same for all users.
 
         Returns:
             Queryset: A filtered queryset of Recipe objects.
         """
         self.query = self.request.GET.get("q")
         self.sort = self.request.GET.get("s")
-        # https://docs.djangoproject.com/en/5.0/ref/models/querysets/#annotate
-        base_queryset = Recipe.objects.filter(status=1).annotate(
-            avg_rating=models.functions.Coalesce(
-                models.Avg('rating_recipe__rating'), models.Value(0.0)),
-            ratings_count=models.Count('rating_recipe'),
-        )
-
-        # if logged in user, annotate recipes with users rating of recipe
-        user = self.request.user
-        if user.is_authenticated:
-            # create a subquery to get the user's rating for each recipe
-            ratings_subquery = Rating.objects.filter(
-                recipe=models.OuterRef('pk'),
-                user=user
-            ).values('rating')[:1]
-
-            # Annotate the queryset
-            base_queryset = base_queryset.annotate(
-                user_rating=models.Subquery(
-                    ratings_subquery,
-                    output_field=models.IntegerField(default=None))
-            )
+        is_text_search = False
+        # avg rating and rating count are stored on the recipe
+        base_queryset = Recipe.objects.filter(status=1)
 
         # if there's a search query, filter recipes by it
         if self.query:
@@ -70,26 +91,46 @@ class RecipeListView(ListView):
                 case "vegetarian":
                     base_queryset = base_queryset.filter(category=5)
                 case _:
-                    title_query = Q(title__icontains=self.query)
-                    ingredients_query = Q(ingredients__icontains=self.query)
-                    base_queryset = base_queryset.filter(
-                        title_query | ingredients_query
-                    )
-
-        # if there's a sort query, sort recipes by it
-        if self.sort:
-            if self.sort == "newest":
-                base_queryset = base_queryset.order_by('-created_on')
-            elif self.sort == "oldest":
-                base_queryset = base_queryset.order_by('created_on')
-            elif self.sort == "highest-rating":
-                base_queryset = base_queryset.order_by('-avg_rating')
+                    base_queryset = search_recipes(base_queryset, self.query)
+                    is_text_search = True
+
+        # if there's a sort query, sort recipes by it. The id breaks ties, so
+        # the order is stable for cursor pagination
+        if self.sort in self.SORT_ORDERINGS:
+            self.keyset_ordering = self.SORT_ORDERINGS[self.sort]
+        elif is_text_search:
+            # order search results by relevance, best match first. The rank
+            # is computed per query, so it has no index, but only the
+            # matches found through the search index are sorted
+            self.keyset_ordering = ('-search_rank', '-created_on', '-id')
         else:
             # order queryset by newest by default
-            base_queryset = base_queryset.order_by('-created_on')
+            self.keyset_ordering = self.SORT_ORDERINGS["newest"]
+        base_queryset = base_queryset.order_by(*self.keyset_ordering)
 
         return base_queryset
 
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        """
+        Returns the paginator for the recipes, caching the number of results
+        under a key identifying the (normalised) search query, so repeated
+        identical searches are counted once until recipes change.
+
+        Returns:
+            CachedCountPaginator: The paginator.
+        """
+        query = (self.query or "").strip().lower()
+        if query not in (
+                "", "all", "chicken", "pork", "beef", "fish", "vegetarian"):
+            query = tuple(get_search_terms(query))
+        count_cache_key = make_key(
+            "recipe_count", query, self.max_count, version=RECIPES_VERSION)
+        return super().get_paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            count_cache_key=count_cache_key, max_count=self.max_count,
+            **kwargs)
+
     def get_context_data(self, **kwargs):
         """
         Adds extra context data for rendering the recipe list template.
@@ -98,22 +139,24 @@ class RecipeListView(ListView):
             dict: A dictionary containing additional context data.
                 - 'searchHeading' (str): A message indicating the search
                 results or lack thereof.
-                - 'user_favourites' (list): A list of recipe IDs favorited by
-                the current user, or an empty list if the user is not
-                authenticated or has no favorites.
                 - 'stars_range' (range): A range object used to create the star
         """
         context = super().get_context_data(**kwargs)
-        count = len(self.get_queryset())
+        # the paginator counts the results once (or gets a cached count)
+        paginator = context['paginator']
+        count = paginator.count
+        count_text = str(count)
+        if paginator.count_capped:
+            count_text = "more than " + count_text
 
         if self.query:
             if self.query == "all":
                 context['searchHeading'] = (
-                    "Showing all recipes, a total of " + str(count) + ".")
+                    "Showing all recipes, a total of " + count_text + ".")
             elif count > 0:
                 context['searchHeading'] = (
                     "Showing " +
-                    str(count) +
+                    count_text +
                     " results for '" +
                     self.query +
                     "'.")
@@ -125,8 +168,6 @@ class RecipeListView(ListView):
         else:
             context['searchHeading'] = "Search for your new favourite recipes"
 
-        user = self.request.user
-        context['user_favourites'] = Favourite.get_user_favourite_ids(user)
         context['stars_range'] = range(1, 6)
 
         return context
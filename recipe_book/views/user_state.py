@@ -0,0 +1,64 @@
+from django.db.models import Exists, OuterRef, Subquery
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from ..models import Recipe, Favourite, Rating
+
+# Highest number of recipe ids accepted in one request
+MAX_STATE_RECIPES = 100
+
+
+@require_GET
+def user_recipe_state(request):
+    """
+    View to handle GET requests for the user's own state of the recipes shown
+    on a page: which of them the user has favourited, and the user's rating
+    of each. Recipe cards are rendered the same for all users, and add this
+    state in the browser, so the pages can be cached.
+
+    Args:
+        request (HttpRequest): HTTP request object containing the recipe ids
+        as a comma separated ids parameter.
+
+    Returns:
+        JsonResponse: JSON response with logged_in, the ids of the favourited
+        recipes (favourites) and the user's ratings by recipe id (ratings), or
+        a 400 response if the ids are invalid.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return JsonResponse(
+            {'logged_in': False, 'favourites': [], 'ratings': {}})
+
+    try:
+        recipe_ids = {
+            int(recipe_id)
+            for recipe_id in request.GET.get("ids", "").split(",")
+            if recipe_id}
+    except ValueError:
+        return JsonResponse({'message': "Invalid recipe ids"}, status=400)
+    if len(recipe_ids) > MAX_STATE_RECIPES:
+        return JsonResponse({'message': "Too many recipe ids"}, status=400)
+
+    favourites = []
+    ratings = {}
+    if recipe_ids:
+        # the favourites and ratings of all the recipes in one query
+        rows = Recipe.objects.filter(id__in=recipe_ids).annotate(
+            is_favourite=Exists(Favourite.objects.filter(
+                user=user, recipe=OuterRef("pk"))),
+            user_rating=Subquery(Rating.objects.filter(
+                user=user, recipe=OuterRef("pk")).values("rating")[:1]),
+        ).values_list("id", "is_favourite", "user_rating")
+        for recipe_id, is_favourite, user_rating in rows:
+            if is_favourite:
+                favourites.append(recipe_id)
+            if user_rating is not None:
+                ratings[recipe_id] = user_rating
+
+    response = JsonResponse({
+        'logged_in': True,
+        'favourites': sorted(favourites),
+        'ratings': ratings,
+    })
+    response["Cache-Control"] = "private, no-store"
+    return response
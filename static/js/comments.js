@@ -3,8 +3,8 @@
 document.addEventListener("DOMContentLoaded", initializeCommentScript);
 
 /**
- * Adds event listeners to comment form, comment delete buttons, and comment
- * edit buttons.
+ * Adds event listeners to comment form, comment delete buttons, comment
+ * edit buttons, and the button loading more comments.
  */
 function initializeCommentScript() {
 
@@ -26,6 +26,74 @@ function initializeCommentScript() {
             btn.addEventListener("click", startEditComment);
         }
     }
+
+    const loadCommentsBtn = document.getElementById("load-comments-btn");
+    if (loadCommentsBtn) {
+        loadCommentsBtn.addEventListener("click", loadMoreComments);
+    }
+}
+
+
+/**
+ * Loads the next page of comments, after click on the "Load more comments"
+ * button. Appends the comments to the comments list, and updates the button
+ * with the cursor of the following page, or removes it after the last page.
+ *
+ * @param {Event} click on the load more comments button
+ * @returns {void}
+ */
+async function loadMoreComments(event) {
+    const button = event.currentTarget;
+    button.disabled = true;
+    const [data, status] = await fetchComments(
+        button.getAttribute("data-url"), button.getAttribute("data-cursor"));
+
+    if (status !== 200) {
+        button.disabled = false;
+        displayToast("comment-toast", "Sorry, comments could not be loaded.", status);
+        return;
+    }
+
+    // Parse the comments, and add event listeners to their buttons
+    const template = document.createElement("template");
+    template.innerHTML = data.html;
+    for (let btn of template.content.querySelectorAll(".comment-delete")) {
+        btn.addEventListener("click", confirmCommentDeletion);
+    }
+    for (let btn of template.content.querySelectorAll(".comment-edit")) {
+        btn.addEventListener("click", startEditComment);
+    }
+    document.getElementById("comments-list").appendChild(template.content);
+
+    if (data.next_cursor) {
+        button.setAttribute("data-cursor", data.next_cursor);
+        button.disabled = false;
+    } else {
+        button.parentElement.remove();
+    }
+}
+
+
+/**
+ * Fetches a page of comments with a GET request. Returns the response data,
+ * containing the rendered comments and the cursor of the next page.
+ *
+ * @param {string} url - the URL of the recipe's comments
+ * @param {string} cursor - the cursor of the page
+ * @returns {Array} the response data and status code
+ */
+async function fetchComments(url, cursor) {
+    return await fetch(`${url}?cursor=${encodeURIComponent(cursor)}`, {
+            method: "GET",
+            credentials: "same-origin",
+            headers: {
+                "X-Requested-With": "XMLHttpRequest",
+            },
+        })
+        .then(response => Promise.all([response.json(), response.status]))
+        .then(([data, status]) => {
+            return [data, status];
+        });
 }
 
 
@@ -419,6 +487,7 @@ if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
         deleteComment,
         submitCommentForm,
-        editCommentForm
+        editCommentForm,
+        fetchComments
     };
 }
\ No newline at end of file
@@ -4,7 +4,8 @@ document.addEventListener("DOMContentLoaded", initializeFavouriteScript);
 
 
 /**
- * Adds event listeners to favouriting buttons
+ * Adds event listeners to favouriting buttons, and adds the user's
+ * favourites to the buttons of recipe cards.
  */
 function initializeFavouriteScript() {
     const favouritingButtons = document.getElementsByClassName('heart-btn');
@@ -13,6 +14,34 @@ function initializeFavouriteScript() {
             btn.addEventListener('click', favouritingBtnListener);
         }
     }
+    hydrateFavouriteButtons();
+}
+
+
+/**
+ * Updates the favouriting buttons of recipe cards, which are rendered the same
+ * for all users, with the logged in status and the user's favourites.
+ *
+ * @returns {void}
+ */
+async function hydrateFavouriteButtons() {
+    const state = await getUserRecipeState();
+    const onFavouritesPage = window.location.pathname === "/favourites/";
+    for (let btn of document.querySelectorAll(".card .heart-btn")) {
+        btn.setAttribute("data-logged-in", state.logged_in ? "true" : "false");
+        // all recipes on the favourites page are favourites
+        if (!onFavouritesPage) {
+            const recipeId = Number(btn.getAttribute("data-recipe-id"));
+            const isFavourite = state.favourites.includes(recipeId);
+            const icon = btn.querySelector('svg');
+            if (isFavourite) {
+                setIcon(icon, "heart");
+            } else {
+                setIcon(icon, "heart-regular");
+            }
+            btn.setAttribute("aria-label", isFavourite ? "Remove from favourites" : "Add to favourites");
+        }
+    }
 }
 
 
@@ -46,13 +75,13 @@ async function favouritingBtnListener(event) {
                 if (window.location.pathname === "/favourites/") {
                     removeFavouriteOnFavouritesPage(heartButton);
                 } else {
-                    heartButton.querySelector('i').className = heartButton.querySelector('i').className.replace('fa-solid', 'fa-regular');
+                    setIcon(heartButton.querySelector('svg'), "heart-regular");
                     heartButton.parentNode.querySelector('p').innerText = "Removed";
                     heartButton.setAttribute("aria-label", "Add to favourites");
                 }
                 // If favourite was created
             } else if (postResponse.action === 'created') {
-                heartButton.querySelector('i').className = heartButton.querySelector('i').className.replace('fa-regular', 'fa-solid');
+                setIcon(heartButton.querySelector('svg'), "heart");
                 heartButton.parentNode.querySelector('p').innerText = "Saved!";
                 heartButton.setAttribute("aria-label", "Remove from favourites");
             }
@@ -50,7 +50,9 @@ function addSortQuery(event) {
 
 /**
  * Modifies the URL by either updating the value of an existing parameter or by
- * adding a parameter, based on the provided parameters.
+ * adding a parameter, based on the provided parameters. As the search or sort
+ * changes, pagination restarts from the first page (keeping cursor
+ * pagination if it was used).
  * 
  * @param {string} param - The parameter type to be updated or appended.
  * @param {string} value - The value of the parameter.
@@ -73,6 +75,12 @@ function updateOrAppendQueryParam(param, value) {
         searchParams.append(param, value);
     }
 
+    // Page numbers and cursors belong to the previous search/sort
+    searchParams.delete("page");
+    if (searchParams.has("cursor")) {
+        searchParams.set("cursor", "");
+    }
+
     // Update the URL's search string
     url.search = searchParams.toString();
 
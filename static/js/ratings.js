@@ -4,7 +4,7 @@ document.addEventListener("DOMContentLoaded", initializeRatingsScript);
 
 /**
  * Adds event listeners to the openRatingsbuttons (stars displaying on cards or
- * on the recipe page)
+ * on the recipe page), and adds the user's ratings to the buttons of cards.
  */
 function initializeRatingsScript() {
 
@@ -14,6 +14,23 @@ function initializeRatingsScript() {
             btn.addEventListener('click', initalizeRating);
         }
     }
+    hydrateRatingButtons();
+}
+
+
+/**
+ * Updates the rating buttons of recipe cards, which are rendered the same for
+ * all users, with the logged in status and the user's ratings.
+ *
+ * @returns {void}
+ */
+async function hydrateRatingButtons() {
+    const state = await getUserRecipeState();
+    for (let btn of document.querySelectorAll(".card .init-rate-btn")) {
+        const rating = state.ratings[btn.getAttribute("data-recipe-id")];
+        btn.setAttribute("data-logged-in", state.logged_in ? "true" : "false");
+        btn.setAttribute("data-user-rating", rating === undefined ? "None" : rating);
+    }
 }
 
 
@@ -123,17 +140,17 @@ function buildRatingModal(userRating) {
         if (userRating != "None" && userRating >= i) {
             starButtons += `<button class="icon-button mx-1 star-btn" data-rating-value="${i}"
             aria-label="Give a ${i} star rating.">
-            <i class="fa-solid fa-star" aria-hidden="true"></i>
+            ${iconSvg("star")}
         </button>`; // Add a full star
         } else if (userRating != "None" && userRating > i - 1) {
             starButtons += `<button class="icon-button mx-1 star-btn" data-rating-value="${i}"
             aria-label="Give a ${i} star rating.">
-            <i class="fa-solid fa-star-half-stroke" aria-hidden="true"></i>
+            ${iconSvg("star-half-stroke")}
         </button>`; // Add a half star
         } else {
             starButtons += `<button class="icon-button mx-1 star-btn" data-rating-value="${i}"
             aria-label="Give a ${i} star rating.">
-            <i class="fa-regular fa-star" aria-hidden="true"></i>
+            ${iconSvg("star-regular")}
         </button>`; // Add an empty star
         }
     }
@@ -298,18 +315,18 @@ async function submitRating(rating, recipeId) {
  * @returns {void}
  */
 function updateRatingsDisplay(data, ratingsDisplay) {
-    const starIcons = ratingsDisplay.querySelectorAll("i");
+    const starIcons = ratingsDisplay.querySelectorAll("svg");
     const ratingsCount = ratingsDisplay.querySelector(".ratings-count");
     ratingsCount.innerHTML = `(${data.count})`;
     const averageRating = data.average;
     let counter = 1;
     for (let icon of starIcons) {
         if (averageRating >= counter) {
-            icon.className = "fa-solid fa-star"; // Add a full star
+            setIcon(icon, "star"); // Add a full star
         } else if (averageRating > counter - 1) {
-            icon.className = "fa-solid fa-star-half-stroke"; // Add a half star
+            setIcon(icon, "star-half-stroke"); // Add a half star
         } else {
-            icon.className = "fa-regular fa-star"; // Add an empty star
+            setIcon(icon, "star-regular"); // Add an empty star
         }
         counter++;
     }
@@ -87,6 +87,38 @@ function sendPostRequest(postAddress, data) {
 }
 
 
+/**
+ * Returns the markup of an icon of the icon sprite, like the icon template
+ * tag. The icons are listed in the sprite by the build_icon_sprite command,
+ * which finds them by the literal names passed to iconSvg and setIcon.
+ *
+ * @param {string} name - The name of the icon, e.g. "star".
+ * @param {string} cssClass - Classes to add to the icon.
+ * @returns {string} - The svg element, hidden from screen readers.
+ */
+function iconSvg(name, cssClass = "") {
+    const symbol = document.getElementById(`icon-${name}`);
+    const viewBox = symbol ? symbol.getAttribute("viewBox") : "";
+    return `<svg class="icon ${cssClass}" viewBox="${viewBox}" aria-hidden="true"><use href="#icon-${name}"></use></svg>`;
+}
+
+
+/**
+ * Changes the icon shown by an icon of the icon sprite, e.g. from an empty
+ * to a full heart.
+ *
+ * @param {SVGElement} icon - The svg element of the icon.
+ * @param {string} name - The name of the icon to show.
+ */
+function setIcon(icon, name) {
+    const symbol = document.getElementById(`icon-${name}`);
+    if (symbol) {
+        icon.setAttribute("viewBox", symbol.getAttribute("viewBox"));
+    }
+    icon.querySelector("use").setAttribute("href", `#icon-${name}`);
+}
+
+
 /**
  * Opens a modal by applying the correct classes/styles. Sets aria attributes
  * to reflect the modal is open. Calls function to trap the tab-focus inside modal.
@@ -153,9 +185,75 @@ function trapFocusInModal(modal) {
 }
 
 
+// The logged in user's state of the recipes on the page, fetched once
+let userRecipeState = null;
+
+
+/**
+ * Gets the logged in user's favourites and ratings of the recipes shown on
+ * recipe cards. The cards are rendered the same for all users, so the pages
+ * can be cached, and favourites.js and ratings.js add the user's state to
+ * them. The state is requested from the server once per page, and not at all
+ * if the user is not logged in.
+ *
+ * @returns {Promise<object>} logged_in (boolean), favourites (array of recipe
+ * ids) and ratings (object of ratings by recipe id).
+ */
+function getUserRecipeState() {
+    if (userRecipeState === null) {
+        const recipeIds = new Set();
+        for (let element of document.querySelectorAll(".card [data-recipe-id]")) {
+            recipeIds.add(element.getAttribute("data-recipe-id"));
+        }
+        const loggedIn = document.body.getAttribute("data-logged-in") === "true";
+        userRecipeState = fetchUserRecipeState([...recipeIds], loggedIn);
+    }
+    return userRecipeState;
+}
+
+
+/**
+ * Sends a GET request for the logged in user's favourites and ratings of a
+ * list of recipes. Returns an empty state if the user is not logged in, there
+ * are no recipes, or the request fails.
+ *
+ * @param {Array} recipeIds - The IDs of the recipes.
+ * @param {boolean} loggedIn - Whether the user is logged in.
+ * @returns {object} the user's state of the recipes.
+ */
+async function fetchUserRecipeState(recipeIds, loggedIn) {
+    const emptyState = {
+        logged_in: loggedIn,
+        favourites: [],
+        ratings: {}
+    };
+    if (!loggedIn || recipeIds.length === 0) {
+        return emptyState;
+    }
+    try {
+        const response = await fetch("/user-recipe-state/?ids=" + recipeIds.join(","), {
+            method: "GET",
+            credentials: "same-origin",
+            headers: {
+                "X-Requested-With": "XMLHttpRequest",
+            },
+        });
+        if (response.status !== 200) {
+            return emptyState;
+        }
+        return await response.json();
+    } catch (error) {
+        return emptyState;
+    }
+}
+
+
 // Exporting function for jest tests
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
-        sendPostRequest
+        sendPostRequest,
+        fetchUserRecipeState,
+        iconSvg,
+        setIcon
     };
 }
\ No newline at end of file
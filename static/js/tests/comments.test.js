@@ -13,6 +13,9 @@
  * Verifies the editCommentForm function sends a PUT request with the correct
  * URL, CSRF token and body. Additionally mocks the body object data. Checks
  * that the function returns the expected data.
+ *
+ * Verifies the fetchComments function sends a GET request with the correct
+ * URL and cursor. Checks that the function returns the expected data.
  */
 
 const {
@@ -34,7 +37,8 @@ global.document = dom.window.document;
 const {
     deleteComment,
     submitCommentForm,
-    editCommentForm
+    editCommentForm,
+    fetchComments
 } = require('../comments.js');
 
 describe('deleteComment', () => {
@@ -161,4 +165,37 @@ describe('editCommentForm', () => {
             success: true
         }, 200]);
     });
-});
\ No newline at end of file
+});
+
+describe('fetchComments', () => {
+    it('should send a GET request with the correct URL and cursor', async () => {
+        // Mock fetch
+        global.fetch = jest.fn().mockImplementation(() =>
+            Promise.resolve({
+                json: () => Promise.resolve({
+                    html: '<div></div>',
+                    next_cursor: null
+                }),
+                status: 200
+            })
+        );
+
+        // Call the function
+        const result = await fetchComments('/recipes/test-recipe/comments/', 'abc=');
+
+        // Check that fetch was made with the right arguments
+        expect(fetch).toHaveBeenCalledWith('/recipes/test-recipe/comments/?cursor=abc%3D', {
+            method: 'GET',
+            credentials: 'same-origin',
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+            },
+        });
+
+        // Check return is as expected
+        expect(result).toEqual([{
+            html: '<div></div>',
+            next_cursor: null
+        }, 200]);
+    });
+});
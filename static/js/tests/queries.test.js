@@ -45,4 +45,16 @@ describe('updateOrAppendQueryParam', () => {
         expect(window.location.searchParams.has('param2')).toBeTruthy();
         expect(window.location.searchParams.get('param2')).toEqual('value2');
     });
+
+    it('should restart pagination from the first page', () => {
+        window.location = new URL('https://test.com/recipes/?q=fish&page=3');
+        updateOrAppendQueryParam('s', 'oldest');
+        expect(window.location.searchParams.has('page')).toBeFalsy();
+        expect(window.location.searchParams.get('q')).toEqual('fish');
+
+        window.location = new URL('https://test.com/recipes/?cursor=abc');
+        updateOrAppendQueryParam('s', 'newest');
+        expect(window.location.searchParams.get('cursor')).toEqual('');
+        expect(window.location.searchParams.get('s')).toEqual('newest');
+    });
 });
\ No newline at end of file
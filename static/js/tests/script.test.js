@@ -6,6 +6,10 @@
  * CSRF token from the HTML head. It mocks the fetch function to simulate a
  * successful response, and checks that the featch is made with the right URL,
  * method, headers, and body. Checks that the returned data is as expected.
+ *
+ * Verifies that the fetchUserRecipeState function requests the user's state
+ * of the given recipes, and that no request is sent for a user who is not
+ * logged in.
  */
 
 const {
@@ -21,7 +25,8 @@ global.document = dom.window.document;
 
 // Import the sendPostRequest function
 const {
-    sendPostRequest
+    sendPostRequest,
+    fetchUserRecipeState
 } = require('../script.js');
 
 describe('sendPostRequest', () => {
@@ -59,4 +64,47 @@ describe('sendPostRequest', () => {
             status: 200
         });
     });
-});
\ No newline at end of file
+});
+
+describe('fetchUserRecipeState', () => {
+    it('should request the state of the recipes for a logged in user', async () => {
+        const state = {
+            logged_in: true,
+            favourites: [1],
+            ratings: {
+                "2": 4
+            }
+        };
+        // Mock the fetch
+        global.fetch = jest.fn().mockImplementation(() =>
+            Promise.resolve({
+                json: () => Promise.resolve(state),
+                status: 200
+            })
+        );
+
+        const result = await fetchUserRecipeState(["1", "2"], true);
+
+        expect(fetch).toHaveBeenCalledWith('/user-recipe-state/?ids=1,2', {
+            method: 'GET',
+            credentials: 'same-origin',
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+            },
+        });
+        expect(result).toEqual(state);
+    });
+
+    it('should not send a request for a user who is not logged in', async () => {
+        global.fetch = jest.fn();
+
+        const result = await fetchUserRecipeState(["1", "2"], false);
+
+        expect(fetch).not.toHaveBeenCalled();
+        expect(result).toEqual({
+            logged_in: false,
+            favourites: [],
+            ratings: {}
+        });
+    });
+});